@@ -0,0 +1,96 @@
+"""
+Response caching for read endpoints.
+`@cached_response("orders")` serves a handler's JSON from `response_cache` until
+the namespace is invalidated (by the ETL or a delete), tags it with an ETag and
+answers a matching `If-None-Match` with an empty 304. The handler must take a
+`request: Request` parameter and return JSON data or a `FastJSONResponse`;
+HTTP errors it raises are never cached.
+"""
+
+import functools
+import inspect
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.api.responses import FastJSONResponse, encode_json
+from app.services.response_cache import CachedResponse, response_cache
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(",")
+    )
+
+
+def _respond(request: Request, namespace: str, cached: CachedResponse, hit: bool) -> Response:
+    # no-cache: clients may keep the body but must revalidate, which costs a 304.
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": "no-cache",
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        response_cache.record_not_modified(namespace)
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def cached_response(namespace: str) -> Callable[[F], F]:
+    def decorator(handler: F) -> F:
+        if not response_cache.enabled:
+            return handler
+
+        def _lookup(request: Request) -> tuple[str, CachedResponse | None]:
+            key = response_cache.key(
+                namespace, request.url.path, request.query_params.multi_items()
+            )
+            return key, response_cache.get(namespace, key)
+
+        def _store(key: str, payload: Any) -> CachedResponse:
+            if isinstance(payload, FastJSONResponse):
+                return response_cache.put(key, payload.body)
+            if isinstance(payload, Response):
+                raise TypeError(f"{handler.__name__} must return JSON data to be cached")
+            return response_cache.put(key, encode_json(payload))
+
+        if inspect.iscoroutinefunction(handler):
+
+            async def _off_loop(fn: Callable[..., Any], *args: Any) -> Any:
+                # The in-memory backend is a dict lookup; only network backends need a thread.
+                if response_cache.backend.blocking:
+                    return await run_in_threadpool(fn, *args)
+                return fn(*args)
+
+            @functools.wraps(handler)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Response:
+                request: Request = kwargs["request"]
+                key, cached = await _off_loop(_lookup, request)
+                hit = cached is not None
+                if cached is None:
+                    payload = await handler(*args, **kwargs)
+                    cached = await _off_loop(_store, key, payload)
+                return _respond(request, namespace, cached, hit)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(handler)
+        def wrapper(*args: Any, **kwargs: Any) -> Response:
+            request: Request = kwargs["request"]
+            key, cached = _lookup(request)
+            hit = cached is not None
+            if cached is None:
+                cached = _store(key, handler(*args, **kwargs))
+            return _respond(request, namespace, cached, hit)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,82 @@
+"""
+Request-scoped dependencies shared by the routers.
+`get_orders_db` hands out an `AsyncSession` when ASYNC_DB_ENABLED is set and a
+regular `Session` otherwise, and `get_orders_read_db` does the same on the read
+replica for routes that only read; `run_db` runs a sync CRUD helper against
+either without blocking the event loop.
+
+Cached read routes must not refill the response cache from a replica that has
+not yet replayed the write that invalidated it. For
+DATABASE_READ_MAX_LAG_SECONDS after a namespace is invalidated, its read
+sessions (`get_orders_read_db`, `cached_read_db(namespace)`) therefore go to
+the primary. If replication lags by more than that, a response cached from the
+replica can still be stale. It then stays stale until the next invalidation, or
+for at most RESPONSE_CACHE_TTL_SECONDS.
+"""
+
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import ReadSessionLocal, SessionLocal, open_async_session
+from app.services.response_cache import response_cache
+
+T = TypeVar("T")
+
+
+def _replica_may_lag(namespace: str) -> bool:
+    return settings.database_read_url is not None and response_cache.invalidated_within(
+        namespace, settings.database_read_max_lag_seconds
+    )
+
+
+async def _orders_session(read_only: bool) -> AsyncGenerator[AsyncSession | Session, None]:
+    if settings.async_db_enabled:
+        async with open_async_session(read_only) as db:
+            yield db
+        return
+    db = ReadSessionLocal() if read_only else SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def get_orders_db() -> AsyncGenerator[AsyncSession | Session, None]:
+    async for db in _orders_session(read_only=False):
+        yield db
+
+
+async def get_orders_read_db() -> AsyncGenerator[AsyncSession | Session, None]:
+    """Read session for the routes cached under the "orders" namespace."""
+    if response_cache.backend.blocking:
+        may_lag = await run_in_threadpool(_replica_may_lag, "orders")
+    else:
+        may_lag = _replica_may_lag("orders")
+    async for db in _orders_session(read_only=not may_lag):
+        yield db
+
+
+def cached_read_db(namespace: str) -> Callable[[], Generator[Session, None, None]]:
+    """`get_read_db` for a sync route cached under `namespace`."""
+
+    def dependency() -> Generator[Session, None, None]:
+        db = SessionLocal() if _replica_may_lag(namespace) else ReadSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return dependency
+
+
+async def run_db(
+    db: AsyncSession | Session, fn: Callable[..., T], *args: object, **kwargs: object
+) -> T:
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
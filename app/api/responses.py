@@ -0,0 +1,38 @@
+"""
+Fast JSON encoding for API responses.
+Handlers on hot read paths return `FastJSONResponse` with datetimes left as-is:
+orjson writes them (and the rest of the payload) to bytes in one pass, skipping
+FastAPI's `jsonable_encoder` walk. `ndjson_chunk` encodes a page of records as
+newline-delimited JSON for streamed exports, and `sse_event` frames one
+server-sent event for `/orders/stream`.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def encode_json(payload: Any) -> bytes:
+    # datetime/UUID/dataclass are native to orjson; anything else goes through FastAPI's encoder.
+    return orjson.dumps(payload, default=jsonable_encoder)
+
+
+def ndjson_chunk(records: Iterable[Any]) -> bytes:
+    return b"".join(orjson.dumps(record, default=jsonable_encoder) + b"\n" for record in records)
+
+
+def sse_event(event: str, payload: Any) -> bytes:
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + encode_json(payload) + b"\n\n"
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
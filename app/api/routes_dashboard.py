@@ -1,17 +1,123 @@
 """
 Router for dashboard-related endpoints.
-Includes a simple health check used for service monitoring.
+Includes a simple health check used for service monitoring, Slack dispatcher,
+response cache and order stream stats, and KPI metrics served from the hourly
+order rollup.
 """
-from fastapi import APIRouter, Depends
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.api.cache import cached_response
+from app.api.deps import cached_read_db
+from app.db.crud import list_order_metrics, truncate_to_hour
 from app.db.session import get_db
+from app.services.notification_dispatcher import slack_dispatcher
+from app.services.order_events import order_events
+from app.services.response_cache import response_cache
 
 router = APIRouter()
 
+_DEFAULT_METRICS_WINDOW = timedelta(days=30)
+
 
 @router.get("/health")
 def health(db: Session = Depends(get_db)) -> dict[str, str]:
     db.execute(text("SELECT 1"))
     return {"status": "ok", "db": "connected"}
+
+
+@router.get("/notifications")
+def notifications() -> dict[str, int | float | None]:
+    return slack_dispatcher.stats()
+
+
+@router.get("/cache")
+def cache_stats() -> dict[str, int | bool]:
+    return response_cache.stats()
+
+
+@router.get("/order-events")
+def order_events_stats() -> dict[str, int | bool]:
+    return order_events.stats()
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _bucket_start(hour: datetime, granularity: str) -> datetime:
+    hour = truncate_to_hour(hour)
+    if granularity == "hour":
+        return hour
+    day = hour.replace(hour=0)
+    if granularity == "day":
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def _with_margin(totals: dict[str, float]) -> dict[str, float | None]:
+    revenue = totals["revenue"]
+    gross_margin = revenue - totals["cost"]
+    return {
+        "order_count": int(totals["order_count"]),
+        "revenue": round(revenue, 2),
+        "cost": round(totals["cost"], 2),
+        "gross_margin": round(gross_margin, 2),
+        "gross_margin_rate": round(gross_margin / revenue, 4) if revenue else None,
+    }
+
+
+@router.get("/metrics")
+@cached_response("orders")
+def metrics(
+    request: Request,
+    granularity: Literal["hour", "day", "week"] = "day",
+    purchased_from: datetime | None = None,
+    purchased_to: datetime | None = None,
+    status: str | None = None,
+    db: Session = Depends(cached_read_db("orders")),
+) -> dict:
+    end = _as_utc(purchased_to) if purchased_to else datetime.now(timezone.utc)
+    start = _as_utc(purchased_from) if purchased_from else end - _DEFAULT_METRICS_WINDOW
+    if start >= end:
+        raise HTTPException(status_code=400, detail="purchased_from must be before purchased_to")
+
+    def _empty() -> dict[str, float]:
+        return {"order_count": 0, "revenue": 0.0, "cost": 0.0}
+
+    buckets: dict[datetime, dict[str, float]] = defaultdict(_empty)
+    by_status: dict[datetime, dict[str, dict[str, float]]] = defaultdict(
+        lambda: defaultdict(_empty)
+    )
+    overall = _empty()
+    for row in list_order_metrics(db, truncate_to_hour(start), end, status=status):
+        bucket_start = _bucket_start(row.bucket_start, granularity)
+        for totals in (buckets[bucket_start], by_status[bucket_start][row.order_status], overall):
+            totals["order_count"] += row.order_count
+            totals["revenue"] += row.revenue
+            totals["cost"] += row.cost
+
+    return {
+        "granularity": granularity,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "totals": _with_margin(overall),
+        "buckets": [
+            {
+                "bucket_start": bucket_start.isoformat(),
+                **_with_margin(totals),
+                "by_status": {
+                    order_status: _with_margin(status_totals)
+                    for order_status, status_totals in sorted(by_status[bucket_start].items())
+                },
+            }
+            for bucket_start, totals in sorted(buckets.items())
+        ],
+    }
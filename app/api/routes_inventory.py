@@ -1,12 +1,97 @@
 """
 Router handling inventory-related API endpoints.
-Currently returns an empty list stub.
+Reads current stock from `inventory_items` (never the snapshot history), lowest
+fulfillable quantity first, with keyset pagination and a low-stock filter.
 """
-from fastapi import APIRouter
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from app.api.cache import cached_response
+from app.api.deps import cached_read_db
+from app.core.config import settings
+from app.db.crud import (
+    decode_inventory_cursor,
+    encode_inventory_cursor,
+    list_inventory_items,
+    list_inventory_snapshots,
+)
 
 router = APIRouter()
 
 
 @router.get("/")
-def list_inventory() -> dict[str, list]:
-    return {"inventory": []}
+@cached_response("inventory")
+def list_inventory(
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    marketplace_id: str | None = None,
+    low_stock: bool = False,
+    max_fulfillable: int | None = Query(None, ge=0),
+    db: Session = Depends(cached_read_db("inventory")),
+) -> dict[str, list[dict] | str | None]:
+    try:
+        after = decode_inventory_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    if max_fulfillable is None and low_stock:
+        max_fulfillable = settings.inventory_low_stock_threshold
+    items = list_inventory_items(
+        db,
+        limit=limit + 1,
+        after=after,
+        marketplace_id=marketplace_id,
+        max_fulfillable=max_fulfillable,
+    )
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        "inventory": [
+            {
+                "id": item.id,
+                "marketplace_id": item.marketplace_id,
+                "seller_sku": item.seller_sku,
+                "asin": item.asin,
+                "fn_sku": item.fn_sku,
+                "product_name": item.product_name,
+                "condition": item.condition,
+                "fulfillable_quantity": item.fulfillable_quantity,
+                "inbound_quantity": item.inbound_quantity,
+                "reserved_quantity": item.reserved_quantity,
+                "unfulfillable_quantity": item.unfulfillable_quantity,
+                "total_quantity": item.total_quantity,
+                "last_updated_time": item.last_updated_time.isoformat()
+                if item.last_updated_time
+                else None,
+                "synced_at": item.synced_at.isoformat() if item.synced_at else None,
+            }
+            for item in items
+        ],
+        "next_cursor": encode_inventory_cursor(items[-1]) if has_more else None,
+    }
+
+
+@router.get("/{item_id}/history")
+@cached_response("inventory")
+def get_inventory_history(
+    request: Request,
+    item_id: int,
+    since: datetime | None = None,
+    db: Session = Depends(cached_read_db("inventory")),
+) -> dict[str, int | list[dict]]:
+    return {
+        "inventory_item_id": item_id,
+        "snapshots": [
+            {
+                "captured_at": snapshot.captured_at.isoformat(),
+                "fulfillable_quantity": snapshot.fulfillable_quantity,
+                "inbound_quantity": snapshot.inbound_quantity,
+                "reserved_quantity": snapshot.reserved_quantity,
+                "unfulfillable_quantity": snapshot.unfulfillable_quantity,
+            }
+            for snapshot in list_inventory_snapshots(db, item_id, since)
+        ],
+    }
@@ -1,12 +1,74 @@
 """
 Router exposing log retrieval endpoints.
-Stub implementation returns an empty list.
+Serves the `run_logs` table (ETL runs and SP-API calls), newest first, with
+keyset pagination and filters.
 """
-from fastapi import APIRouter
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.crud import decode_run_log_cursor, encode_run_log_cursor, list_run_logs
+from app.db.session import get_read_db
+from app.services.run_log import run_logger
 
 router = APIRouter()
 
 
 @router.get("/")
-def list_logs() -> dict[str, list]:
-    return {"logs": []}
+def list_logs(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    kind: str | None = Query(None, description="etl_run | spapi_call"),
+    name: str | None = None,
+    status: str | None = Query(None, description="ok | error"),
+    account: str | None = None,
+    marketplace_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db: Session = Depends(get_read_db),
+) -> dict[str, list[dict] | str | None]:
+    try:
+        after = decode_run_log_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    entries = list_run_logs(
+        db,
+        limit=limit + 1,
+        after=after,
+        kind=kind,
+        name=name,
+        status=status,
+        account=account,
+        marketplace_id=marketplace_id,
+        since=since,
+        until=until,
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    return {
+        "logs": [
+            {
+                "id": entry.id,
+                "created_at": entry.created_at.isoformat(),
+                "kind": entry.kind,
+                "name": entry.name,
+                "status": entry.status,
+                "http_status": entry.http_status,
+                "duration_ms": entry.duration_ms,
+                "rows": entry.rows,
+                "account": entry.account,
+                "marketplace_id": entry.marketplace_id,
+                "error": entry.error,
+                "details": entry.details,
+            }
+            for entry in entries
+        ],
+        "next_cursor": encode_run_log_cursor(entries[-1]) if has_more else None,
+    }
+
+
+@router.get("/writer")
+def get_log_writer_stats() -> dict[str, int]:
+    return run_logger.stats()
@@ -1,61 +1,238 @@
-import requests
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.db.crud import delete_all_orders, list_orders
-from app.db.session import get_db
-from app.services.etl_orders import run_orders_etl
+from app.api.cache import cached_response
+from app.api.deps import get_orders_db, get_orders_read_db, run_db
+from app.api.responses import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    FastJSONResponse,
+    ndjson_chunk,
+    sse_event,
+)
+from app.core.config import settings
+from app.db.crud import (
+    decode_order_cursor,
+    delete_all_orders,
+    encode_order_cursor,
+    get_job_run,
+    list_orders,
+    stream_orders,
+)
+from app.db.session import ReadSessionLocal
+from app.services.order_events import order_events
+from app.services.orders_export import iter_csv, iter_parquet, require_parquet
+from app.services.response_cache import response_cache
+from app.workers.scheduler import scheduler
 
 router = APIRouter()
 
+# Output keys in `ORDER_SUMMARY_COLUMNS` order, then raw_payload when it is selected.
+_ORDER_FIELDS = (
+    "id",
+    "amazon_order_id",
+    "marketplace_id",
+    "order_status",
+    "purchase_date",
+    "last_update_date",
+    "synced_at",
+    "Buyer",
+    "Amount",
+    "Cost",
+    "raw_payload",
+)
+
+
+def _serialize_orders(rows: list[Row], include_raw: bool) -> list[dict]:
+    # Datetimes stay datetime objects; orjson renders them exactly like isoformat().
+    fields = _ORDER_FIELDS if include_raw else _ORDER_FIELDS[:-1]
+    return [dict(zip(fields, row)) for row in rows]
+
 
 @router.get("/")
-def get_orders(db: Session = Depends(get_db)) -> dict[str, list[dict]]:
-    rows = list_orders(db)
-    return {
-        "orders": [
-            {
-                "id": row.id,
-                "amazon_order_id": row.amazon_order_id,
-                "order_status": row.order_status,
-                "purchase_date": row.purchase_date.isoformat() if row.purchase_date else None,
-                "last_update_date": row.last_update_date.isoformat()
-                if row.last_update_date
-                else None,
-                "synced_at": row.synced_at.isoformat() if row.synced_at else None,
-                "Buyer": row.buyer,
-                "Amount": row.amount,
-                "Cost": row.cost,
-            }
-            for row in rows
-        ]
+@cached_response("orders")
+async def get_orders(
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    status: str | None = None,
+    buyer: str | None = None,
+    marketplace_id: str | None = None,
+    purchased_from: datetime | None = None,
+    purchased_to: datetime | None = None,
+    include_raw: bool = False,
+    db: AsyncSession | Session = Depends(get_orders_read_db),
+) -> FastJSONResponse:
+    try:
+        after = decode_order_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    rows = await run_db(
+        db,
+        list_orders,
+        limit=limit + 1,
+        after=after,
+        status=status,
+        buyer=buyer,
+        marketplace_id=marketplace_id,
+        purchased_from=purchased_from,
+        purchased_to=purchased_to,
+        include_raw=include_raw,
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return FastJSONResponse(
+        {
+            "orders": _serialize_orders(rows, include_raw),
+            "next_cursor": encode_order_cursor(rows[-1]) if has_more else None,
+        }
+    )
+
+
+_EXPORT_FORMATS = {
+    "ndjson": (NDJSON_MEDIA_TYPE, "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+@router.get("/export")
+def export_orders(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    from_: datetime | None = Query(None, alias="from", description="purchase_date >= from"),
+    to: datetime | None = Query(None, description="purchase_date < to"),
+    status: str | None = None,
+    buyer: str | None = None,
+    marketplace_id: str | None = None,
+    purchased_from: datetime | None = None,
+    purchased_to: datetime | None = None,
+    include_raw: bool = Query(False, description="ndjson only"),
+) -> StreamingResponse:
+    """Stream every matching order, newest first, from one server-side cursor.
+
+    `from`/`to` are short aliases of `purchased_from`/`purchased_to`.
+    """
+    if include_raw and format != "ndjson":
+        raise HTTPException(status_code=400, detail="include_raw is only supported for ndjson")
+    if format == "parquet":
+        try:
+            require_parquet()
+        except RuntimeError as exc:
+            raise HTTPException(status_code=501, detail=str(exc)) from exc
+
+    filters = {
+        "status": status,
+        "buyer": buyer,
+        "marketplace_id": marketplace_id,
+        "purchased_from": from_ or purchased_from,
+        "purchased_to": to or purchased_to,
+        "include_raw": include_raw,
     }
 
+    def _ndjson(chunks: Iterator[list[Row]]) -> Iterator[bytes]:
+        for rows in chunks:
+            yield ndjson_chunk(_serialize_orders(rows, include_raw))
 
-@router.post("/sync-sandbox")
-def sync_sandbox_orders(
-    db: Session = Depends(get_db),
-) -> dict[str, int | list[dict[str, str | float | None]]]:
-    try:
-        return run_orders_etl(db)
-    except RuntimeError as exc:
-        if "Missing SP-API credentials" in str(exc):
-            raise HTTPException(status_code=503, detail=str(exc)) from exc
-        raise
-    except requests.HTTPError as exc:
-        status_code = exc.response.status_code if exc.response is not None else 502
-        raise HTTPException(
-            status_code=502,
-            detail=f"SP-API request failed with status {status_code}",
-        ) from exc
-    except requests.RequestException as exc:
-        raise HTTPException(
-            status_code=502,
-            detail=f"SP-API request failed: {exc.__class__.__name__}",
-        ) from exc
+    encode = {"ndjson": _ndjson, "csv": iter_csv, "parquet": iter_parquet}[format]
+
+    def _body() -> Iterator[bytes]:
+        # The request's session is closed once the handler returns, so the stream owns one.
+        db = ReadSessionLocal()
+        try:
+            yield from encode(stream_orders(db, settings.orders_export_chunk_size, **filters))
+        finally:
+            db.close()
+
+    media_type, extension = _EXPORT_FORMATS[format]
+    filename = f"orders_{datetime.utcnow():%Y%m%dT%H%M%S}.{extension}"
+    return StreamingResponse(
+        _body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/stream")
+async def stream_order_events(
+    request: Request, marketplace_id: str | None = None
+) -> StreamingResponse:
+    """Server-sent `order.created` / `order.updated` events as syncs commit.
+
+    A client that falls too far behind gets a `resync` event in place of the
+    events it missed and should reload `GET /orders/`.
+    """
+    subscription = order_events.subscribe(marketplace_id)
+
+    async def _body() -> AsyncIterator[bytes]:
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), settings.order_events_keepalive_seconds
+                    )
+                except TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # Comment frame: keeps proxies from closing an idle connection.
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield sse_event(event["type"], event)
+        finally:
+            order_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        _body(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/sync-sandbox", status_code=202)
+async def sync_sandbox_orders() -> dict[str, str]:
+    # enqueue writes the job_runs row synchronously, so keep it off the loop.
+    job_id = await run_in_threadpool(scheduler.enqueue, "orders_sync", trigger="manual")
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/sync-jobs/{job_id}")
+async def get_sync_job(
+    job_id: str,
+    db: AsyncSession | Session = Depends(get_orders_db),
+) -> dict[str, str | float | dict | None]:
+    job_run = await run_db(db, get_job_run, job_id)
+    if job_run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown sync job: {job_id}")
+    return {
+        "job_id": job_run.job_id,
+        "job_name": job_run.job_name,
+        "trigger": job_run.trigger,
+        "status": job_run.status,
+        "enqueued_at": job_run.enqueued_at.isoformat() if job_run.enqueued_at else None,
+        "started_at": job_run.started_at.isoformat() if job_run.started_at else None,
+        "finished_at": job_run.finished_at.isoformat() if job_run.finished_at else None,
+        "duration_ms": job_run.duration_ms,
+        "result": job_run.result,
+        "error": job_run.error,
+    }
 
 
 @router.delete("/delete-all")
-def delete_all_orders_api(db: Session = Depends(get_db)) -> dict[str, int]:
-    deleted = delete_all_orders(db)
+async def delete_all_orders_api(
+    db: AsyncSession | Session = Depends(get_orders_db),
+) -> dict[str, int]:
+    deleted = await run_db(db, delete_all_orders)
+    response_cache.invalidate("orders")
     return {"deleted": deleted}
@@ -1,3 +1,4 @@
+import json
 import os
 from dataclasses import dataclass
 from pathlib import Path
@@ -21,6 +22,32 @@ def _as_csv_list(value: str | None) -> list[str]:
     return [item.strip().rstrip("/") for item in value.split(",") if item.strip()]
 
 
+def _with_psycopg_driver(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return url
+
+
+def _as_async_url(url: str) -> str:
+    # psycopg 3 serves both stacks; SQLite needs the aiosqlite driver.
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+@dataclass(frozen=True)
+class SPAPIAccount:
+    """One seller account (LWA refresh token) and the marketplaces synced for it."""
+
+    name: str
+    client_id: str
+    client_secret: str
+    refresh_token: str
+    endpoint: str
+    marketplace_ids: tuple[str, ...]
+    lwa_token_url: str
+
+
 @dataclass
 class Settings:
     app_name: str = os.getenv("APP_NAME", "Amazon Ops Dashboard")
@@ -32,6 +59,19 @@ class Settings:
     db_user: str = os.getenv("DB_USER", "postgres")
     db_password: str = os.getenv("DB_PASSWORD", "postgres")
     db_name: str = os.getenv("DB_NAME", "amazon_ops")
+    database_read_url_env: str = os.getenv("DATABASE_READ_URL", "")
+    database_read_max_lag_seconds: float = float(
+        os.getenv("DATABASE_READ_MAX_LAG_SECONDS", "30")
+    )
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: bool = _as_bool(os.getenv("DB_POOL_PRE_PING"), default=True)
+    db_etl_pool_size: int = int(os.getenv("DB_ETL_POOL_SIZE", "4"))
+    db_etl_max_overflow: int = int(os.getenv("DB_ETL_MAX_OVERFLOW", "4"))
+    async_db_enabled: bool = _as_bool(os.getenv("ASYNC_DB_ENABLED"), default=False)
+    raw_payload_storage: str = os.getenv("RAW_PAYLOAD_STORAGE", "json").strip().lower()
     spapi_client_id: str = os.getenv("SPAPI_CLIENT_ID", "")
     spapi_client_secret: str = os.getenv("SPAPI_CLIENT_SECRET", "")
     spapi_refresh_token: str = os.getenv("SPAPI_REFRESH_TOKEN", "")
@@ -40,22 +80,125 @@ class Settings:
         "https://sandbox.sellingpartnerapi-na.amazon.com",
     )
     spapi_marketplace_id: str = os.getenv("SPAPI_MARKETPLACE_ID", "ATVPDKIKX0DER")
+    spapi_accounts_env: str = os.getenv("SPAPI_ACCOUNTS", "")
+    spapi_lwa_token_url: str = os.getenv(
+        "SPAPI_LWA_TOKEN_URL",
+        "https://api.amazon.com/auth/o2/token",
+    )
+    spapi_lwa_refresh_margin_seconds: int = int(
+        os.getenv("SPAPI_LWA_REFRESH_MARGIN_SECONDS", "300")
+    )
+    orders_etl_batch_size: int = int(os.getenv("ORDERS_ETL_BATCH_SIZE", "500"))
+    orders_page_prefetch: int = int(os.getenv("ORDERS_PAGE_PREFETCH", "1"))
+    orders_incremental_sync: bool = _as_bool(os.getenv("ORDERS_INCREMENTAL_SYNC"), default=False)
+    orders_sync_overlap_minutes: int = int(os.getenv("ORDERS_SYNC_OVERLAP_MINUTES", "10"))
+    orders_sync_summary_limit: int = int(os.getenv("ORDERS_SYNC_SUMMARY_LIMIT", "100"))
+    orders_ingest_max_workers: int = int(os.getenv("ORDERS_INGEST_MAX_WORKERS", "4"))
+    orders_export_chunk_size: int = int(os.getenv("ORDERS_EXPORT_CHUNK_SIZE", "2000"))
+    order_items_enabled: bool = _as_bool(os.getenv("ORDER_ITEMS_ENABLED"), default=False)
+    order_items_max_workers: int = int(os.getenv("ORDER_ITEMS_MAX_WORKERS", "8"))
+    backfill_batch_size: int = int(os.getenv("BACKFILL_BATCH_SIZE", "5000"))
+    backfill_max_workers: int = int(os.getenv("BACKFILL_MAX_WORKERS", "4"))
+    backfill_max_workers_per_account: int = int(
+        os.getenv("BACKFILL_MAX_WORKERS_PER_ACCOUNT", "2")
+    )
+    backfill_window_days: float = float(os.getenv("BACKFILL_WINDOW_DAYS", "1"))
+    inventory_etl_batch_size: int = int(os.getenv("INVENTORY_ETL_BATCH_SIZE", "500"))
+    inventory_low_stock_threshold: int = int(os.getenv("INVENTORY_LOW_STOCK_THRESHOLD", "10"))
+    scheduler_enabled: bool = _as_bool(os.getenv("SCHEDULER_ENABLED"), default=False)
+    scheduler_max_workers: int = int(os.getenv("SCHEDULER_MAX_WORKERS", "2"))
+    scheduler_jitter_seconds: float = float(os.getenv("SCHEDULER_JITTER_SECONDS", "30"))
+    orders_sync_interval_seconds: int = int(os.getenv("ORDERS_SYNC_INTERVAL_SECONDS", "900"))
+    inventory_sync_interval_seconds: int = int(
+        os.getenv("INVENTORY_SYNC_INTERVAL_SECONDS", "3600")
+    )
     slack_webhook_url: str = os.getenv("SLACK_WEBHOOK_URL", "")
+    slack_digest_window_seconds: float = float(os.getenv("SLACK_DIGEST_WINDOW_SECONDS", "5"))
+    slack_digest_max_ids: int = int(os.getenv("SLACK_DIGEST_MAX_IDS", "10"))
+    slack_queue_max_size: int = int(os.getenv("SLACK_QUEUE_MAX_SIZE", "10000"))
+    slack_send_max_retries: int = int(os.getenv("SLACK_SEND_MAX_RETRIES", "3"))
+    run_log_enabled: bool = _as_bool(os.getenv("RUN_LOG_ENABLED"), default=True)
+    run_log_batch_size: int = int(os.getenv("RUN_LOG_BATCH_SIZE", "200"))
+    run_log_flush_interval_seconds: float = float(
+        os.getenv("RUN_LOG_FLUSH_INTERVAL_SECONDS", "2")
+    )
+    run_log_queue_max_size: int = int(os.getenv("RUN_LOG_QUEUE_MAX_SIZE", "10000"))
+    run_log_retention_days: int = int(os.getenv("RUN_LOG_RETENTION_DAYS", "14"))
+    metrics_enabled: bool = _as_bool(os.getenv("METRICS_ENABLED"), default=True)
+    response_cache_enabled: bool = _as_bool(os.getenv("RESPONSE_CACHE_ENABLED"), default=True)
+    response_cache_ttl_seconds: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+    response_cache_max_entries: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    response_cache_redis_url: str = os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+    response_cache_pg_notify: bool = _as_bool(
+        os.getenv("RESPONSE_CACHE_PG_NOTIFY"), default=True
+    )
+    order_events_queue_size: int = int(os.getenv("ORDER_EVENTS_QUEUE_SIZE", "2000"))
+    order_events_keepalive_seconds: float = float(
+        os.getenv("ORDER_EVENTS_KEEPALIVE_SECONDS", "15")
+    )
+    order_events_pg_notify: bool = _as_bool(os.getenv("ORDER_EVENTS_PG_NOTIFY"), default=False)
+    http_pool_size: int = int(os.getenv("HTTP_POOL_SIZE", "10"))
+    http_max_retries: int = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    http_backoff_base_seconds: float = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.5"))
+    http_backoff_max_seconds: float = float(os.getenv("HTTP_BACKOFF_MAX_SECONDS", "30"))
     demo_mode: bool = _as_bool(os.getenv("DEMO_MODE"), default=False)
 
     @property
     def database_url(self) -> str:
         if self.database_url_env:
-            if self.database_url_env.startswith("postgresql://"):
-                return self.database_url_env.replace(
-                    "postgresql://", "postgresql+psycopg://", 1
-                )
-            return self.database_url_env
+            return _with_psycopg_driver(self.database_url_env)
         return (
             "postgresql+psycopg://"
             f"{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return _as_async_url(self.database_url)
+
+    @property
+    def database_read_url(self) -> str | None:
+        """Read replica for read-only routes, or None to read from the primary."""
+        if not self.database_read_url_env:
+            return None
+        return _with_psycopg_driver(self.database_read_url_env)
+
+    @property
+    def async_database_read_url(self) -> str | None:
+        read_url = self.database_read_url
+        return _as_async_url(read_url) if read_url else None
+
+    @property
+    def spapi_accounts(self) -> list[SPAPIAccount]:
+        """Accounts from the SPAPI_ACCOUNTS JSON list, or the single SPAPI_* account.
+
+        Each entry needs `name` and `refresh_token`; `client_id`, `client_secret`,
+        `endpoint`, `marketplace_ids` and `lwa_token_url` fall back to the SPAPI_*
+        values, since one LWA app usually serves every seller account.
+        """
+        if not self.spapi_accounts_env.strip():
+            entries = [{"name": "default"}]
+        else:
+            entries = json.loads(self.spapi_accounts_env)
+            if not isinstance(entries, list) or not entries:
+                raise ValueError("SPAPI_ACCOUNTS must be a non-empty JSON list")
+
+        accounts = []
+        for entry in entries:
+            marketplace_ids = entry.get("marketplace_ids") or [self.spapi_marketplace_id]
+            accounts.append(
+                SPAPIAccount(
+                    name=entry["name"],
+                    client_id=entry.get("client_id", self.spapi_client_id),
+                    client_secret=entry.get("client_secret", self.spapi_client_secret),
+                    refresh_token=entry.get("refresh_token", self.spapi_refresh_token),
+                    endpoint=entry.get("endpoint", self.spapi_sandbox_endpoint).rstrip("/"),
+                    marketplace_ids=tuple(marketplace_ids),
+                    lwa_token_url=entry.get("lwa_token_url", self.spapi_lwa_token_url),
+                )
+            )
+        return accounts
+
     @property
     def cors_allowed_origins(self) -> list[str]:
         return _as_csv_list(self.cors_allowed_origins_env)
@@ -0,0 +1,400 @@
+"""
+Dependency-free Prometheus-style metrics.
+Counters, gauges and histograms live in one process-wide `registry` and are
+rendered in the Prometheus text exposition format by `GET /metrics`. `timed()`
+works as a decorator or a context manager; with METRICS_ENABLED=false it hands
+back the undecorated function / a shared no-op context, so instrumented hot
+paths pay only an attribute check.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, object]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """Exposition lines for this metric, `# HELP`/`# TYPE` header first."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Last-set value per label set; `set_function` samples a callable at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._functions: dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float], **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            values[key] = function()
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum, count.
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = {
+                key: (list(counts), total[0]) for key, (counts, total) in self._series.items()
+            }
+        lines = self._header()
+        bucket_labels = self.labelnames + ("le",)
+        for key, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _format_labels(bucket_labels, (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(enabled=settings.metrics_enabled)
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+spapi_request_seconds = registry.histogram(
+    "spapi_request_duration_seconds",
+    "SP-API and LWA call latency, retries and rate-limit waits included.",
+    ("operation", "status"),
+)
+db_query_seconds = registry.histogram(
+    "db_query_duration_seconds",
+    "Time spent in DBAPI execute calls by statement type.",
+    ("statement",),
+)
+db_operation_seconds = registry.histogram(
+    "db_operation_duration_seconds",
+    "Time spent in CRUD helpers and commits.",
+    ("operation",),
+)
+etl_run_seconds = registry.histogram(
+    "etl_run_duration_seconds",
+    "Wall time of one ETL run per account/marketplace.",
+    ("pipeline",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+etl_rows_total = registry.counter(
+    "etl_rows_total", "Rows fetched from SP-API by ETL pipelines.", ("pipeline",)
+)
+etl_rows_per_second = registry.gauge(
+    "etl_rows_per_second", "Throughput of the most recent ETL run.", ("pipeline",)
+)
+slack_send_seconds = registry.histogram(
+    "slack_send_duration_seconds", "Slack webhook post latency.", ("outcome",)
+)
+order_writes_skipped_total = registry.counter(
+    "order_writes_skipped_total",
+    "Order upserts skipped because the payload content hash was unchanged.",
+    ("operation",),
+)
+response_cache_requests = registry.counter(
+    "response_cache_requests_total",
+    "Cached read-endpoint lookups by result (hits, misses, not_modified).",
+    ("namespace", "result"),
+)
+
+order_stream_clients = registry.gauge(
+    "order_stream_clients", "Open GET /orders/stream connections in this process."
+)
+order_events_dropped_total = registry.counter(
+    "order_events_dropped_total",
+    "Order events dropped for stream clients that fell behind (each then gets a resync).",
+)
+db_pool_checked_out = registry.gauge(
+    "db_pool_checked_out", "DB connections currently checked out of the pool.", ("pool",)
+)
+db_pool_overflow = registry.gauge(
+    "db_pool_overflow", "DB connections open beyond the pool size.", ("pool",)
+)
+db_pool_size = registry.gauge("db_pool_size", "Configured DB pool size.", ("pool",))
+db_pool_wait_seconds = registry.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a connection from the DB pool, new connections included.",
+    ("pool",),
+)
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "_started")
+
+    def __init__(self, histogram: Histogram, labels: dict[str, object]) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.histogram.observe(time.perf_counter() - self._started, **self.labels)
+
+    def __call__(self, func: F) -> F:
+        histogram, labels = self.histogram, self.labels
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **labels)
+
+        return wrapper  # type: ignore[return-value]
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def __call__(self, func: F) -> F:
+        return func
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(histogram: Histogram, **labels: object) -> _Timer | _NullTimer:
+    """Time a block (`with timed(h, op="x"):`) or a function (`@timed(h, op="x")`)."""
+    if not registry.enabled:
+        return _NULL_TIMER
+    return _Timer(histogram, labels)
+
+
+def observe_etl_run(pipeline: str, rows: int, seconds: float) -> None:
+    if not registry.enabled:
+        return
+    etl_run_seconds.observe(seconds, pipeline=pipeline)
+    etl_rows_total.inc(rows, pipeline=pipeline)
+    etl_rows_per_second.set(rows / seconds if seconds > 0 else 0.0, pipeline=pipeline)
+
+
+def instrument_engine(engine: Any) -> None:
+    """Time every DBAPI execute on `engine` into `db_query_duration_seconds`."""
+    if not registry.enabled:
+        return
+    from sqlalchemy import event
+
+    # The start time lives on the statement's execution context, so a statement
+    # that raises (after_cursor_execute never fires) leaves nothing behind.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        if context is not None:
+            context.metrics_query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        started = getattr(context, "metrics_query_started", None)
+        if started is None:
+            return
+        keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_query_seconds.observe(time.perf_counter() - started, statement=keyword)
+
+
+def instrument_pool(engine: Any, name: str) -> None:
+    """Sample `engine`'s pool usage at scrape time under the `pool` label `name`."""
+    if not registry.enabled:
+        return
+    # Read engine.pool at scrape time: dispose() swaps in a fresh pool object.
+    db_pool_checked_out.set_function(lambda: engine.pool.checkedout(), pool=name)
+    db_pool_overflow.set_function(lambda: max(0, engine.pool.overflow()), pool=name)
+    db_pool_size.set_function(lambda: engine.pool.size(), pool=name)
+
+
+def _route_template(scope: dict) -> str:
+    """Matched route's path template including its router prefix, e.g. /orders/{id}.
+
+    Unmatched paths share one label so scanners cannot blow up cardinality.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Newer FastAPI resolves included routers lazily: `route` is then the router's
+    # own APIRoute, and the prefixed path is on the effective route it records.
+    effective = (scope.get("fastapi") or {}).get("effective_route_context")
+    return getattr(effective, "path", None) or template
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by its route template."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=_route_template(scope),
+                status=status["code"],
+            )
@@ -1,42 +1,1116 @@
-from datetime import datetime, timezone
+import base64
+import hashlib
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    ColumnElement,
+    and_,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session
 
-from app.db.models import Order
+from app.core.metrics import db_operation_seconds, order_writes_skipped_total, timed
+from app.db.models import (
+    InventoryItem,
+    InventorySnapshot,
+    JobRun,
+    Order,
+    OrderItem,
+    OrderItemsPending,
+    OrderMetricsHourly,
+    RunLog,
+    SyncState,
+)
+from app.db.types import CompressedJSON
 
+BULK_UPSERT_CHUNK_SIZE = 500
 
-def _parse_spapi_datetime(value: str | None) -> datetime | None:
+_UPSERT_COLUMNS = (
+    "marketplace_id",
+    "order_status",
+    "buyer",
+    "amount",
+    "cost",
+    "purchase_date",
+    "last_update_date",
+    "raw_payload",
+    "content_hash",
+    "synced_at",
+)
+# Filled in locally by the ETL (etl_orders.enrich_order_payload) rather than
+# sent by SP-API, so they are left out of the content hash.
+_LOCAL_PAYLOAD_KEYS = frozenset({"Buyer", "Amount", "Cost"})
+
+
+@dataclass
+class BulkUpsertResult:
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def upserted(self) -> int:
+        return len(self.created) + len(self.updated)
+
+
+def parse_spapi_datetime(value: str | None) -> datetime | None:
     if not value:
         return None
     normalized = value.replace("Z", "+00:00")
     return datetime.fromisoformat(normalized).astimezone(timezone.utc)
 
 
-def upsert_order(db: Session, order_payload: dict) -> tuple[Order, bool]:
+def order_content_hash(order_payload: dict) -> str:
+    """Digest of the SP-API fields of an order payload, independent of key order."""
+    normalized = {
+        key: value for key, value in order_payload.items() if key not in _LOCAL_PAYLOAD_KEYS
+    }
+    encoded = json.dumps(
+        normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _build_order_row(
+    order_payload: dict, synced_at: datetime, marketplace_id: str | None = None
+) -> dict:
+    return {
+        "amazon_order_id": order_payload["AmazonOrderId"],
+        "marketplace_id": order_payload.get("MarketplaceId") or marketplace_id,
+        "order_status": order_payload.get("OrderStatus"),
+        "buyer": order_payload.get("Buyer"),
+        "amount": order_payload.get("Amount"),
+        "cost": order_payload.get("Cost"),
+        "purchase_date": parse_spapi_datetime(order_payload.get("PurchaseDate")),
+        "last_update_date": parse_spapi_datetime(order_payload.get("LastUpdateDate")),
+        "raw_payload": order_payload,
+        "content_hash": order_content_hash(order_payload),
+        "synced_at": synced_at,
+    }
+
+
+@timed(db_operation_seconds, operation="upsert_order")
+def upsert_order(
+    db: Session, order_payload: dict, marketplace_id: str | None = None
+) -> tuple[Order, bool]:
     amazon_order_id = order_payload["AmazonOrderId"]
+    content_hash = order_content_hash(order_payload)
     existing = db.query(Order).filter(Order.amazon_order_id == amazon_order_id).one_or_none()
     created = existing is None
+    if existing is not None and existing.content_hash == content_hash:
+        order_writes_skipped_total.inc(operation="upsert_order")
+        return existing, False
 
     if existing is None:
         existing = Order(amazon_order_id=amazon_order_id, raw_payload=order_payload)
         db.add(existing)
 
+    existing.marketplace_id = order_payload.get("MarketplaceId") or marketplace_id
     existing.order_status = order_payload.get("OrderStatus")
     existing.buyer = order_payload.get("Buyer")
     existing.amount = order_payload.get("Amount")
     existing.cost = order_payload.get("Cost")
-    existing.purchase_date = _parse_spapi_datetime(order_payload.get("PurchaseDate"))
-    existing.last_update_date = _parse_spapi_datetime(order_payload.get("LastUpdateDate"))
+    existing.purchase_date = parse_spapi_datetime(order_payload.get("PurchaseDate"))
+    existing.last_update_date = parse_spapi_datetime(order_payload.get("LastUpdateDate"))
     existing.raw_payload = order_payload
+    existing.content_hash = content_hash
     existing.synced_at = datetime.utcnow()
     return existing, created
 
 
-def list_orders(db: Session, limit: int = 100) -> list[Order]:
-    return db.query(Order).order_by(Order.id.desc()).limit(limit).all()
+def _upsert_where(
+    stmt: postgresql.Insert | sqlite.Insert, skip_unchanged: bool
+) -> ColumnElement[bool] | None:
+    if not skip_unchanged:
+        return None
+    # Rows are filtered against the stored hashes before the statement; this
+    # guards against a concurrent writer storing the same content in between.
+    return Order.__table__.c.content_hash.is_distinct_from(stmt.excluded.content_hash)
+
+
+def _stored_content_hashes(db: Session, order_ids: list[str]) -> dict[str, str | None]:
+    return dict(
+        db.execute(
+            select(Order.amazon_order_id, Order.content_hash).where(
+                Order.amazon_order_id.in_(order_ids)
+            )
+        ).all()
+    )
+
+
+def _drop_unchanged(
+    rows: list[dict], stored: dict[str, str | None], result: BulkUpsertResult
+) -> list[dict]:
+    changed = [row for row in rows if stored.get(row["amazon_order_id"]) != row["content_hash"]]
+    result.unchanged += len(rows) - len(changed)
+    return changed
+
+
+def _bulk_upsert_chunk_postgresql(
+    db: Session,
+    rows: list[dict],
+    stored: dict[str, str | None],
+    result: BulkUpsertResult,
+    skip_unchanged: bool,
+) -> None:
+    stmt = postgresql.insert(Order.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Order.__table__.c.amazon_order_id],
+        set_={column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+        where=_upsert_where(stmt, skip_unchanged),
+    ).returning(
+        Order.__table__.c.amazon_order_id,
+        literal_column("(xmax = 0)").label("inserted"),
+    )
+
+    # xmax is 0 only for tuples written by this INSERT, so it separates new rows
+    # from conflict updates without a second round-trip. Conflicts filtered out by
+    # the WHERE clause return nothing, which is how unchanged rows are counted.
+    written = 0
+    for amazon_order_id, inserted in db.execute(stmt, rows):
+        (result.created if inserted else result.updated).append(amazon_order_id)
+        written += 1
+    result.unchanged += len(rows) - written
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _bulk_upsert_chunk_sqlite(
+    db: Session,
+    rows: list[dict],
+    stored: dict[str, str | None],
+    result: BulkUpsertResult,
+    skip_unchanged: bool,
+) -> None:
+    stmt = sqlite.insert(Order.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Order.__table__.c.amazon_order_id],
+        set_={column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+        where=_upsert_where(stmt, skip_unchanged),
+    )
+    db.execute(stmt, rows)
+
+    for row in rows:
+        amazon_order_id = row["amazon_order_id"]
+        (result.updated if amazon_order_id in stored else result.created).append(amazon_order_id)
+
+
+@timed(db_operation_seconds, operation="bulk_upsert_orders")
+def bulk_upsert_orders(
+    db: Session,
+    order_payloads: Iterable[dict],
+    chunk_size: int = BULK_UPSERT_CHUNK_SIZE,
+    skip_unchanged: bool = False,
+    marketplace_id: str | None = None,
+) -> BulkUpsertResult:
+    """Upsert orders with one set-based statement per chunk.
+
+    PostgreSQL uses ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``; other
+    dialects (SQLite) pre-select the existing keys of each chunk and then run the
+    same ``ON CONFLICT`` insert. With `skip_unchanged`, the stored content hashes
+    of each chunk are read in one query and rows whose hash matches are not
+    written at all, only counted as unchanged. `marketplace_id` is stored for
+    payloads that carry no MarketplaceId. The caller owns the transaction.
+    """
+    synced_at = datetime.utcnow()
+    # A payload repeated in one statement would make ON CONFLICT touch the same
+    # row twice, which PostgreSQL rejects; the last occurrence wins.
+    rows_by_id: dict[str, dict] = {}
+    for order_payload in order_payloads:
+        row = _build_order_row(order_payload, synced_at, marketplace_id)
+        rows_by_id[row["amazon_order_id"]] = row
+
+    is_postgresql = db.get_bind().dialect.name == "postgresql"
+    upsert_chunk = _bulk_upsert_chunk_postgresql if is_postgresql else _bulk_upsert_chunk_sqlite
+    rows = list(rows_by_id.values())
+    result = BulkUpsertResult()
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        stored = (
+            _stored_content_hashes(db, [row["amazon_order_id"] for row in chunk])
+            if skip_unchanged or not is_postgresql
+            else {}
+        )
+        if skip_unchanged:
+            chunk = _drop_unchanged(chunk, stored, result)
+        if chunk:
+            upsert_chunk(db, chunk, stored, result, skip_unchanged)
+    if result.unchanged:
+        order_writes_skipped_total.inc(result.unchanged, operation="bulk_upsert_orders")
+    return result
+
+
+def _copy_raw_payload(db: Session, payload: dict) -> str | bytes:
+    raw_type = Order.__table__.c.raw_payload.type
+    if isinstance(raw_type, CompressedJSON):
+        return raw_type.process_bind_param(payload, db.get_bind().dialect)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def _copy_merge_postgresql(db: Session, rows: list[dict], result: BulkUpsertResult) -> None:
+    columns = ("amazon_order_id",) + _UPSERT_COLUMNS
+    column_list = ", ".join(columns)
+    db.execute(
+        text(
+            "CREATE TEMP TABLE orders_backfill_stage ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM orders WITH NO DATA"
+        )
+    )
+    # The session's own psycopg connection, so COPY joins the open transaction.
+    driver_connection = db.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor, cursor.copy(
+        f"COPY orders_backfill_stage ({column_list}) FROM STDIN"
+    ) as copy:
+        for row in rows:
+            copy.write_row(
+                tuple(
+                    _copy_raw_payload(db, row[name]) if name == "raw_payload" else row[name]
+                    for name in columns
+                )
+            )
+
+    stage = table("orders_backfill_stage", *(column(name) for name in columns))
+    stmt = postgresql.insert(Order.__table__).from_select(columns, select(*stage.c))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Order.__table__.c.amazon_order_id],
+        set_={name: stmt.excluded[name] for name in _UPSERT_COLUMNS},
+        where=_upsert_where(stmt, skip_unchanged=True),
+    ).returning(
+        Order.__table__.c.amazon_order_id,
+        literal_column("(xmax = 0)").label("inserted"),
+    )
+    written = 0
+    for amazon_order_id, inserted in db.execute(stmt):
+        (result.created if inserted else result.updated).append(amazon_order_id)
+        written += 1
+    result.unchanged += len(rows) - written
+    db.execute(text("DROP TABLE orders_backfill_stage"))
+
+
+@timed(db_operation_seconds, operation="copy_merge_orders")
+def copy_merge_orders(
+    db: Session, order_payloads: Iterable[dict], marketplace_id: str | None = None
+) -> BulkUpsertResult:
+    """Load a large batch of orders in one merge, for backfills.
+
+    On PostgreSQL the rows are streamed with ``COPY`` into a temporary staging
+    table and merged with a single ``INSERT ... SELECT ... ON CONFLICT DO UPDATE``,
+    so the batch costs a handful of round-trips however large it is. Rows whose
+    content hash is already stored are dropped before the COPY. Other dialects
+    fall back to `bulk_upsert_orders`. The caller owns the transaction.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return bulk_upsert_orders(
+            db, order_payloads, skip_unchanged=True, marketplace_id=marketplace_id
+        )
+
+    synced_at = datetime.utcnow()
+    rows_by_id: dict[str, dict] = {}
+    for order_payload in order_payloads:
+        row = _build_order_row(order_payload, synced_at, marketplace_id)
+        rows_by_id[row["amazon_order_id"]] = row
+    result = BulkUpsertResult()
+    rows = _drop_unchanged(
+        list(rows_by_id.values()), _stored_content_hashes(db, list(rows_by_id)), result
+    )
+    if rows:
+        _copy_merge_postgresql(db, rows, result)
+    if result.unchanged:
+        order_writes_skipped_total.inc(result.unchanged, operation="copy_merge_orders")
+    return result
+
+
+def get_sync_watermark(db: Session, sync_key: str) -> datetime | None:
+    return db.scalar(select(SyncState.high_water_mark).where(SyncState.sync_key == sync_key))
+
+
+def advance_sync_watermark(db: Session, sync_key: str, high_water_mark: datetime) -> None:
+    """Move the stored mark forward to `high_water_mark`; it never moves back."""
+    state = db.query(SyncState).filter(SyncState.sync_key == sync_key).one_or_none()
+    if state is None:
+        db.add(SyncState(sync_key=sync_key, high_water_mark=high_water_mark))
+        return
+    current = state.high_water_mark
+    if current is None or _naive_utc(current) < _naive_utc(high_water_mark):
+        state.high_water_mark = high_water_mark
+
+
+def get_sync_checkpoint(db: Session, sync_key: str) -> str | None:
+    return db.scalar(select(SyncState.checkpoint).where(SyncState.sync_key == sync_key))
+
+
+def save_sync_checkpoint(db: Session, sync_key: str, checkpoint: str | None) -> None:
+    state = db.query(SyncState).filter(SyncState.sync_key == sync_key).one_or_none()
+    if state is None:
+        db.add(SyncState(sync_key=sync_key, checkpoint=checkpoint))
+    else:
+        state.checkpoint = checkpoint
+
+
+UNKNOWN_ORDER_STATUS = "Unknown"
+_HOUR = timedelta(hours=1)
+# pg_advisory_xact_lock key serializing writers of order_metrics_hourly.
+_ORDER_METRICS_LOCK_KEY = 7_210_001
+
+
+def _lock_order_metrics(db: Session) -> None:
+    """Hold the rollup lock until the caller's transaction ends (PostgreSQL only).
+
+    Without it, two transactions refreshing the same hour both delete the old
+    rows, each aggregates without the other's uncommitted orders, and the second
+    insert fails on (bucket_start, order_status) or the first one's counts win.
+    Once the lock is granted the aggregate runs on a fresh READ COMMITTED
+    snapshot, so it sees every order committed by the previous holder. SQLite
+    serializes writers on its database lock already.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ORDER_METRICS_LOCK_KEY}
+        )
+
+
+def truncate_to_hour(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _order_hour_bucket(dialect_name: str) -> ColumnElement:
+    if dialect_name == "postgresql":
+        return func.date_trunc("hour", func.timezone("UTC", Order.purchase_date))
+    return func.strftime("%Y-%m-%d %H:00:00", Order.purchase_date)
+
+
+def _as_datetime(value: datetime | str) -> datetime:
+    # SQLite's strftime() hands the bucket back as text.
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _bucket_ranges(buckets: list[datetime]) -> list[tuple[datetime, datetime]]:
+    """Merge sorted hour buckets into [start, end) ranges, splitting on gaps over a day."""
+    ranges: list[tuple[datetime, datetime]] = []
+    for bucket in buckets:
+        if ranges and bucket - ranges[-1][1] <= timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], bucket + _HOUR)
+        else:
+            ranges.append((bucket, bucket + _HOUR))
+    return ranges
+
+
+@timed(db_operation_seconds, operation="refresh_order_metrics")
+def refresh_order_metrics(db: Session, purchase_dates: Iterable[datetime | None]) -> int:
+    """Recompute the hourly rollup rows for the hours touched by `purchase_dates`.
+
+    Called with the purchase dates of each written batch, so the rollup follows
+    the orders table incrementally; only the affected hours are re-aggregated.
+    Returns the number of hour buckets refreshed. The caller owns the transaction
+    and should commit soon after: the rollup lock is held until it ends.
+    """
+    buckets = sorted({truncate_to_hour(value) for value in purchase_dates if value is not None})
+    if not buckets:
+        return 0
+
+    _lock_order_metrics(db)
+    wanted = set(buckets)
+    db.execute(delete(OrderMetricsHourly).where(OrderMetricsHourly.bucket_start.in_(buckets)))
+
+    hour_bucket = _order_hour_bucket(db.get_bind().dialect.name).label("bucket_start")
+    updated_at = datetime.utcnow()
+    rollup_rows: list[dict] = []
+    for range_start, range_end in _bucket_ranges(buckets):
+        aggregates = db.execute(
+            select(
+                hour_bucket,
+                Order.order_status,
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.amount), 0.0),
+                func.coalesce(func.sum(Order.cost), 0.0),
+            )
+            .where(Order.purchase_date >= range_start, Order.purchase_date < range_end)
+            .group_by(hour_bucket, Order.order_status)
+        )
+        for bucket_start, order_status, order_count, revenue, cost in aggregates:
+            bucket_start = truncate_to_hour(_as_datetime(bucket_start))
+            if bucket_start not in wanted:
+                continue
+            rollup_rows.append(
+                {
+                    "bucket_start": bucket_start,
+                    "order_status": order_status or UNKNOWN_ORDER_STATUS,
+                    "order_count": order_count,
+                    "revenue": float(revenue),
+                    "cost": float(cost),
+                    "updated_at": updated_at,
+                }
+            )
+
+    if rollup_rows:
+        db.execute(OrderMetricsHourly.__table__.insert(), _merge_status_rows(rollup_rows))
+    return len(buckets)
+
+
+def _merge_status_rows(rows: list[dict]) -> list[dict]:
+    # NULL and "Unknown" statuses both land in the "Unknown" bucket row.
+    merged: dict[tuple[datetime, str], dict] = {}
+    for row in rows:
+        key = (row["bucket_start"], row["order_status"])
+        if key in merged:
+            merged[key]["order_count"] += row["order_count"]
+            merged[key]["revenue"] += row["revenue"]
+            merged[key]["cost"] += row["cost"]
+        else:
+            merged[key] = row
+    return list(merged.values())
+
+
+@timed(db_operation_seconds, operation="rebuild_order_metrics")
+def rebuild_order_metrics(db: Session) -> int:
+    """Rebuild the whole hourly rollup from the orders table."""
+    _lock_order_metrics(db)
+    db.execute(delete(OrderMetricsHourly))
+    hour_bucket = _order_hour_bucket(db.get_bind().dialect.name)
+    buckets = [
+        _as_datetime(bucket)
+        for bucket in db.scalars(
+            select(hour_bucket).where(Order.purchase_date.is_not(None)).distinct()
+        )
+    ]
+    return refresh_order_metrics(db, buckets)
+
+
+def list_order_metrics(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    status: str | None = None,
+) -> list[OrderMetricsHourly]:
+    query = db.query(OrderMetricsHourly).filter(
+        OrderMetricsHourly.bucket_start >= start, OrderMetricsHourly.bucket_start < end
+    )
+    if status:
+        query = query.filter(OrderMetricsHourly.order_status == status)
+    return query.order_by(OrderMetricsHourly.bucket_start).all()
+
+
+def create_job_run(db: Session, job_id: str, job_name: str, trigger: str) -> JobRun:
+    job_run = JobRun(job_id=job_id, job_name=job_name, trigger=trigger, status="queued")
+    db.add(job_run)
+    db.commit()
+    return job_run
+
+
+def get_job_run(db: Session, job_id: str) -> JobRun | None:
+    return db.query(JobRun).filter(JobRun.job_id == job_id).one_or_none()
+
+
+def cancel_queued_job_runs(db: Session, job_ids: Iterable[str], reason: str) -> int:
+    """Mark runs that never started as `cancelled`; runs already picked up are left alone."""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return 0
+    cancelled = (
+        db.query(JobRun)
+        .filter(JobRun.job_id.in_(job_ids), JobRun.status == "queued")
+        .update(
+            {"status": "cancelled", "error": reason, "finished_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return cancelled
+
+
+OrderCursor = tuple[datetime | None, int]
+
+ORDER_SUMMARY_COLUMNS = (
+    Order.id,
+    Order.amazon_order_id,
+    Order.marketplace_id,
+    Order.order_status,
+    Order.purchase_date,
+    Order.last_update_date,
+    Order.synced_at,
+    Order.buyer,
+    Order.amount,
+    Order.cost,
+)
+
+
+def _encode_cursor(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> str:
+    return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+
+
+def encode_order_cursor(order: Order | Row) -> str:
+    purchase_date = order.purchase_date.isoformat() if order.purchase_date else ""
+    return _encode_cursor(f"{purchase_date}|{order.id}")
+
+
+def decode_order_cursor(cursor: str) -> OrderCursor:
+    """Inverse of `encode_order_cursor`; raises ValueError for a malformed cursor."""
+    try:
+        purchase_date, order_id = _decode_cursor(cursor).rsplit("|", 1)
+        return (datetime.fromisoformat(purchase_date) if purchase_date else None, int(order_id))
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid order cursor: {cursor!r}") from exc
+
+
+def _filtered_orders_query(
+    db: Session,
+    status: str | None = None,
+    buyer: str | None = None,
+    purchased_from: datetime | None = None,
+    purchased_to: datetime | None = None,
+    include_raw: bool = False,
+    marketplace_id: str | None = None,
+) -> Query:
+    columns = ORDER_SUMMARY_COLUMNS + ((Order.raw_payload,) if include_raw else ())
+    query = db.query(*columns)
+    if status:
+        query = query.filter(Order.order_status == status)
+    if buyer:
+        query = query.filter(Order.buyer == buyer)
+    if marketplace_id:
+        query = query.filter(Order.marketplace_id == marketplace_id)
+    if purchased_from:
+        query = query.filter(Order.purchase_date >= purchased_from)
+    if purchased_to:
+        query = query.filter(Order.purchase_date < purchased_to)
+    return query
+
+
+@timed(db_operation_seconds, operation="list_orders")
+def list_orders(
+    db: Session,
+    limit: int = 100,
+    after: OrderCursor | None = None,
+    status: str | None = None,
+    buyer: str | None = None,
+    purchased_from: datetime | None = None,
+    purchased_to: datetime | None = None,
+    include_raw: bool = False,
+    marketplace_id: str | None = None,
+) -> list[Row]:
+    """Return one page ordered by ``(purchase_date DESC NULLS FIRST, id DESC)``.
+
+    `after` is the position of the last row of the previous page; the next page
+    is a range scan on the composite indexes, so deep pages cost the same as the
+    first one. Rows are plain tuples of the summary columns; the raw_payload
+    document is only read (and decoded) when `include_raw` is set.
+    """
+    query = _filtered_orders_query(
+        db,
+        status=status,
+        buyer=buyer,
+        purchased_from=purchased_from,
+        purchased_to=purchased_to,
+        include_raw=include_raw,
+        marketplace_id=marketplace_id,
+    )
+    if after is not None:
+        after_purchase_date, after_id = after
+        if after_purchase_date is None:
+            query = query.filter(
+                or_(
+                    and_(Order.purchase_date.is_(None), Order.id < after_id),
+                    Order.purchase_date.is_not(None),
+                )
+            )
+        else:
+            query = query.filter(
+                tuple_(Order.purchase_date, Order.id) < tuple_(after_purchase_date, after_id)
+            )
+
+    return (
+        query.order_by(Order.purchase_date.desc().nullsfirst(), Order.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def stream_orders(db: Session, chunk_size: int = 2000, **filters: object) -> Iterator[list[Row]]:
+    """Yield every order matching `filters` (see `list_orders`) in chunks of `chunk_size`.
+
+    The query runs once on a server-side cursor (a named cursor on PostgreSQL), so
+    only one chunk is held in memory and the export reads a single consistent
+    snapshot however many rows it spans.
+    """
+    query = _filtered_orders_query(db, **filters).order_by(
+        Order.purchase_date.desc().nullsfirst(), Order.id.desc()
+    )
+    result = db.execute(query.statement.execution_options(yield_per=chunk_size))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+
+def _money_amount(value: dict | None) -> float | None:
+    if not value or value.get("Amount") in (None, ""):
+        return None
+    return float(value["Amount"])
+
+
+def _build_order_item_row(
+    amazon_order_id: str,
+    item: dict,
+    order_last_update_date: datetime | None,
+    synced_at: datetime,
+) -> dict:
+    return {
+        "amazon_order_id": amazon_order_id,
+        "order_item_id": item["OrderItemId"],
+        "seller_sku": item.get("SellerSKU"),
+        "asin": item.get("ASIN"),
+        "title": item.get("Title"),
+        "quantity_ordered": item.get("QuantityOrdered") or 0,
+        "quantity_shipped": item.get("QuantityShipped") or 0,
+        "currency": (item.get("ItemPrice") or {}).get("CurrencyCode"),
+        "item_price": _money_amount(item.get("ItemPrice")),
+        "item_tax": _money_amount(item.get("ItemTax")),
+        "promotion_discount": _money_amount(item.get("PromotionDiscount")),
+        "order_last_update_date": order_last_update_date,
+        "synced_at": synced_at,
+    }
+
+
+def orders_needing_items(
+    db: Session, last_update_dates: dict[str, datetime | None]
+) -> dict[str, datetime | None]:
+    """Orders of `last_update_dates` (id -> LastUpdateDate) lacking items at that date.
+
+    Checked with one query for the whole batch.
+    """
+    if not last_update_dates:
+        return {}
+    stored = dict(
+        db.execute(
+            select(OrderItem.amazon_order_id, OrderItem.order_last_update_date)
+            .where(OrderItem.amazon_order_id.in_(list(last_update_dates)))
+            .distinct()
+        ).all()
+    )
+    return {
+        amazon_order_id: last_update
+        for amazon_order_id, last_update in last_update_dates.items()
+        if amazon_order_id not in stored
+        or _naive_utc(stored[amazon_order_id]) != _naive_utc(last_update)
+    }
+
+
+@timed(db_operation_seconds, operation="replace_order_items")
+def replace_order_items(
+    db: Session,
+    items_by_order: dict[str, list[dict]],
+    last_update_dates: dict[str, datetime | None],
+) -> int:
+    """Replace the stored items of every order in `items_by_order`.
+
+    One DELETE and one multi-row INSERT for the whole batch; each row records the
+    order's LastUpdateDate it was fetched at. The caller commits.
+    """
+    if not items_by_order:
+        return 0
+    db.execute(delete(OrderItem).where(OrderItem.amazon_order_id.in_(list(items_by_order))))
+    synced_at = datetime.utcnow()
+    rows = [
+        _build_order_item_row(
+            amazon_order_id, item, last_update_dates.get(amazon_order_id), synced_at
+        )
+        for amazon_order_id, items in items_by_order.items()
+        for item in items
+    ]
+    if rows:
+        db.execute(insert(OrderItem.__table__), rows)
+    return len(rows)
+
+
+def failed_order_items(
+    db: Session, account: str, marketplace_id: str, limit: int
+) -> dict[str, datetime | None]:
+    """Up to `limit` orders of the account/marketplace whose items fetch failed, oldest first."""
+    return dict(
+        db.execute(
+            select(OrderItemsPending.amazon_order_id, OrderItemsPending.order_last_update_date)
+            .where(
+                OrderItemsPending.account == account,
+                OrderItemsPending.marketplace_id == marketplace_id,
+            )
+            .order_by(OrderItemsPending.updated_at, OrderItemsPending.id)
+            .limit(limit)
+        ).all()
+    )
+
+
+def record_order_items_results(
+    db: Session,
+    fetched_ids: Iterable[str],
+    failed: dict[str, datetime | None],
+    account: str,
+    marketplace_id: str,
+) -> None:
+    """Clear the pending marker of fetched orders and set or bump it for failed ones.
+
+    The caller commits.
+    """
+    fetched_ids = list(fetched_ids)
+    if fetched_ids:
+        db.execute(
+            delete(OrderItemsPending).where(OrderItemsPending.amazon_order_id.in_(fetched_ids))
+        )
+    if not failed:
+        return
+    existing = {
+        row.amazon_order_id: row
+        for row in db.scalars(
+            select(OrderItemsPending).where(OrderItemsPending.amazon_order_id.in_(list(failed)))
+        )
+    }
+    now = datetime.utcnow()
+    for amazon_order_id, last_update in failed.items():
+        row = existing.get(amazon_order_id)
+        if row is None:
+            db.add(
+                OrderItemsPending(
+                    amazon_order_id=amazon_order_id,
+                    account=account,
+                    marketplace_id=marketplace_id,
+                    order_last_update_date=last_update,
+                    attempts=1,
+                    updated_at=now,
+                )
+            )
+        else:
+            row.order_last_update_date = last_update
+            row.attempts += 1
+            row.updated_at = now
 
 
 def delete_all_orders(db: Session) -> int:
     deleted_count = db.query(Order).delete(synchronize_session=False)
+    db.query(OrderItem).delete(synchronize_session=False)
+    db.query(OrderItemsPending).delete(synchronize_session=False)
+    db.query(OrderMetricsHourly).delete(synchronize_session=False)
     db.commit()
     return deleted_count
+
+
+@dataclass
+class InventoryLoadResult:
+    items: int = 0
+    created: int = 0
+    changed: int = 0
+    snapshots: int = 0
+
+    @property
+    def unchanged(self) -> int:
+        return self.items - self.created - self.changed
+
+
+_INVENTORY_QUANTITY_COLUMNS = (
+    "fulfillable_quantity",
+    "inbound_quantity",
+    "reserved_quantity",
+    "unfulfillable_quantity",
+)
+_INVENTORY_UPSERT_COLUMNS = (
+    "asin",
+    "fn_sku",
+    "product_name",
+    "condition",
+    *_INVENTORY_QUANTITY_COLUMNS,
+    "total_quantity",
+    "last_updated_time",
+    "synced_at",
+)
+_SNAPSHOT_COLUMNS = ("inventory_item_id", "captured_at", *_INVENTORY_QUANTITY_COLUMNS)
+
+
+def _build_inventory_row(summary: dict, marketplace_id: str, synced_at: datetime) -> dict:
+    details = summary.get("inventoryDetails") or {}
+    return {
+        "marketplace_id": marketplace_id,
+        "seller_sku": summary["sellerSku"],
+        "asin": summary.get("asin"),
+        "fn_sku": summary.get("fnSku"),
+        "product_name": summary.get("productName"),
+        "condition": summary.get("condition"),
+        "fulfillable_quantity": details.get("fulfillableQuantity") or 0,
+        "inbound_quantity": sum(
+            details.get(key) or 0
+            for key in (
+                "inboundWorkingQuantity",
+                "inboundShippedQuantity",
+                "inboundReceivingQuantity",
+            )
+        ),
+        "reserved_quantity": (details.get("reservedQuantity") or {}).get(
+            "totalReservedQuantity"
+        )
+        or 0,
+        "unfulfillable_quantity": (details.get("unfulfillableQuantity") or {}).get(
+            "totalUnfulfillableQuantity"
+        )
+        or 0,
+        "total_quantity": summary.get("totalQuantity") or 0,
+        "last_updated_time": parse_spapi_datetime(summary.get("lastUpdatedTime") or None),
+        "synced_at": synced_at,
+    }
+
+
+def insert_inventory_snapshots(db: Session, rows: list[dict]) -> int:
+    """Append snapshot rows: COPY on PostgreSQL, one executemany elsewhere."""
+    if not rows:
+        return 0
+    if db.get_bind().dialect.name == "postgresql":
+        # The session's own psycopg connection, so COPY joins the open transaction.
+        driver_connection = db.connection().connection.driver_connection
+        statement = f"COPY inventory_snapshots ({', '.join(_SNAPSHOT_COLUMNS)}) FROM STDIN"
+        with driver_connection.cursor() as cursor, cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row(tuple(row[column] for column in _SNAPSHOT_COLUMNS))
+    else:
+        db.execute(insert(InventorySnapshot.__table__), rows)
+    return len(rows)
+
+
+@timed(db_operation_seconds, operation="load_inventory_summaries")
+def load_inventory_summaries(
+    db: Session,
+    marketplace_id: str,
+    summaries: list[dict],
+    captured_at: datetime | None = None,
+) -> InventoryLoadResult:
+    """Upsert one batch of FBA inventory summaries into `inventory_items`.
+
+    Existing quantities are read with a single query per batch; items that are
+    new or whose quantities moved get a row in `inventory_snapshots`. The caller
+    commits.
+    """
+    captured_at = captured_at or datetime.utcnow()
+    rows = list(
+        {
+            row["seller_sku"]: row
+            for row in (
+                _build_inventory_row(summary, marketplace_id, captured_at)
+                for summary in summaries
+            )
+        }.values()
+    )
+    result = InventoryLoadResult(items=len(rows))
+    if not rows:
+        return result
+
+    table = InventoryItem.__table__
+    skus = [row["seller_sku"] for row in rows]
+    existing = {
+        sku: (item_id, quantities)
+        for sku, item_id, *quantities in db.execute(
+            select(
+                table.c.seller_sku,
+                table.c.id,
+                *(table.c[column] for column in _INVENTORY_QUANTITY_COLUMNS),
+            ).where(table.c.marketplace_id == marketplace_id, table.c.seller_sku.in_(skus))
+        )
+    }
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.marketplace_id, table.c.seller_sku],
+        set_={column: stmt.excluded[column] for column in _INVENTORY_UPSERT_COLUMNS},
+    )
+    db.execute(stmt, rows)
+
+    moved: dict[str, dict] = {}
+    for row in rows:
+        previous = existing.get(row["seller_sku"])
+        if previous is None:
+            result.created += 1
+        elif list(previous[1]) != [row[column] for column in _INVENTORY_QUANTITY_COLUMNS]:
+            result.changed += 1
+        else:
+            continue
+        moved[row["seller_sku"]] = row
+
+    new_skus = [sku for sku in moved if sku not in existing]
+    item_ids = {sku: item_id for sku, (item_id, _) in existing.items()}
+    if new_skus:
+        item_ids.update(
+            db.execute(
+                select(table.c.seller_sku, table.c.id).where(
+                    table.c.marketplace_id == marketplace_id, table.c.seller_sku.in_(new_skus)
+                )
+            ).all()
+        )
+
+    result.snapshots = insert_inventory_snapshots(
+        db,
+        [
+            {
+                "inventory_item_id": item_ids[sku],
+                "captured_at": captured_at,
+                **{column: row[column] for column in _INVENTORY_QUANTITY_COLUMNS},
+            }
+            for sku, row in moved.items()
+        ],
+    )
+    return result
+
+
+InventoryCursor = tuple[int, int]
+
+
+def encode_inventory_cursor(item: InventoryItem | Row) -> str:
+    return _encode_cursor(f"{item.fulfillable_quantity}|{item.id}")
+
+
+def decode_inventory_cursor(cursor: str) -> InventoryCursor:
+    """Inverse of `encode_inventory_cursor`; raises ValueError for a malformed cursor."""
+    try:
+        quantity, item_id = _decode_cursor(cursor).split("|")
+        return int(quantity), int(item_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid inventory cursor: {cursor!r}") from exc
+
+
+@timed(db_operation_seconds, operation="list_inventory_items")
+def list_inventory_items(
+    db: Session,
+    limit: int = 100,
+    after: InventoryCursor | None = None,
+    marketplace_id: str | None = None,
+    max_fulfillable: int | None = None,
+) -> list[InventoryItem]:
+    """Return one page of current stock, lowest fulfillable quantity first.
+
+    Reads `inventory_items` only; pages on ``(fulfillable_quantity, id)`` so a
+    low-stock filter and the next page are both index range scans.
+    """
+    query = db.query(InventoryItem)
+    if marketplace_id:
+        query = query.filter(InventoryItem.marketplace_id == marketplace_id)
+    if max_fulfillable is not None:
+        query = query.filter(InventoryItem.fulfillable_quantity <= max_fulfillable)
+    if after is not None:
+        query = query.filter(
+            tuple_(InventoryItem.fulfillable_quantity, InventoryItem.id) > tuple_(*after)
+        )
+    return (
+        query.order_by(InventoryItem.fulfillable_quantity, InventoryItem.id).limit(limit).all()
+    )
+
+
+def list_inventory_snapshots(
+    db: Session, inventory_item_id: int, since: datetime | None = None
+) -> list[InventorySnapshot]:
+    query = db.query(InventorySnapshot).filter(
+        InventorySnapshot.inventory_item_id == inventory_item_id
+    )
+    if since is not None:
+        query = query.filter(InventorySnapshot.captured_at >= since)
+    return query.order_by(InventorySnapshot.captured_at).all()
+
+
+def insert_run_logs(db: Session, entries: list[dict]) -> int:
+    if entries:
+        db.execute(insert(RunLog.__table__), entries)
+    return len(entries)
+
+
+@timed(db_operation_seconds, operation="prune_run_logs")
+def prune_run_logs(db: Session, older_than: datetime, batch_size: int = 5000) -> int:
+    """Delete run logs created before `older_than`, `batch_size` rows per statement.
+
+    Small batches keep each delete short so concurrent log writes never wait on
+    one long-running purge. The caller commits.
+    """
+    deleted = 0
+    while True:
+        expired_ids = (
+            select(RunLog.id)
+            .where(RunLog.created_at < older_than)
+            .order_by(RunLog.created_at, RunLog.id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        count = db.execute(
+            delete(RunLog).where(RunLog.id.in_(expired_ids)).execution_options(
+                synchronize_session=False
+            )
+        ).rowcount
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+
+RunLogCursor = tuple[datetime, int]
+
+
+def encode_run_log_cursor(entry: RunLog) -> str:
+    return _encode_cursor(f"{entry.created_at.isoformat()}|{entry.id}")
+
+
+def decode_run_log_cursor(cursor: str) -> RunLogCursor:
+    """Inverse of `encode_run_log_cursor`; raises ValueError for a malformed cursor."""
+    try:
+        created_at, entry_id = _decode_cursor(cursor).rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid log cursor: {cursor!r}") from exc
+
+
+@timed(db_operation_seconds, operation="list_run_logs")
+def list_run_logs(
+    db: Session,
+    limit: int = 100,
+    after: RunLogCursor | None = None,
+    kind: str | None = None,
+    name: str | None = None,
+    status: str | None = None,
+    account: str | None = None,
+    marketplace_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[RunLog]:
+    """Return one page of run logs, newest first, paged on ``(created_at, id)``."""
+    query = db.query(RunLog)
+    if kind:
+        query = query.filter(RunLog.kind == kind)
+    if name:
+        query = query.filter(RunLog.name == name)
+    if status:
+        query = query.filter(RunLog.status == status)
+    if account:
+        query = query.filter(RunLog.account == account)
+    if marketplace_id:
+        query = query.filter(RunLog.marketplace_id == marketplace_id)
+    if since:
+        query = query.filter(RunLog.created_at >= since)
+    if until:
+        query = query.filter(RunLog.created_at < until)
+    if after is not None:
+        query = query.filter(tuple_(RunLog.created_at, RunLog.id) < tuple_(*after))
+    return query.order_by(RunLog.created_at.desc(), RunLog.id.desc()).limit(limit).all()
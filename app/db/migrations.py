@@ -0,0 +1,234 @@
+"""
+Versioned schema migrations.
+The applied version lives in the one-row `schema_version` table. `migrate()`
+runs in a single transaction under a lock (PostgreSQL transaction advisory lock,
+in-process lock elsewhere), applies every step of `MIGRATIONS` above the stored
+version in order and stores the new version, so replicas migrating at once
+apply each step exactly once. An empty database gets the current models from
+`create_all` and is stamped with the latest version. App startup only runs
+`check_schema_version()`: the version SELECT plus a look at the column type
+of `orders.raw_payload`, which RAW_PAYLOAD_STORAGE must still match.
+
+    python -m app.db.migrations            # upgrade to the latest version
+    python -m app.db.migrations current    # print the stored and latest version
+
+New steps are appended to `MIGRATIONS` with the next version number and plain
+DDL; the models must already describe the resulting schema.
+"""
+
+import argparse
+import hashlib
+import logging
+import sys
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Connection, inspect, select, text, update
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.core.config import settings
+from app.db.models import OrderItem, OrderItemsPending, SchemaVersion
+from app.db.session import Base, engine
+from app.db.types import effective_raw_payload_storage, stored_raw_payload_storage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+# Tables that existed when versioning was introduced; later ones have their own step.
+_BASELINE_TABLES = (
+    "orders",
+    "sync_state",
+    "job_runs",
+    "order_metrics_hourly",
+    "inventory_items",
+    "inventory_snapshots",
+    "run_logs",
+)
+
+
+def _baseline(connection: Connection) -> None:
+    """Bring a database created by the old startup-time `create_all` up to date.
+
+    Such databases may predate any of the columns and indexes added since, so
+    this step inspects what exists instead of assuming a fixed starting point.
+    """
+    Base.metadata.create_all(
+        connection,
+        tables=[Base.metadata.tables[name] for name in _BASELINE_TABLES],
+    )
+    inspector = inspect(connection)
+    float_type = "DOUBLE PRECISION" if connection.dialect.name == "postgresql" else "FLOAT"
+    added_columns = {
+        "orders": {
+            "buyer": "VARCHAR(100)",
+            "amount": float_type,
+            "cost": float_type,
+            "marketplace_id": "VARCHAR(20)",
+            "content_hash": "VARCHAR(32)",
+        },
+        "sync_state": {"checkpoint": "VARCHAR(255)"},
+    }
+    for table_name, columns in added_columns.items():
+        existing_columns = {column["name"] for column in inspector.get_columns(table_name)}
+        for name, column_type in columns.items():
+            if name not in existing_columns:
+                connection.execute(
+                    text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}")
+                )
+
+    # create_all only builds indexes together with a new table, so indexes
+    # added to an existing orders table are created here.
+    for index in Base.metadata.tables["orders"].indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _create_order_items(connection: Connection) -> None:
+    OrderItem.__table__.create(connection, checkfirst=True)
+
+
+def _create_order_items_pending(connection: Connection) -> None:
+    OrderItemsPending.__table__.create(connection, checkfirst=True)
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "baseline: tables, orders/sync_state columns and orders indexes", _baseline),
+    Migration(2, "order_items table", _create_order_items),
+    Migration(3, "order_items_pending table", _create_order_items_pending),
+)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+_LOCK_KEY = int.from_bytes(hashlib.sha256(b"schema_migrations").digest()[:8], "big", signed=True)
+_local_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_transaction() -> Iterator[Connection]:
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Held until commit; a second migrator waits here, then reads the new version.
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+            yield connection
+        else:
+            with _local_lock:
+                yield connection
+
+
+def _stored_version(connection: Connection) -> int | None:
+    if not connection.dialect.has_table(connection, SchemaVersion.__tablename__):
+        return None
+    return connection.scalar(select(SchemaVersion.version).where(SchemaVersion.id == 1))
+
+
+def _store_version(connection: Connection, version: int) -> None:
+    table = SchemaVersion.__table__
+    now = datetime.utcnow()
+    updated = connection.execute(
+        update(table).where(table.c.id == 1).values(version=version, updated_at=now)
+    )
+    if not updated.rowcount:
+        connection.execute(table.insert().values(id=1, version=version, updated_at=now))
+
+
+def migrate() -> tuple[int, int]:
+    """Apply pending migrations; returns the (previous, current) schema version."""
+    with _locked_transaction() as connection:
+        stored = _stored_version(connection)
+        if stored is None and not connection.dialect.has_table(connection, "orders"):
+            Base.metadata.create_all(connection)
+            _store_version(connection, LATEST_VERSION)
+            logger.info("Created schema at version %s", LATEST_VERSION)
+            return 0, LATEST_VERSION
+
+        previous = current = stored or 0
+        if stored is None:
+            # Tables exist but were never versioned: created by the old startup hook.
+            SchemaVersion.__table__.create(connection, checkfirst=True)
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            logger.info("Applying migration %s: %s", migration.version, migration.description)
+            migration.apply(connection)
+            current = migration.version
+        if current != stored:
+            _store_version(connection, current)
+        return previous, current
+
+
+def get_schema_version() -> int | None:
+    try:
+        with engine.connect() as connection:
+            return connection.scalar(
+                select(SchemaVersion.version).where(SchemaVersion.id == 1)
+            )
+    except (OperationalError, ProgrammingError):
+        # No schema_version table yet.
+        return None
+
+
+def check_raw_payload_storage() -> None:
+    """Raise RuntimeError if RAW_PAYLOAD_STORAGE differs from the `orders.raw_payload` column.
+
+    The setting only applies when the table is created. A changed value would
+    otherwise write one format into a column holding another (e.g. zlib bytes
+    into JSON) and fail on the first sync, or misread existing rows.
+    """
+    with engine.connect() as connection:
+        columns = inspect(connection).get_columns("orders")
+        dialect_name = connection.dialect.name
+    column_type = next(column["type"] for column in columns if column["name"] == "raw_payload")
+    stored = stored_raw_payload_storage(column_type)
+    configured = effective_raw_payload_storage(settings.raw_payload_storage, dialect_name)
+    if stored is None:
+        logger.warning("Unrecognised orders.raw_payload column type %s", column_type)
+    elif stored != configured:
+        raise RuntimeError(
+            f"orders.raw_payload is stored as {stored} ({column_type}) but "
+            f"RAW_PAYLOAD_STORAGE={settings.raw_payload_storage}; set "
+            f"RAW_PAYLOAD_STORAGE={stored} or convert the column first"
+        )
+
+
+def check_schema_version() -> int:
+    """Raise RuntimeError unless migrations are applied and RAW_PAYLOAD_STORAGE fits."""
+    version = get_schema_version()
+    if version is None or version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version or 0}, this build needs "
+            f"{LATEST_VERSION}; run `python -m app.db.migrations` first"
+        )
+    if version > LATEST_VERSION:
+        logger.warning(
+            "Database schema version %s is newer than this build (%s)", version, LATEST_VERSION
+        )
+    check_raw_payload_storage()
+    return version
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.db.migrations", description="Apply database schema migrations."
+    )
+    parser.add_argument("command", nargs="?", choices=("upgrade", "current"), default="upgrade")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "current":
+        print(f"current={get_schema_version() or 0} latest={LATEST_VERSION}")
+        return 0
+    previous, current = migrate()
+    print(f"schema version {previous} -> {current}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,43 @@
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, Float, Integer, String
+from sqlalchemy import JSON, DateTime, Float, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.core.config import settings
 from app.db.session import Base
+from app.db.types import raw_payload_type
 
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination walks (purchase_date, id) backwards; INCLUDE lets
+        # PostgreSQL answer list pages from the index alone.
+        Index(
+            "ix_orders_purchase_date_id",
+            "purchase_date",
+            "id",
+            postgresql_include=[
+                "amazon_order_id",
+                "marketplace_id",
+                "order_status",
+                "buyer",
+                "amount",
+                "cost",
+                "last_update_date",
+                "synced_at",
+            ],
+        ),
+        Index("ix_orders_status_purchase_date_id", "order_status", "purchase_date", "id"),
+        Index("ix_orders_buyer_purchase_date_id", "buyer", "purchase_date", "id"),
+        Index(
+            "ix_orders_marketplace_purchase_date_id", "marketplace_id", "purchase_date", "id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     amazon_order_id: Mapped[str] = mapped_column(String(30), unique=True, index=True)
+    marketplace_id: Mapped[str | None] = mapped_column(String(20), nullable=True)
     order_status: Mapped[str | None] = mapped_column(String(50), nullable=True)
     buyer: Mapped[str | None] = mapped_column(String(100), nullable=True)
     amount: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -19,5 +46,192 @@ class Order(Base):
     last_update_date: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
-    raw_payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    raw_payload: Mapped[dict] = mapped_column(
+        raw_payload_type(settings.raw_payload_storage), nullable=False
+    )
+    # Digest of the SP-API fields of raw_payload (crud.order_content_hash); a sync
+    # whose payload hashes the same skips the write.
+    content_hash: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class OrderItem(Base):
+    """Line item of an order from getOrderItems, replaced whenever the order is refetched."""
+
+    __tablename__ = "order_items"
+    __table_args__ = (UniqueConstraint("amazon_order_id", "order_item_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    amazon_order_id: Mapped[str] = mapped_column(String(30), index=True)
+    order_item_id: Mapped[str] = mapped_column(String(50))
+    seller_sku: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+    asin: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    title: Mapped[str | None] = mapped_column(Text, nullable=True)
+    quantity_ordered: Mapped[int] = mapped_column(Integer, default=0)
+    quantity_shipped: Mapped[int] = mapped_column(Integer, default=0)
+    currency: Mapped[str | None] = mapped_column(String(3), nullable=True)
+    item_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    item_tax: Mapped[float | None] = mapped_column(Float, nullable=True)
+    promotion_discount: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # LastUpdateDate of the order when these items were fetched; an order seen
+    # again with the same value is not refetched.
+    order_last_update_date: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class OrderItemsPending(Base):
+    """Order whose getOrderItems call failed; the next sync of its account retries it.
+
+    Without this, an order that does not change again is never refetched, since
+    only created or changed orders are checked for items.
+    """
+
+    __tablename__ = "order_items_pending"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    amazon_order_id: Mapped[str] = mapped_column(String(30), unique=True, index=True)
+    account: Mapped[str] = mapped_column(String(50))
+    marketplace_id: Mapped[str] = mapped_column(String(20))
+    order_last_update_date: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=1)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    sync_key: Mapped[str] = mapped_column(String(100), unique=True, index=True)
+    high_water_mark: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Free-form resume position for jobs that are not driven by a timestamp (backfills).
+    checkpoint: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class JobRun(Base):
+    __tablename__ = "job_runs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(String(36), unique=True, index=True)
+    job_name: Mapped[str] = mapped_column(String(50), index=True)
+    trigger: Mapped[str] = mapped_column(String(20))
+    status: Mapped[str] = mapped_column(String(20))
+    enqueued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    duration_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class OrderMetricsHourly(Base):
+    __tablename__ = "order_metrics_hourly"
+    __table_args__ = (UniqueConstraint("bucket_start", "order_status"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    order_status: Mapped[str] = mapped_column(String(50))
+    order_count: Mapped[int] = mapped_column(Integer, default=0)
+    revenue: Mapped[float] = mapped_column(Float, default=0.0)
+    cost: Mapped[float] = mapped_column(Float, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class InventoryItem(Base):
+    """Current FBA stock level per (marketplace, seller SKU); one row per SKU."""
+
+    __tablename__ = "inventory_items"
+    __table_args__ = (
+        UniqueConstraint("marketplace_id", "seller_sku"),
+        # /inventory lists lowest stock first and pages on (fulfillable_quantity, id).
+        Index("ix_inventory_items_fulfillable_id", "fulfillable_quantity", "id"),
+        Index(
+            "ix_inventory_items_marketplace_fulfillable_id",
+            "marketplace_id",
+            "fulfillable_quantity",
+            "id",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    marketplace_id: Mapped[str] = mapped_column(String(20))
+    seller_sku: Mapped[str] = mapped_column(String(100))
+    asin: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    fn_sku: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    product_name: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    condition: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    fulfillable_quantity: Mapped[int] = mapped_column(Integer, default=0)
+    inbound_quantity: Mapped[int] = mapped_column(Integer, default=0)
+    reserved_quantity: Mapped[int] = mapped_column(Integer, default=0)
+    unfulfillable_quantity: Mapped[int] = mapped_column(Integer, default=0)
+    total_quantity: Mapped[int] = mapped_column(Integer, default=0)
+    last_updated_time: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class InventorySnapshot(Base):
+    """Stock-level history: a row only when an item's quantities change.
+
+    Rows carry the item id and the four quantities, nothing else, so the table
+    stays narrow; the level at time T is the latest snapshot at or before T.
+    """
+
+    __tablename__ = "inventory_snapshots"
+    __table_args__ = (
+        Index("ix_inventory_snapshots_item_captured", "inventory_item_id", "captured_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    inventory_item_id: Mapped[int] = mapped_column(Integer)
+    captured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    fulfillable_quantity: Mapped[int] = mapped_column(Integer)
+    inbound_quantity: Mapped[int] = mapped_column(Integer)
+    reserved_quantity: Mapped[int] = mapped_column(Integer)
+    unfulfillable_quantity: Mapped[int] = mapped_column(Integer)
+
+
+class RunLog(Base):
+    """Append-only record of one ETL run or one SP-API call."""
+
+    __tablename__ = "run_logs"
+    __table_args__ = (
+        Index("ix_run_logs_created_at_id", "created_at", "id"),
+        Index("ix_run_logs_kind_created_at_id", "kind", "created_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    kind: Mapped[str] = mapped_column(String(20))
+    name: Mapped[str] = mapped_column(String(50))
+    status: Mapped[str] = mapped_column(String(20))
+    http_status: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    duration_ms: Mapped[float] = mapped_column(Float)
+    rows: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    account: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    marketplace_id: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    details: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+
+class SchemaVersion(Base):
+    """Single row holding the schema version applied by `app.db.migrations`."""
+
+    __tablename__ = "schema_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
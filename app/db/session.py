@@ -1,12 +1,108 @@
-from collections.abc import Generator
+"""
+Engines and sessions.
+`engine` / `SessionLocal` serve the API and own the primary pool. Read-only
+routes take `get_read_db`, which opens sessions on `read_engine`: a replica when
+DATABASE_READ_URL is set, the primary engine otherwise. ETL and background
+writers (scheduler jobs, ingestion, backfill, run log) use `etl_engine`, a
+second pool on the primary sized by DB_ETL_POOL_SIZE, so a long sync cannot
+starve dashboard requests of connections. Every pool reports checked-out,
+overflow and checkout wait time under its `pool` label in `GET /metrics`.
+"""
 
-from sqlalchemy import create_engine, inspect, text
+import asyncio
+import threading
+import time
+import weakref
+from collections.abc import AsyncGenerator, Generator
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import db_pool_wait_seconds, instrument_engine, instrument_pool, registry
+
+
+class _TimedCheckoutMixin:
+    """Time every checkout into `db_pool_wait_seconds`, labelled by the pool's logging name."""
+
+    _orig_logging_name: str | None
+
+    def _do_get(self):  # noqa: ANN202
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait_seconds.observe(
+                time.perf_counter() - started, pool=self._orig_logging_name or "default"
+            )
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options(
+    name: str, pool_size: int, max_overflow: int, asynchronous: bool = False
+) -> dict[str, object]:
+    if asynchronous:
+        pool_class = TimedAsyncQueuePool if registry.enabled else AsyncAdaptedQueuePool
+    else:
+        pool_class = TimedQueuePool if registry.enabled else QueuePool
+    return {
+        "poolclass": pool_class,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        # recreate() after dispose() keeps the logging name, so the label survives it.
+        "pool_logging_name": name,
+    }
+
+
+def _create_engine(
+    url: str,
+    name: str,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+) -> Engine:
+    engine = create_engine(
+        url,
+        **_pool_options(
+            name,
+            settings.db_pool_size if pool_size is None else pool_size,
+            settings.db_max_overflow if max_overflow is None else max_overflow,
+        ),
+    )
+    instrument_engine(engine)
+    instrument_pool(engine, name)
+    return engine
+
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+engine = _create_engine(settings.database_url, "primary")
+read_engine = (
+    _create_engine(settings.database_read_url, "read") if settings.database_read_url else engine
+)
+etl_engine = _create_engine(
+    settings.database_url,
+    "etl",
+    pool_size=settings.db_etl_pool_size,
+    max_overflow=settings.db_etl_max_overflow,
+)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, class_=Session)
+ReadSessionLocal = sessionmaker(
+    bind=read_engine, autocommit=False, autoflush=False, class_=Session
+)
+EtlSessionLocal = sessionmaker(
+    bind=etl_engine, autocommit=False, autoflush=False, class_=Session
+)
 Base = declarative_base()
 
 
@@ -18,22 +114,72 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def ensure_orders_extension_columns() -> None:
-    with engine.begin() as connection:
-        inspector = inspect(connection)
-        if not inspector.has_table("orders"):
-            return
+def get_read_db() -> Generator[Session, None, None]:
+    """`get_db` for routes that only read; may lag the primary by replication delay."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async connections belong to the loop that opened them, so engines are kept per
+# running loop: the API's loop, and the loop of each `asyncio.run` in a scheduler job.
+_async_engines: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[bool, AsyncEngine]
+] = weakref.WeakKeyDictionary()
+_async_session_factories: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[bool, async_sessionmaker[AsyncSession]]
+] = weakref.WeakKeyDictionary()
+_async_lock = threading.Lock()
+
 
-        existing_columns = {column["name"] for column in inspector.get_columns("orders")}
-        float_type = "DOUBLE PRECISION" if connection.dialect.name == "postgresql" else "FLOAT"
-        statements: list[str] = []
+def get_async_engine(read_only: bool = False) -> AsyncEngine:
+    """Event-loop engine on the same database (or the replica) for the running loop.
+
+    Created on first use, so the sync-only deployment never needs the async
+    driver (aiosqlite for local SQLite).
+    """
+    read_only = read_only and settings.async_database_read_url is not None
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        engines = _async_engines.setdefault(loop, {})
+        if read_only not in engines:
+            url = settings.async_database_read_url if read_only else settings.async_database_url
+            name = "async_read" if read_only else "async"
+            async_engine = create_async_engine(
+                url,
+                **_pool_options(
+                    name, settings.db_pool_size, settings.db_max_overflow, asynchronous=True
+                ),
+            )
+            instrument_engine(async_engine.sync_engine)
+            instrument_pool(async_engine.sync_engine, name)
+            engines[read_only] = async_engine
+        return engines[read_only]
+
+
+def open_async_session(read_only: bool = False) -> AsyncSession:
+    async_engine = get_async_engine(read_only)
+    with _async_lock:
+        factories = _async_session_factories.setdefault(asyncio.get_running_loop(), {})
+        if read_only not in factories:
+            factories[read_only] = async_sessionmaker(
+                bind=async_engine, autoflush=False, expire_on_commit=False
+            )
+        return factories[read_only]()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with open_async_session() as db:
+        yield db
 
-        if "buyer" not in existing_columns:
-            statements.append("ALTER TABLE orders ADD COLUMN buyer VARCHAR(100)")
-        if "amount" not in existing_columns:
-            statements.append(f"ALTER TABLE orders ADD COLUMN amount {float_type}")
-        if "cost" not in existing_columns:
-            statements.append(f"ALTER TABLE orders ADD COLUMN cost {float_type}")
 
-        for statement in statements:
-            connection.execute(text(statement))
+async def dispose_async_engine() -> None:
+    """Dispose the running loop's engines; call it before that loop ends."""
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        engines = _async_engines.pop(loop, {})
+        _async_session_factories.pop(loop, None)
+    for async_engine in engines.values():
+        await async_engine.dispose()
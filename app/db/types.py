@@ -0,0 +1,70 @@
+"""
+Column types shared by the ORM models.
+`raw_payload_type()` picks how SP-API payloads are stored, driven by the
+RAW_PAYLOAD_STORAGE setting: plain JSON, JSONB on PostgreSQL, or
+zlib-compressed JSON bytes. The setting only shapes the column when the table
+is created; `stored_raw_payload_storage()` maps a reflected column type back to
+its mode so startup can refuse a setting that no longer matches the table.
+"""
+
+import json
+import zlib
+
+from sqlalchemy import JSON, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator, TypeEngine
+
+RAW_PAYLOAD_STORAGE_MODES = ("json", "jsonb", "zlib")
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON document stored as zlib-compressed UTF-8 bytes (BYTEA / BLOB)."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, level: int = 6) -> None:
+        super().__init__()
+        self.level = level
+
+    def process_bind_param(self, value: dict | None, dialect: Dialect) -> bytes | None:
+        if value is None:
+            return None
+        encoded = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        return zlib.compress(encoded, self.level)
+
+    def process_result_value(self, value: bytes | None, dialect: Dialect) -> dict | None:
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value))
+
+
+def raw_payload_type(storage: str) -> TypeEngine:
+    if storage == "zlib":
+        return CompressedJSON()
+    if storage == "jsonb":
+        return JSON().with_variant(JSONB(), "postgresql")
+    if storage == "json":
+        return JSON()
+    raise ValueError(
+        f"Unsupported RAW_PAYLOAD_STORAGE {storage!r}; expected one of {RAW_PAYLOAD_STORAGE_MODES}"
+    )
+
+
+def effective_raw_payload_storage(storage: str, dialect_name: str) -> str:
+    """The mode `storage` really produces on `dialect_name` (jsonb is plain JSON off PostgreSQL)."""
+    if storage == "jsonb" and dialect_name != "postgresql":
+        return "json"
+    return storage
+
+
+def stored_raw_payload_storage(column_type: TypeEngine) -> str | None:
+    """Storage mode of a reflected raw_payload column type, or None if unrecognised."""
+    if isinstance(column_type, LargeBinary):
+        return "zlib"
+    if isinstance(column_type, JSONB):
+        return "jsonb"
+    if isinstance(column_type, JSON):
+        return "json"
+    return None
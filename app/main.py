@@ -4,10 +4,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes_dashboard import router as dashboard_router
 from app.api.routes_inventory import router as inventory_router
 from app.api.routes_logs import router as logs_router
+from app.api.routes_metrics import router as metrics_router
 from app.api.routes_orders import router as orders_router
 from app.core.config import settings
-from app.db import models  # noqa: F401
-from app.db.session import Base, engine, ensure_orders_extension_columns
+from app.core.metrics import MetricsMiddleware
+from app.db.migrations import check_schema_version
+from app.db.session import dispose_async_engine
+from app.services.http_transport import async_http_transport
+from app.services.notification_dispatcher import slack_dispatcher
+from app.services.order_events import order_events
+from app.services.response_cache import response_cache
+from app.services.run_log import run_logger
+from app.workers.scheduler import scheduler
 
 
 def create_app() -> FastAPI:
@@ -22,6 +30,9 @@ def create_app() -> FastAPI:
             allow_headers=["*"],
         )
 
+    app.add_middleware(MetricsMiddleware)
+
+    app.include_router(metrics_router, tags=["metrics"])
     app.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
     app.include_router(orders_router, prefix="/orders", tags=["orders"])
     app.include_router(inventory_router, prefix="/inventory", tags=["inventory"])
@@ -29,8 +40,25 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     def _startup() -> None:
-        Base.metadata.create_all(bind=engine)
-        ensure_orders_extension_columns()
+        # Schema changes are applied by `python -m app.db.migrations`, not by replicas.
+        check_schema_version()
+        order_events.start()
+        response_cache.start()
+        if settings.scheduler_enabled:
+            scheduler.start()
+
+    @app.on_event("shutdown")
+    def _shutdown() -> None:
+        scheduler.shutdown()
+        slack_dispatcher.shutdown()
+        run_logger.shutdown()
+        order_events.shutdown()
+        response_cache.shutdown()
+
+    @app.on_event("shutdown")
+    async def _close_async_clients() -> None:
+        await async_http_transport.aclose()
+        await dispose_async_engine()
 
     return app
 
@@ -1,7 +1,92 @@
 """
 Entry point for the inventory ETL pipeline.
-Stub implementation that should be expanded later.
+Streams FBA inventory summaries for every configured account and marketplace,
+upserts current stock into `inventory_items` in batches and appends a compact
+`inventory_snapshots` row for each SKU whose quantities changed.
 """
 
-def run_inventory_etl() -> dict[str, str]:
-    return {"status": "inventory_etl_stub"}
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.config import SPAPIAccount, settings
+from app.core.metrics import db_operation_seconds, observe_etl_run, timed
+from app.db.crud import load_inventory_summaries
+from app.services.response_cache import response_cache
+from app.services.run_log import run_logger
+from app.services.spapi_client import SPAPIClient
+
+logger = logging.getLogger(__name__)
+
+
+def _load_batch(
+    db: Session,
+    marketplace_id: str,
+    batch: list[dict],
+    captured_at: datetime,
+    totals: dict[str, int],
+) -> None:
+    try:
+        result = load_inventory_summaries(db, marketplace_id, batch, captured_at)
+        with timed(db_operation_seconds, operation="inventory_batch_commit"):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if result.items:
+        # synced_at moves on every upsert, so even unchanged quantities change the response.
+        response_cache.invalidate("inventory")
+    totals["items"] += result.items
+    totals["created"] += result.created
+    totals["changed"] += result.changed
+    totals["snapshots"] += result.snapshots
+
+
+def _sync_marketplace(db: Session, client: SPAPIClient, captured_at: datetime) -> dict[str, int]:
+    totals = {"items": 0, "created": 0, "changed": 0, "snapshots": 0}
+    batch: list[dict] = []
+    for summary in client.iter_inventory_summaries():
+        batch.append(summary)
+        if len(batch) >= settings.inventory_etl_batch_size:
+            _load_batch(db, client.marketplace_id, batch, captured_at, totals)
+            batch = []
+    if batch:
+        _load_batch(db, client.marketplace_id, batch, captured_at, totals)
+    return totals
+
+
+def run_inventory_etl(
+    db: Session, accounts: list[SPAPIAccount] | None = None
+) -> dict[str, int | list[dict[str, int | str]]]:
+    """Sync FBA inventory for every account/marketplace pair, one batch at a time.
+
+    All rows written by one run share the same `captured_at`, so a run's
+    snapshots can be read back as one point in the time series.
+    """
+    accounts = accounts if accounts is not None else settings.spapi_accounts
+    captured_at = datetime.utcnow()
+    marketplaces = []
+    for account in accounts:
+        for marketplace_id in account.marketplace_ids:
+            with run_logger.track(
+                "etl_run", "inventory_sync", account=account.name, marketplace_id=marketplace_id
+            ) as entry:
+                started = time.perf_counter()
+                totals = _sync_marketplace(db, SPAPIClient(account, marketplace_id), captured_at)
+                observe_etl_run("inventory", totals["items"], time.perf_counter() - started)
+                entry.rows = totals["items"]
+                entry.details = dict(totals)
+            logger.info("Inventory sync %s/%s: %s", account.name, marketplace_id, totals)
+            marketplaces.append(
+                {"account": account.name, "marketplace_id": marketplace_id, **totals}
+            )
+
+    return {
+        **{
+            key: sum(entry[key] for entry in marketplaces)
+            for key in ("items", "created", "changed", "snapshots")
+        },
+        "marketplaces": marketplaces,
+    }
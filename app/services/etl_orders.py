@@ -1,12 +1,36 @@
+import asyncio
 import random
-from datetime import datetime, timezone
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import AbstractContextManager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.crud import upsert_order
-from app.services.slack_notifier import send_sandbox_order_received
-from app.services.spapi_client import SPAPIClient
+from app.core.metrics import db_operation_seconds, observe_etl_run, timed
+from app.db.crud import (
+    BulkUpsertResult,
+    advance_sync_watermark,
+    bulk_upsert_orders,
+    get_sync_watermark,
+    parse_spapi_datetime,
+    refresh_order_metrics,
+)
+from app.services.notification_dispatcher import slack_dispatcher
+from app.services.order_events import order_change_events, order_events
+from app.services.order_items import (
+    OrderItemsResult,
+    retry_failed_order_items,
+    retry_failed_order_items_async,
+    sync_order_items,
+    sync_order_items_async,
+)
+from app.services.response_cache import response_cache
+from app.services.run_log import RunLogEntry, run_logger
+from app.services.spapi_client import AsyncSPAPIClient, SPAPIClient
 
 
 def _build_order_extensions() -> dict[str, str | float]:
@@ -27,15 +51,19 @@ def _build_order_extensions() -> dict[str, str | float]:
     }
 
 
-def _enrich_order_payload(order_payload: dict) -> dict:
+def enrich_order_payload(order_payload: dict) -> dict:
+    """Copy of an SP-API order with the locally generated Buyer/Amount/Cost fields."""
     enriched_payload = dict(order_payload)
     enriched_payload.update(_build_order_extensions())
     return enriched_payload
 
 
-def _serialize_order_summary(order_payload: dict) -> dict[str, str | float | None]:
+def _serialize_order_summary(
+    order_payload: dict, marketplace_id: str | None = None
+) -> dict[str, str | float | None]:
     return {
         "amazon_order_id": order_payload.get("AmazonOrderId"),
+        "marketplace_id": order_payload.get("MarketplaceId") or marketplace_id,
         "order_status": order_payload.get("OrderStatus"),
         "purchase_date": order_payload.get("PurchaseDate"),
         "last_update_date": order_payload.get("LastUpdateDate"),
@@ -57,47 +85,313 @@ def _build_demo_order_payload() -> dict[str, str]:
     }
 
 
-def run_orders_etl(db: Session) -> dict[str, int | list[dict[str, str | float | None]]]:
-    client = SPAPIClient()
-    orders = client.get_sandbox_orders()
-    demo_generated = 0
-    slack_events: list[tuple[str, str | None]] = []
-    synced_orders: list[dict[str, str | float | None]] = []
+def chunked(items: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    """Lists of up to `size` items, consuming `items` lazily."""
+    chunk: list[dict] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
-    upserted = 0
-    try:
-        for order in orders:
-            enriched_order = _enrich_order_payload(order)
-            _, created = upsert_order(db, enriched_order)
-            upserted += 1
-            synced_orders.append(_serialize_order_summary(enriched_order))
-            if created:
-                slack_events.append(
-                    (enriched_order["AmazonOrderId"], enriched_order.get("OrderStatus"))
-                )
 
-        if settings.demo_mode:
-            demo_order = _enrich_order_payload(_build_demo_order_payload())
-            _, demo_created = upsert_order(db, demo_order)
-            upserted += 1
-            demo_generated = 1
-            synced_orders.append(_serialize_order_summary(demo_order))
-            if demo_created:
-                slack_events.append(
-                    (demo_order["AmazonOrderId"], demo_order.get("OrderStatus"))
-                )
+def _orders_sync_key(client: SPAPIClient | AsyncSPAPIClient) -> str:
+    # The single-account key predates multi-account config; keep it so existing
+    # watermarks stay valid.
+    if client.account_name == "default":
+        return f"orders:{client.marketplace_id}"
+    return f"orders:{client.account_name}:{client.marketplace_id}"
 
-        db.commit()
+
+def _delta_sync_start(high_water_mark: datetime | None) -> str | None:
+    if not settings.orders_incremental_sync or high_water_mark is None:
+        return None
+    if high_water_mark.tzinfo is None:
+        high_water_mark = high_water_mark.replace(tzinfo=timezone.utc)
+    # Orders updated while the previous run was paging may carry a LastUpdateDate
+    # slightly below the stored mark, so each delta re-reads a small overlap.
+    start = high_water_mark - timedelta(minutes=settings.orders_sync_overlap_minutes)
+    return start.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _write_orders_batch(
+    db: Session, orders: list[dict], marketplace_id: str | None = None
+) -> tuple[list[dict], BulkUpsertResult]:
+    """Upsert one batch, refresh its hourly buckets and commit; DB work only.
+
+    `marketplace_id` is the marketplace the batch was fetched for; it is stored
+    for payloads (demo orders among them) that carry no MarketplaceId.
+    """
+    enriched_orders = [enrich_order_payload(order) for order in orders]
+    try:
+        result = bulk_upsert_orders(
+            db, enriched_orders, skip_unchanged=True, marketplace_id=marketplace_id
+        )
+        written_ids = set(result.created) | set(result.updated)
+        refresh_order_metrics(
+            db,
+            (
+                parse_spapi_datetime(order.get("PurchaseDate"))
+                for order in enriched_orders
+                if order["AmazonOrderId"] in written_ids
+            ),
+        )
+        with timed(db_operation_seconds, operation="orders_batch_commit"):
+            db.commit()
     except Exception:
         db.rollback()
         raise
+    return enriched_orders, result
 
-    for order_id, order_status in slack_events:
-        send_sandbox_order_received(order_id, order_status)
 
-    return {
-        "fetched": len(orders),
-        "upserted": upserted,
-        "demo_generated": demo_generated,
-        "orders": synced_orders,
+def _publish_orders_batch(
+    enriched_orders: list[dict],
+    result: BulkUpsertResult,
+    synced_orders: list[dict[str, str | float | None]],
+    marketplace_id: str | None = None,
+) -> None:
+    """Side effects of a committed batch: cache invalidation, order events, Slack.
+
+    These may block on Redis or pg_notify, so the async ETL runs them off the loop.
+    """
+    if result.upserted:
+        response_cache.invalidate("orders")
+        order_events.publish(order_change_events(enriched_orders, result, marketplace_id))
+
+    summary_room = settings.orders_sync_summary_limit - len(synced_orders)
+    synced_orders.extend(
+        _serialize_order_summary(order, marketplace_id)
+        for order in enriched_orders[:summary_room]
+    )
+
+    order_status_by_id = {
+        order["AmazonOrderId"]: order.get("OrderStatus") for order in enriched_orders
     }
+    for order_id in result.created:
+        slack_dispatcher.enqueue(order_id, order_status_by_id.get(order_id))
+
+
+def _upsert_orders_batch(
+    db: Session,
+    orders: list[dict],
+    synced_orders: list[dict[str, str | float | None]],
+    marketplace_id: str | None = None,
+) -> BulkUpsertResult:
+    enriched_orders, result = _write_orders_batch(db, orders, marketplace_id)
+    _publish_orders_batch(enriched_orders, result, synced_orders, marketplace_id)
+    return result
+
+
+async def _upsert_orders_batch_async(
+    db: AsyncSession,
+    orders: list[dict],
+    synced_orders: list[dict[str, str | float | None]],
+    marketplace_id: str | None = None,
+) -> BulkUpsertResult:
+    enriched_orders, result = await db.run_sync(_write_orders_batch, orders, marketplace_id)
+    await asyncio.to_thread(
+        _publish_orders_batch, enriched_orders, result, synced_orders, marketplace_id
+    )
+    return result
+
+
+@dataclass
+class _OrdersSyncProgress:
+    """Counters shared by the sync and async ETL loops."""
+
+    fetched: int = 0
+    created: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    demo_generated: int = 0
+    high_water_mark: datetime | None = None
+    order_items: OrderItemsResult = field(default_factory=OrderItemsResult)
+    synced_orders: list[dict[str, str | float | None]] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    def add(
+        self, batch: list[dict], result: BulkUpsertResult, track_watermark: bool = True
+    ) -> None:
+        self.fetched += len(batch) if track_watermark else 0
+        self.created += len(result.created)
+        self.changed += result.upserted
+        self.unchanged += result.unchanged
+        if not track_watermark:
+            return
+        for order in batch:
+            last_update = parse_spapi_datetime(order.get("LastUpdateDate"))
+            mark = self.high_water_mark
+            if last_update and (mark is None or last_update > mark):
+                self.high_water_mark = last_update
+
+    def record(self, entry: RunLogEntry, last_updated_after: str | None) -> None:
+        observe_etl_run("orders", self.fetched, time.perf_counter() - self.started)
+        entry.rows = self.fetched
+        entry.details = {
+            "created": self.created,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "demo_generated": self.demo_generated,
+            "order_items": asdict(self.order_items),
+            "sync_mode": "incremental" if last_updated_after else "full",
+        }
+
+    def as_result(
+        self, last_updated_after: str | None
+    ) -> dict[str, int | str | None | list[dict[str, str | float | None]]]:
+        return {
+            "fetched": self.fetched,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "created": self.created,
+            "upserted": self.changed,
+            "demo_generated": self.demo_generated,
+            "order_items": asdict(self.order_items),
+            "sync_mode": "incremental" if last_updated_after else "full",
+            "last_updated_after": last_updated_after,
+            "orders": self.synced_orders,
+        }
+
+
+def _track_orders_run(
+    client: SPAPIClient | AsyncSPAPIClient,
+) -> AbstractContextManager[RunLogEntry]:
+    return run_logger.track(
+        "etl_run",
+        "orders_sync",
+        account=client.account_name,
+        marketplace_id=client.marketplace_id,
+    )
+
+
+def _advance_orders_watermark(
+    db: Session, sync_key: str, progress: _OrdersSyncProgress
+) -> None:
+    if progress.high_water_mark is not None:
+        advance_sync_watermark(db, sync_key, progress.high_water_mark)
+        db.commit()
+
+
+def _finish_orders_sync(
+    db: Session,
+    sync_key: str,
+    progress: _OrdersSyncProgress,
+    generate_demo: bool,
+    marketplace_id: str | None = None,
+) -> None:
+    _advance_orders_watermark(db, sync_key, progress)
+    if generate_demo:
+        # Synthetic orders are stamped "now" and must not move the SP-API watermark.
+        batch = [_build_demo_order_payload()]
+        result = _upsert_orders_batch(db, batch, progress.synced_orders, marketplace_id)
+        progress.add(batch, result, track_watermark=False)
+        progress.demo_generated = 1
+
+
+def run_orders_etl(
+    db: Session,
+    client: SPAPIClient | None = None,
+    generate_demo: bool | None = None,
+) -> dict[str, int | str | None | list[dict[str, str | float | None]]]:
+    """Stream orders from SP-API into the DB in bounded batches.
+
+    Each batch of `ORDERS_ETL_BATCH_SIZE` orders is upserted and committed before
+    the next one is read, so memory stays flat however many pages the marketplace
+    returns. Orders whose content hash is already stored are not rewritten. With
+    `ORDER_ITEMS_ENABLED`, created or changed orders get their getOrderItems
+    line items fetched concurrently and stored per batch, after orders whose
+    items failed to fetch in an earlier run are retried.
+    With `ORDERS_INCREMENTAL_SYNC`, the request starts from the marketplace's
+    stored high-water mark instead of re-fetching everything. Only the first
+    `ORDERS_SYNC_SUMMARY_LIMIT` order summaries are echoed back in the result.
+
+    `client` selects the account and marketplace (the first configured one by
+    default); `generate_demo` defaults to `DEMO_MODE`.
+    """
+    client = client or SPAPIClient()
+    sync_key = _orders_sync_key(client)
+    progress = _OrdersSyncProgress()
+    if generate_demo is None:
+        generate_demo = settings.demo_mode
+
+    with _track_orders_run(client) as entry:
+        if settings.order_items_enabled:
+            progress.order_items.add(retry_failed_order_items(db, client))
+        last_updated_after = _delta_sync_start(get_sync_watermark(db, sync_key))
+        orders = client.iter_sandbox_orders(
+            prefetch=settings.orders_page_prefetch,
+            last_updated_after=last_updated_after,
+        )
+        for batch in chunked(orders, settings.orders_etl_batch_size):
+            result = _upsert_orders_batch(
+                db, batch, progress.synced_orders, client.marketplace_id
+            )
+            progress.add(batch, result)
+            if settings.order_items_enabled:
+                progress.order_items.add(sync_order_items(db, client, batch, result))
+
+        _finish_orders_sync(db, sync_key, progress, generate_demo, client.marketplace_id)
+        progress.record(entry, last_updated_after)
+    return progress.as_result(last_updated_after)
+
+
+async def _achunked(items: AsyncIterator[dict], size: int) -> AsyncIterator[list[dict]]:
+    chunk: list[dict] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def run_orders_etl_async(
+    db: AsyncSession,
+    client: AsyncSPAPIClient | None = None,
+    generate_demo: bool | None = None,
+) -> dict[str, int | str | None | list[dict[str, str | float | None]]]:
+    """`run_orders_etl` on the event loop.
+
+    Pages are fetched with `AsyncSPAPIClient`; each batch is written through
+    `AsyncSession.run_sync`, so the upsert, rollup and watermark logic is the
+    same code the sync ETL runs. Cache invalidation, order events and Slack
+    enqueues run in a worker thread after the write, off the event loop.
+    `generate_demo` defaults to `DEMO_MODE`.
+    """
+    client = client or AsyncSPAPIClient()
+    sync_key = _orders_sync_key(client)
+    progress = _OrdersSyncProgress()
+    if generate_demo is None:
+        generate_demo = settings.demo_mode
+
+    with _track_orders_run(client) as entry:
+        if settings.order_items_enabled:
+            progress.order_items.add(await retry_failed_order_items_async(db, client))
+        last_updated_after = _delta_sync_start(await db.run_sync(get_sync_watermark, sync_key))
+        orders = client.iter_sandbox_orders(
+            prefetch=settings.orders_page_prefetch,
+            last_updated_after=last_updated_after,
+        )
+        async for batch in _achunked(orders, settings.orders_etl_batch_size):
+            result = await _upsert_orders_batch_async(
+                db, batch, progress.synced_orders, client.marketplace_id
+            )
+            progress.add(batch, result)
+            if settings.order_items_enabled:
+                progress.order_items.add(
+                    await sync_order_items_async(db, client, batch, result)
+                )
+
+        await db.run_sync(_advance_orders_watermark, sync_key, progress)
+        if generate_demo:
+            batch = [_build_demo_order_payload()]
+            result = await _upsert_orders_batch_async(
+                db, batch, progress.synced_orders, client.marketplace_id
+            )
+            progress.add(batch, result, track_watermark=False)
+            progress.demo_generated = 1
+        progress.record(entry, last_updated_after)
+    return progress.as_result(last_updated_after)
@@ -0,0 +1,315 @@
+"""
+Shared HTTP transport for outbound calls (SP-API, LWA, Slack).
+One pooled keep-alive `requests.Session` per process (and an `httpx.AsyncClient`
+for the async stack), jittered exponential backoff on 429/5xx, and a token-bucket
+limiter per SP-API operation whose rate follows the `x-amzn-RateLimit-Limit`
+header returned by Amazon. Both transports share the same limiter.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Documented default usage plans (requests/sec, burst) used until Amazon reports
+# the live rate for an operation through x-amzn-RateLimit-Limit.
+SPAPI_DEFAULT_RATE_LIMITS: dict[str, tuple[float, int]] = {
+    "getOrders": (0.0167, 20),
+    "getOrderItems": (0.5, 30),
+    "getInventorySummaries": (2.0, 2),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        while (delay := self._try_take()) > 0:
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+    async def acquire_async(self) -> float:
+        waited = 0.0
+        while (delay := self._try_take()) > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def drain(self) -> None:
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+
+class OperationRateLimiter:
+    """Token buckets keyed by (scope, operation).
+
+    SP-API usage plans apply per selling-partner account, so callers pass the
+    account name as `scope` and every account gets its own buckets.
+    """
+
+    def __init__(self, defaults: dict[str, tuple[float, int]] | None = None) -> None:
+        self._defaults = dict(defaults or {})
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, operation: str, scope: str = "") -> TokenBucket | None:
+        with self._lock:
+            bucket = self._buckets.get((scope, operation))
+            if bucket is None and operation in self._defaults:
+                rate, burst = self._defaults[operation]
+                bucket = self._buckets[(scope, operation)] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, operation: str, scope: str = "") -> float:
+        bucket = self._bucket(operation, scope)
+        return bucket.acquire() if bucket is not None else 0.0
+
+    async def acquire_async(self, operation: str, scope: str = "") -> float:
+        bucket = self._bucket(operation, scope)
+        return await bucket.acquire_async() if bucket is not None else 0.0
+
+    def observe(
+        self,
+        operation: str,
+        response: requests.Response | httpx.Response,
+        scope: str = "",
+    ) -> None:
+        header = response.headers.get("x-amzn-RateLimit-Limit")
+        rate = None
+        if header:
+            try:
+                rate = float(header)
+            except ValueError:
+                logger.debug("Ignoring malformed rate limit header %r", header)
+        if rate and rate > 0:
+            bucket = self._bucket(operation, scope)
+            if bucket is None:
+                with self._lock:
+                    bucket = self._buckets.setdefault(
+                        (scope, operation), TokenBucket(rate, max(1, int(rate)))
+                    )
+            bucket.set_rate(rate)
+        if response.status_code == 429:
+            bucket = self._bucket(operation, scope)
+            if bucket is not None:
+                bucket.drain()
+
+    def rates(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                f"{scope}:{operation}" if scope else operation: bucket.rate
+                for (scope, operation), bucket in self._buckets.items()
+            }
+
+
+class HTTPTransport:
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+    ) -> None:
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.rate_limiter = OperationRateLimiter(SPAPI_DEFAULT_RATE_LIMITS)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff_delay(
+        self, attempt: int, response: requests.Response | httpx.Response | None
+    ) -> float:
+        """Full-jitter exponential backoff; an explicit Retry-After wins."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max_seconds)
+            except ValueError:
+                pass
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * 2**attempt)
+        return random.uniform(0, ceiling)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        operation: str | None = None,
+        rate_limit_scope: str = "",
+        max_retries: int | None = None,
+        **kwargs: object,
+    ) -> requests.Response:
+        """Send a request through the shared session, retrying throttles and 5xx.
+
+        `operation` (and `rate_limit_scope`, usually the seller account) selects
+        the token bucket. The final response is returned as-is (callers still
+        `raise_for_status()`); connection errors propagate once retries are exhausted.
+        `max_retries` overrides `HTTP_MAX_RETRIES`; callers that retry on their
+        own pass 0 so there is a single retry layer.
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(max_retries + 1):
+            if operation:
+                self.rate_limiter.acquire(operation, rate_limit_scope)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, None)
+                logger.info(
+                    "Retrying %s %s in %.2fs after %s", method, operation or url, delay, exc
+                )
+                time.sleep(delay)
+                continue
+
+            if operation:
+                self.rate_limiter.observe(operation, response, rate_limit_scope)
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                return response
+
+            delay = self._backoff_delay(attempt, response)
+            logger.info(
+                "Retrying %s %s in %.2fs after HTTP %s",
+                method,
+                operation or url,
+                delay,
+                response.status_code,
+            )
+            response.close()
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+
+class AsyncHTTPTransport:
+    """`HTTPTransport` counterpart for the event loop, backed by `httpx.AsyncClient`.
+
+    Retry settings and the per-operation rate limiter are shared with the sync
+    transport. An `httpx.AsyncClient` is bound to the loop that first uses it, so
+    each running loop gets its own client (the API's loop, and the loop of each
+    `asyncio.run` in a scheduler job); `aclose()` closes the current loop's one.
+    """
+
+    def __init__(self, sync_transport: HTTPTransport, pool_size: int = 10) -> None:
+        self.max_retries = sync_transport.max_retries
+        self.rate_limiter = sync_transport.rate_limiter
+        self._backoff_delay = sync_transport._backoff_delay
+        self.pool_size = pool_size
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                    )
+                )
+        return client
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        operation: str | None = None,
+        rate_limit_scope: str = "",
+        max_retries: int | None = None,
+        **kwargs: object,
+    ) -> httpx.Response:
+        max_retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(max_retries + 1):
+            if operation:
+                await self.rate_limiter.acquire_async(operation, rate_limit_scope)
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException) as exc:
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, None)
+                logger.info(
+                    "Retrying %s %s in %.2fs after %s", method, operation or url, delay, exc
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            if operation:
+                self.rate_limiter.observe(operation, response, rate_limit_scope)
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                return response
+
+            delay = self._backoff_delay(attempt, response)
+            logger.info(
+                "Retrying %s %s in %.2fs after HTTP %s",
+                method,
+                operation or url,
+                delay,
+                response.status_code,
+            )
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def aclose(self) -> None:
+        """Close the running loop's client; call it before that loop ends."""
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+http_transport = HTTPTransport(
+    pool_size=settings.http_pool_size,
+    max_retries=settings.http_max_retries,
+    backoff_base_seconds=settings.http_backoff_base_seconds,
+    backoff_max_seconds=settings.http_backoff_max_seconds,
+)
+async_http_transport = AsyncHTTPTransport(http_transport, pool_size=settings.http_pool_size)
@@ -0,0 +1,189 @@
+"""
+Process-wide cache for LWA access tokens.
+Tokens are kept until shortly before `expires_in` runs out, and concurrent
+refreshes for the same credentials collapse into a single in-flight request.
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+TokenFetcher = Callable[[], tuple[str, int]]
+AsyncTokenFetcher = Callable[[], Awaitable[tuple[str, int]]]
+
+
+@dataclass
+class _CachedToken:
+    access_token: str
+    expires_at: float
+    refresh_at: float
+
+
+@dataclass
+class _InflightRefresh:
+    done: threading.Event = field(default_factory=threading.Event)
+    token: _CachedToken | None = None
+    error: BaseException | None = None
+    # Coroutines waiting on the refresh, resolved on their own loop when it finishes.
+    waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = field(
+        default_factory=list
+    )
+
+    def result(self) -> str:
+        if self.error is not None:
+            raise self.error
+        return self.token.access_token
+
+    def finish(self) -> None:
+        self.done.set()
+        for loop, waiter in self.waiters:
+            try:
+                loop.call_soon_threadsafe(self._resolve, waiter)
+            except RuntimeError:
+                pass  # The waiter's loop is already closed.
+
+    def _resolve(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            return
+        if self.error is not None:
+            waiter.set_exception(self.error)
+        else:
+            waiter.set_result(self.token.access_token)
+
+
+class LWATokenCache:
+    def __init__(self, refresh_margin_seconds: float = 300.0) -> None:
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._lock = threading.Lock()
+        self._tokens: dict[Hashable, _CachedToken] = {}
+        self._inflight: dict[Hashable, _InflightRefresh] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _cached(self, key: Hashable, now: float) -> str | None:
+        cached = self._tokens.get(key)
+        if cached is not None and now < cached.refresh_at:
+            self.hits += 1
+            return cached.access_token
+        return None
+
+    def _claim(self, key: Hashable) -> tuple[str | None, _InflightRefresh | None, bool]:
+        """Under `_lock`: a usable token, or the refresh to lead (True) or wait for."""
+        now = time.monotonic()
+        token = self._cached(key, now)
+        if token is not None:
+            return token, None, False
+
+        inflight = self._inflight.get(key)
+        is_leader = inflight is None
+        if is_leader:
+            inflight = _InflightRefresh()
+            self._inflight[key] = inflight
+
+        cached = self._tokens.get(key)
+        if cached is not None and now < cached.expires_at and not is_leader:
+            self.hits += 1
+            return cached.access_token, None, False
+        if cached is None or now >= cached.expires_at:
+            self.misses += 1
+        return None, inflight, is_leader
+
+    def get_token(self, key: Hashable, fetch: TokenFetcher) -> str:
+        """Return a valid token for `key`, calling `fetch` at most once per refresh.
+
+        `fetch` returns ``(access_token, expires_in_seconds)``. While a refresh is in
+        flight, callers still holding an unexpired token keep using it; the others
+        wait for the leader's result instead of issuing their own request.
+        """
+        with self._lock:
+            token, inflight, is_leader = self._claim(key)
+        if token is not None:
+            return token
+
+        if is_leader:
+            try:
+                access_token, expires_in = fetch()
+            except BaseException as exc:
+                self._fail(key, inflight, exc)
+                raise
+            return self._store(key, inflight, access_token, expires_in)
+
+        inflight.done.wait()
+        return inflight.result()
+
+    async def get_token_async(self, key: Hashable, fetch: AsyncTokenFetcher) -> str:
+        """`get_token` for coroutines; `fetch` is awaited on the running loop.
+
+        Threads and coroutines share the same in-flight refresh: a coroutine
+        waiting on a thread's refresh (or the other way round) never blocks the loop.
+        """
+        waiter: asyncio.Future | None = None
+        with self._lock:
+            token, inflight, is_leader = self._claim(key)
+            if inflight is not None and not is_leader:
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                inflight.waiters.append((loop, waiter))
+        if token is not None:
+            return token
+
+        if is_leader:
+            try:
+                access_token, expires_in = await fetch()
+            except BaseException as exc:
+                self._fail(key, inflight, exc)
+                raise
+            return self._store(key, inflight, access_token, expires_in)
+
+        return await waiter
+
+    def _fail(self, key: Hashable, inflight: _InflightRefresh, exc: BaseException) -> None:
+        with self._lock:
+            self.refresh_failures += 1
+            inflight.error = exc
+            del self._inflight[key]
+        inflight.finish()
+
+    def _store(
+        self, key: Hashable, inflight: _InflightRefresh, access_token: str, expires_in: int
+    ) -> str:
+        fetched_at = time.monotonic()
+        margin = min(self.refresh_margin_seconds, expires_in / 2)
+        cached = _CachedToken(
+            access_token=access_token,
+            expires_at=fetched_at + expires_in,
+            refresh_at=fetched_at + expires_in - margin,
+        )
+        with self._lock:
+            self.refreshes += 1
+            self._tokens[key] = cached
+            inflight.token = cached
+            del self._inflight[key]
+        inflight.finish()
+        return access_token
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._tokens.clear()
+            else:
+                self._tokens.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+                "cached_tokens": len(self._tokens),
+            }
+
+
+lwa_token_cache = LWATokenCache(refresh_margin_seconds=settings.spapi_lwa_refresh_margin_seconds)
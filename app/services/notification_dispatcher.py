@@ -0,0 +1,202 @@
+"""
+Background dispatcher for new-order Slack notifications.
+The ETL only enqueues events; a worker thread coalesces everything that
+arrives within a short window into one digest message and posts it off the
+request path, retrying failed posts. This is the webhook's only retry layer (the
+transport sends it once), and a post that timed out waiting for the response is
+not retried: Slack may already have delivered it. The queue is bounded and
+in-memory, so events beyond `max_queue_size` (or still queued at process exit)
+are dropped and counted rather than blocking the ETL.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+
+import requests
+
+from app.core.config import settings
+from app.core.metrics import registry, slack_send_seconds
+from app.services.slack_notifier import build_order_digest_message, post_slack_message
+
+logger = logging.getLogger(__name__)
+
+OrderEvent = tuple[str, str | None]
+
+
+class SlackDigestDispatcher:
+    def __init__(
+        self,
+        send: Callable[[str], None] = post_slack_message,
+        window_seconds: float = 5.0,
+        max_queue_size: int = 10_000,
+        max_batch_size: int = 500,
+        digest_max_ids: int = 10,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 2.0,
+    ) -> None:
+        self.send = send
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.digest_max_ids = digest_max_ids
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._queue: queue.Queue[OrderEvent] = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "sent_messages": 0,
+            "sent_events": 0,
+            "failed_messages": 0,
+            "failed_events": 0,
+            "retries": 0,
+        }
+        self._send_latency_total_ms = 0.0
+        self._send_latency_max_ms = 0.0
+        self._last_send_latency_ms: float | None = None
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(
+                    target=self._run, name="slack-dispatcher", daemon=True
+                )
+                self._worker.start()
+
+    def enqueue(self, order_id: str, order_status: str | None) -> bool:
+        """Queue one new-order event; returns False when it was dropped."""
+        if not settings.slack_webhook_url:
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((order_id, order_status))
+        except queue.Full:
+            self._count("dropped")
+            logger.warning("Slack notification queue full; dropping order %s", order_id)
+            return False
+        self._count("enqueued")
+        return True
+
+    def _collect_batch(self) -> list[OrderEvent]:
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _retry_delay(self, attempt: int, exc: requests.RequestException) -> float:
+        response = exc.response
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.retry_backoff_seconds * 2**attempt
+
+    def _send_digest(self, batch: list[OrderEvent]) -> None:
+        message = build_order_digest_message(batch, max_listed=self.digest_max_ids)
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                self.send(message)
+            except requests.RequestException as exc:
+                if registry.enabled:
+                    slack_send_seconds.observe(time.perf_counter() - started, outcome="error")
+                # A connect timeout never reached Slack; a read timeout may have posted.
+                maybe_delivered = isinstance(exc, requests.Timeout) and not isinstance(
+                    exc, requests.ConnectTimeout
+                )
+                if attempt >= self.max_retries or maybe_delivered:
+                    self._count("failed_messages")
+                    self._count("failed_events", len(batch))
+                    logger.warning(
+                        "Giving up on Slack digest of %d orders: %s", len(batch), exc
+                    )
+                    return
+                self._count("retries")
+                self._stop.wait(self._retry_delay(attempt, exc))
+                continue
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            if registry.enabled:
+                slack_send_seconds.observe(latency_ms / 1000, outcome="ok")
+            with self._stats_lock:
+                self._stats["sent_messages"] += 1
+                self._stats["sent_events"] += len(batch)
+                self._send_latency_total_ms += latency_ms
+                self._send_latency_max_ms = max(self._send_latency_max_ms, latency_ms)
+                self._last_send_latency_ms = latency_ms
+            return
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            try:
+                self._send_digest(batch)
+            except Exception:  # noqa: BLE001
+                logger.exception("Unexpected error while sending Slack digest")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued event has been sent or given up on."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=timeout)
+
+    def stats(self) -> dict[str, int | float | None]:
+        with self._stats_lock:
+            sent = self._stats["sent_messages"]
+            return {
+                **self._stats,
+                "queue_depth": self._queue.qsize(),
+                "send_latency_avg_ms": round(self._send_latency_total_ms / sent, 2)
+                if sent
+                else None,
+                "send_latency_max_ms": round(self._send_latency_max_ms, 2),
+                "send_latency_last_ms": round(self._last_send_latency_ms, 2)
+                if self._last_send_latency_ms is not None
+                else None,
+            }
+
+
+slack_dispatcher = SlackDigestDispatcher(
+    window_seconds=settings.slack_digest_window_seconds,
+    max_queue_size=settings.slack_queue_max_size,
+    digest_max_ids=settings.slack_digest_max_ids,
+    max_retries=settings.slack_send_max_retries,
+)
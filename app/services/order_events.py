@@ -0,0 +1,214 @@
+"""
+Live order events behind `GET /orders/stream`.
+The orders ETL publishes one event per created or updated order once a batch
+has committed. `OrderEventBroadcaster` hands every event to each open stream
+through a bounded per-stream queue on that stream's event loop: publishing
+never waits on a client, and a stream that falls `ORDER_EVENTS_QUEUE_SIZE`
+events behind loses its backlog and gets a single `resync` event telling it to
+reload from `GET /orders/`. With `ORDER_EVENTS_PG_NOTIFY` on PostgreSQL, events
+travel through `pg_notify` instead and a listener thread in every process feeds
+its local streams, so a sync on one replica reaches clients of all of them.
+"""
+
+import asyncio
+import threading
+from collections.abc import Iterator
+from datetime import datetime, timezone
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import order_events_dropped_total, order_stream_clients
+from app.db.crud import BulkUpsertResult
+from app.services.pg_notify import listen, notify, pg_notify_available
+
+RESYNC_EVENT = {"type": "resync"}
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+_NOTIFY_PAYLOAD_LIMIT = 7500
+
+
+def order_change_events(
+    orders: list[dict], result: BulkUpsertResult, marketplace_id: str | None = None
+) -> list[dict]:
+    """One `order.created` / `order.updated` event per order written in `result`.
+
+    `marketplace_id` stands in for payloads without a MarketplaceId, as it does
+    for the stored row.
+    """
+    kinds = {order_id: "order.created" for order_id in result.created}
+    kinds.update((order_id, "order.updated") for order_id in result.updated)
+    published_at = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "type": kinds[order["AmazonOrderId"]],
+            "amazon_order_id": order["AmazonOrderId"],
+            "marketplace_id": order.get("MarketplaceId") or marketplace_id,
+            "order_status": order.get("OrderStatus"),
+            "purchase_date": order.get("PurchaseDate"),
+            "last_update_date": order.get("LastUpdateDate"),
+            "published_at": published_at,
+        }
+        for order in orders
+        if order["AmazonOrderId"] in kinds
+    ]
+
+
+def _notify_payloads(events: list[dict]) -> Iterator[str]:
+    """Pack events into JSON arrays that fit one NOTIFY payload each."""
+    batch: list[bytes] = []
+    size = 2
+    for event in events:
+        encoded = orjson.dumps(event)
+        if batch and size + len(encoded) + 1 > _NOTIFY_PAYLOAD_LIMIT:
+            yield (b"[" + b",".join(batch) + b"]").decode("utf-8")
+            batch, size = [], 2
+        batch.append(encoded)
+        size += len(encoded) + 1
+    if batch:
+        yield (b"[" + b",".join(batch) + b"]").decode("utf-8")
+
+
+class Subscription:
+    """One open stream: a bounded queue filled on the stream's own event loop."""
+
+    def __init__(
+        self,
+        broadcaster: "OrderEventBroadcaster",
+        max_queue_size: int,
+        marketplace_id: str | None = None,
+    ) -> None:
+        self.marketplace_id = marketplace_id
+        self._broadcaster = broadcaster
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=max_queue_size)
+
+    def _offer(self, events: list[dict]) -> None:
+        for event in events:
+            if self.marketplace_id and event.get("marketplace_id") != self.marketplace_id:
+                continue
+            try:
+                self._queue.put_nowait(event)
+                continue
+            except asyncio.QueueFull:
+                pass
+            # The client is not keeping up: drop its backlog instead of buffering
+            # without bound, and tell it to reload.
+            dropped = self._queue.qsize() + 1
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC_EVENT)
+            self._broadcaster._record_drop(dropped)
+
+    def _close(self) -> None:
+        while self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self) -> dict | None:
+        """Next event, or None once the broadcaster has shut down."""
+        return await self._queue.get()
+
+
+class OrderEventBroadcaster:
+    def __init__(
+        self,
+        max_queue_size: int = 2000,
+        use_pg_notify: bool = False,
+        channel: str = "order_events",
+    ) -> None:
+        self.max_queue_size = max_queue_size
+        self.use_pg_notify = use_pg_notify and pg_notify_available()
+        self.channel = channel
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._stats = {"published": 0, "dropped": 0, "resyncs": 0}
+        self._stop = threading.Event()
+        self._listener: threading.Thread | None = None
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def _record_drop(self, dropped: int) -> None:
+        with self._lock:
+            self._stats["dropped"] += dropped
+            self._stats["resyncs"] += 1
+        order_events_dropped_total.inc(dropped)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self, marketplace_id: str | None = None) -> Subscription:
+        """Register a stream; must be called on the event loop that will read it."""
+        subscription = Subscription(self, self.max_queue_size, marketplace_id)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, events: list[dict]) -> None:
+        """Fan `events` out without blocking on any client; safe from any thread."""
+        if not events:
+            return
+        if self.use_pg_notify:
+            notify(self.channel, _notify_payloads(events))
+            return
+        self._deliver(events)
+
+    def _deliver(self, events: list[dict]) -> None:
+        self._count("published", len(events))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._offer, events)
+            except RuntimeError:
+                # Its event loop is closed; the stream is gone.
+                self.unsubscribe(subscription)
+
+    def _listen(self) -> None:
+        listen(self.channel, self._stop, lambda payload: self._deliver(orjson.loads(payload)))
+
+    def start(self) -> None:
+        """Start the LISTEN thread when events go through PostgreSQL NOTIFY."""
+        if not self.use_pg_notify or (self._listener and self._listener.is_alive()):
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(
+            target=self._listen, name="order-events-listener", daemon=True
+        )
+        self._listener.start()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the listener and end every open stream."""
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=timeout)
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._close)
+            except RuntimeError:
+                pass
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            return {
+                **self._stats,
+                "clients": len(self._subscribers),
+                "pg_notify": self.use_pg_notify,
+            }
+
+
+order_events = OrderEventBroadcaster(
+    max_queue_size=settings.order_events_queue_size,
+    use_pg_notify=settings.order_events_pg_notify,
+)
+order_stream_clients.set_function(lambda: order_events.subscriber_count)
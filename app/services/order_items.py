@@ -0,0 +1,199 @@
+"""
+Line items for synced orders (getOrderItems).
+After an orders ETL batch is written, its created or changed orders are checked
+against `order_items.order_last_update_date` in one query, so only orders whose
+items were never fetched at their current LastUpdateDate call SP-API. The calls
+fan out over `ORDER_ITEMS_MAX_WORKERS` threads (tasks in the async ETL) while
+the transport's per-account token bucket keeps them within the getOrderItems
+rate limit, and the batch's items are swapped in with one DELETE and one bulk
+INSERT. A failed call is logged, counted and recorded in `order_items_pending`;
+the next sync of that account and marketplace retries it before its first batch,
+since an order that does not change again is never part of a batch.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.crud import (
+    BulkUpsertResult,
+    failed_order_items,
+    orders_needing_items,
+    parse_spapi_datetime,
+    record_order_items_results,
+    replace_order_items,
+)
+from app.services.spapi_client import AsyncSPAPIClient, SPAPIClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OrderItemsResult:
+    fetched: int = 0
+    cached: int = 0
+    failed: int = 0
+    retried: int = 0
+    items: int = 0
+
+    def add(self, other: "OrderItemsResult") -> None:
+        self.fetched += other.fetched
+        self.cached += other.cached
+        self.failed += other.failed
+        self.retried += other.retried
+        self.items += other.items
+
+
+def _written_orders(orders: list[dict], result: BulkUpsertResult) -> dict[str, datetime | None]:
+    written_ids = set(result.created) | set(result.updated)
+    return {
+        order["AmazonOrderId"]: parse_spapi_datetime(order.get("LastUpdateDate"))
+        for order in orders
+        if order["AmazonOrderId"] in written_ids
+    }
+
+
+def _store_items(
+    db: Session,
+    client: SPAPIClient | AsyncSPAPIClient,
+    pending: dict[str, datetime | None],
+    fetched: dict[str, list[dict] | None],
+    stats: OrderItemsResult,
+) -> None:
+    items_by_order = {
+        amazon_order_id: items for amazon_order_id, items in fetched.items() if items is not None
+    }
+    failed = {
+        amazon_order_id: pending[amazon_order_id]
+        for amazon_order_id, items in fetched.items()
+        if items is None
+    }
+    stats.fetched += len(items_by_order)
+    stats.failed += len(failed)
+    try:
+        stats.items += replace_order_items(db, items_by_order, pending)
+        record_order_items_results(
+            db, items_by_order, failed, client.account_name, client.marketplace_id
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _fetch_items(client: SPAPIClient, amazon_order_id: str) -> list[dict] | None:
+    try:
+        return client.get_order_items(amazon_order_id)
+    except Exception:  # noqa: BLE001
+        logger.exception("getOrderItems failed for %s", amazon_order_id)
+        return None
+
+
+def _fetch_and_store(
+    db: Session,
+    client: SPAPIClient,
+    pending: dict[str, datetime | None],
+    stats: OrderItemsResult,
+    max_workers: int | None,
+) -> None:
+    workers = max(1, min(max_workers or settings.order_items_max_workers, len(pending)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="order-items") as executor:
+        fetched = dict(
+            zip(pending, executor.map(lambda order_id: _fetch_items(client, order_id), pending))
+        )
+    _store_items(db, client, pending, fetched, stats)
+
+
+def sync_order_items(
+    db: Session,
+    client: SPAPIClient,
+    orders: list[dict],
+    result: BulkUpsertResult,
+    max_workers: int | None = None,
+) -> OrderItemsResult:
+    """Fetch and store items for the orders of `result` that were created or changed."""
+    stats = OrderItemsResult()
+    written = _written_orders(orders, result)
+    pending = orders_needing_items(db, written)
+    stats.cached = len(written) - len(pending)
+    if pending:
+        _fetch_and_store(db, client, pending, stats, max_workers)
+    return stats
+
+
+def retry_failed_order_items(
+    db: Session, client: SPAPIClient, max_workers: int | None = None
+) -> OrderItemsResult:
+    """Refetch items of the client's orders whose last getOrderItems call failed.
+
+    At most `ORDERS_ETL_BATCH_SIZE` orders per call, oldest failure first.
+    """
+    stats = OrderItemsResult()
+    pending = failed_order_items(
+        db, client.account_name, client.marketplace_id, settings.orders_etl_batch_size
+    )
+    stats.retried = len(pending)
+    if pending:
+        _fetch_and_store(db, client, pending, stats, max_workers)
+    return stats
+
+
+async def _fetch_and_store_async(
+    db: AsyncSession,
+    client: AsyncSPAPIClient,
+    pending: dict[str, datetime | None],
+    stats: OrderItemsResult,
+    max_concurrency: int | None,
+) -> None:
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.order_items_max_workers))
+
+    async def fetch(amazon_order_id: str) -> list[dict] | None:
+        async with semaphore:
+            try:
+                return await client.get_order_items(amazon_order_id)
+            except Exception:  # noqa: BLE001
+                logger.exception("getOrderItems failed for %s", amazon_order_id)
+                return None
+
+    fetched = dict(zip(pending, await asyncio.gather(*(fetch(order_id) for order_id in pending))))
+    await db.run_sync(_store_items, client, pending, fetched, stats)
+
+
+async def sync_order_items_async(
+    db: AsyncSession,
+    client: AsyncSPAPIClient,
+    orders: list[dict],
+    result: BulkUpsertResult,
+    max_concurrency: int | None = None,
+) -> OrderItemsResult:
+    """`sync_order_items` on the event loop, with at most `max_concurrency` calls in flight."""
+    stats = OrderItemsResult()
+    written = _written_orders(orders, result)
+    pending = await db.run_sync(orders_needing_items, written)
+    stats.cached = len(written) - len(pending)
+    if pending:
+        await _fetch_and_store_async(db, client, pending, stats, max_concurrency)
+    return stats
+
+
+async def retry_failed_order_items_async(
+    db: AsyncSession, client: AsyncSPAPIClient, max_concurrency: int | None = None
+) -> OrderItemsResult:
+    """`retry_failed_order_items` on the event loop."""
+    stats = OrderItemsResult()
+    pending = await db.run_sync(
+        failed_order_items,
+        client.account_name,
+        client.marketplace_id,
+        settings.orders_etl_batch_size,
+    )
+    stats.retried = len(pending)
+    if pending:
+        await _fetch_and_store_async(db, client, pending, stats, max_concurrency)
+    return stats
@@ -0,0 +1,346 @@
+"""
+Historical order backfill.
+A date range is split into created-date windows per account and marketplace;
+windows run in parallel on `BACKFILL_MAX_WORKERS` threads, each with its own DB
+session, with at most `BACKFILL_MAX_WORKERS_PER_ACCOUNT` windows of one account
+in flight, and every `BACKFILL_BATCH_SIZE` orders are merged with
+`crud.copy_merge_orders` (COPY into a staging table + one INSERT ... ON
+CONFLICT on PostgreSQL) and committed. A finished window is checkpointed in
+`sync_state`, so a rerun skips it. Orders can also come from a JSONL file of
+SP-API order payloads, checkpointed by the number of lines merged.
+Parallel windows, and a scheduled orders sync running at the same time, refresh
+the hourly rollup under its advisory lock (see `crud.refresh_order_metrics`);
+each batch commits right after its refresh so the lock is held only briefly.
+No Slack notifications are sent for backfilled orders.
+
+Every window of an account draws on that account's single getOrders bucket
+(0.0167 requests/s, burst 20). Once the burst is spent the account gets one page
+a minute however many of its windows run, so a second worker per account only
+overlaps one window's merge with another's wait; more workers help only across
+accounts.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import chain, islice, zip_longest
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.core.config import SPAPIAccount, settings
+from app.db.crud import (
+    copy_merge_orders,
+    get_sync_checkpoint,
+    parse_spapi_datetime,
+    refresh_order_metrics,
+    save_sync_checkpoint,
+)
+from app.db.session import EtlSessionLocal
+from app.services.etl_orders import chunked, enrich_order_payload
+from app.services.response_cache import response_cache
+from app.services.run_log import run_logger
+from app.services.spapi_client import SPAPIClient
+
+logger = logging.getLogger(__name__)
+
+_CHECKPOINT_DONE = "done"
+# SP-API requires CreatedBefore to be at least two minutes in the past.
+_CREATED_BEFORE_LAG = timedelta(minutes=2)
+
+
+@dataclass
+class BackfillWindow:
+    account: SPAPIAccount
+    marketplace_id: str
+    start: datetime
+    end: datetime
+
+    @property
+    def checkpoint_key(self) -> str:
+        return (
+            f"backfill:{self.account.name}:{self.marketplace_id}:"
+            f"{self.start:%Y%m%dT%H%M%S}-{self.end:%Y%m%dT%H%M%S}"
+        )
+
+
+@dataclass
+class BackfillStats:
+    fetched: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def add(self, other: "BackfillStats") -> None:
+        self.fetched += other.fetched
+        self.created += other.created
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+
+
+def _spapi_ts(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def plan_windows(
+    accounts: list[SPAPIAccount],
+    start: datetime,
+    end: datetime,
+    window: timedelta,
+    marketplace_id: str | None = None,
+) -> list[BackfillWindow]:
+    """Split [start, end) into `window`-sized slices for every account/marketplace pair."""
+    end = min(end, datetime.now(timezone.utc) - _CREATED_BEFORE_LAG)
+    windows = []
+    for account in accounts:
+        for account_marketplace_id in account.marketplace_ids:
+            if marketplace_id and account_marketplace_id != marketplace_id:
+                continue
+            window_start = start
+            while window_start < end:
+                window_end = min(window_start + window, end)
+                windows.append(
+                    BackfillWindow(account, account_marketplace_id, window_start, window_end)
+                )
+                window_start = window_end
+    return windows
+
+
+def _merge_batch(
+    db: Session, batch: list[dict], stats: BackfillStats, marketplace_id: str | None = None
+) -> None:
+    try:
+        result = copy_merge_orders(db, batch, marketplace_id)
+        written_ids = set(result.created) | set(result.updated)
+        refresh_order_metrics(
+            db,
+            (
+                parse_spapi_datetime(order.get("PurchaseDate"))
+                for order in batch
+                if order["AmazonOrderId"] in written_ids
+            ),
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if result.upserted:
+        response_cache.invalidate("orders")
+    stats.fetched += len(batch)
+    stats.created += len(result.created)
+    stats.updated += len(result.updated)
+    stats.unchanged += result.unchanged
+
+
+def _backfill_window(window: BackfillWindow, batch_size: int) -> tuple[BackfillStats, dict]:
+    started = time.perf_counter()
+    stats = BackfillStats()
+    db = EtlSessionLocal()
+    try:
+        with run_logger.track(
+            "etl_run",
+            "orders_backfill",
+            account=window.account.name,
+            marketplace_id=window.marketplace_id,
+        ) as entry:
+            client = SPAPIClient(window.account, window.marketplace_id)
+            orders = (
+                enrich_order_payload(order)
+                for page in client.iter_order_pages(
+                    created_after=_spapi_ts(window.start),
+                    created_before=_spapi_ts(window.end),
+                )
+                for order in page
+            )
+            for batch in chunked(orders, batch_size):
+                _merge_batch(db, batch, stats, window.marketplace_id)
+            save_sync_checkpoint(db, window.checkpoint_key, _CHECKPOINT_DONE)
+            db.commit()
+            entry.rows = stats.fetched
+            entry.details = {**asdict(stats), "window": window.checkpoint_key}
+        error = None
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Backfill window %s failed", window.checkpoint_key)
+        error = f"{exc.__class__.__name__}: {exc}"
+    finally:
+        db.close()
+    return stats, {
+        "window": window.checkpoint_key,
+        **asdict(stats),
+        "seconds": round(time.perf_counter() - started, 3),
+        "error": error,
+    }
+
+
+def _interleave_by_account(windows: list[BackfillWindow]) -> list[BackfillWindow]:
+    """Round-robin over accounts, so queued windows rarely wait on a busy account."""
+    by_account: dict[str, list[BackfillWindow]] = {}
+    for window in windows:
+        by_account.setdefault(window.account.name, []).append(window)
+    return [
+        window
+        for window in chain.from_iterable(zip_longest(*by_account.values()))
+        if window is not None
+    ]
+
+
+def _pending_windows(windows: list[BackfillWindow], restart: bool) -> list[BackfillWindow]:
+    if restart:
+        return windows
+    db = EtlSessionLocal()
+    try:
+        return [
+            window
+            for window in windows
+            if get_sync_checkpoint(db, window.checkpoint_key) != _CHECKPOINT_DONE
+        ]
+    finally:
+        db.close()
+
+
+def _summary(stats: BackfillStats, seconds: float, **extra: object) -> dict:
+    return {
+        **extra,
+        **asdict(stats),
+        "seconds": round(seconds, 3),
+        "orders_per_second": round(stats.fetched / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def run_spapi_backfill(
+    start: datetime,
+    end: datetime,
+    accounts: list[SPAPIAccount] | None = None,
+    marketplace_id: str | None = None,
+    window: timedelta | None = None,
+    max_workers: int | None = None,
+    batch_size: int | None = None,
+    restart: bool = False,
+    max_workers_per_account: int | None = None,
+) -> dict:
+    """Backfill orders created in [start, end) from SP-API, windows in parallel.
+
+    At most `max_workers_per_account` windows of one account run at once, since
+    they share its getOrders quota. Windows already checkpointed as done are
+    skipped unless `restart` is set. A failing window is reported and left
+    unchecked so the next run retries it.
+    """
+    accounts = accounts if accounts is not None else settings.spapi_accounts
+    window = window or timedelta(days=settings.backfill_window_days)
+    batch_size = batch_size or settings.backfill_batch_size
+    windows = plan_windows(accounts, start, end, window, marketplace_id)
+    pending = _interleave_by_account(_pending_windows(windows, restart))
+    per_account = max(
+        1, max_workers_per_account or settings.backfill_max_workers_per_account
+    )
+    account_slots = {
+        window.account.name: threading.Semaphore(per_account) for window in pending
+    }
+
+    def run_window(window: BackfillWindow) -> tuple[BackfillStats, dict]:
+        with account_slots[window.account.name]:
+            return _backfill_window(window, batch_size)
+
+    started = time.perf_counter()
+    stats = BackfillStats()
+    results: list[dict] = []
+    if pending:
+        workers = min(
+            max_workers or settings.backfill_max_workers,
+            len(pending),
+            per_account * len(account_slots),
+        )
+        with ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="orders-backfill"
+        ) as executor:
+            futures = [executor.submit(run_window, window) for window in pending]
+            for future in futures:
+                window_stats, result = future.result()
+                stats.add(window_stats)
+                results.append(result)
+
+    return _summary(
+        stats,
+        time.perf_counter() - started,
+        windows=len(windows),
+        skipped=len(windows) - len(pending),
+        failed=sum(1 for result in results if result["error"]),
+        results=results,
+    )
+
+
+def _jsonl_checkpoint_key(path: Path, start: datetime | None, end: datetime | None) -> str:
+    identity = f"{path.resolve()}|{start}|{end}"
+    return f"backfill:jsonl:{hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _in_range(order: dict, start: datetime | None, end: datetime | None) -> bool:
+    if start is None and end is None:
+        return True
+    purchase_date = parse_spapi_datetime(order.get("PurchaseDate"))
+    if purchase_date is None:
+        return False
+    return (start is None or purchase_date >= start) and (end is None or purchase_date < end)
+
+
+def _read_jsonl(lines: Iterable[str]) -> Iterator[dict]:
+    for line in lines:
+        line = line.strip()
+        yield json.loads(line) if line else {}
+
+
+def run_jsonl_backfill(
+    path: str | Path,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: int | None = None,
+    restart: bool = False,
+) -> dict:
+    """Backfill SP-API order payloads from a JSONL file (one order per line).
+
+    Lines are merged in order, `batch_size` at a time; after each commit the
+    number of lines consumed is checkpointed, so a rerun continues after the last
+    merged batch. Payloads are stored as-is and filtered to PurchaseDate in
+    [start, end) when either bound is given.
+    """
+    path = Path(path)
+    batch_size = batch_size or settings.backfill_batch_size
+    checkpoint_key = _jsonl_checkpoint_key(path, start, end)
+    started = time.perf_counter()
+    stats = BackfillStats()
+    db = EtlSessionLocal()
+    try:
+        consumed = 0 if restart else int(get_sync_checkpoint(db, checkpoint_key) or 0)
+        skipped_lines = consumed
+        with run_logger.track("etl_run", "orders_backfill") as entry:
+            with path.open(encoding="utf-8") as handle:
+                lines = islice(handle, consumed, None)
+                while chunk := list(islice(lines, batch_size)):
+                    batch = [
+                        order
+                        for order in _read_jsonl(chunk)
+                        if order.get("AmazonOrderId") and _in_range(order, start, end)
+                    ]
+                    if batch:
+                        _merge_batch(db, batch, stats)
+                    # Re-merging a batch after a crash here is harmless; the merge is idempotent.
+                    consumed += len(chunk)
+                    save_sync_checkpoint(db, checkpoint_key, str(consumed))
+                    db.commit()
+            entry.rows = stats.fetched
+            entry.details = {**asdict(stats), "file": path.name, "lines": consumed}
+    finally:
+        db.close()
+    return _summary(
+        stats,
+        time.perf_counter() - started,
+        file=str(path),
+        lines=consumed,
+        skipped_lines=skipped_lines,
+    )
@@ -0,0 +1,113 @@
+"""
+Encoders for bulk order exports.
+Each encoder consumes the row chunks produced by `crud.stream_orders` and yields
+bytes chunk by chunk, so an export of any size holds at most one chunk of rows
+plus its encoded form in memory. Parquet output needs the optional `pyarrow`
+package and writes one row group per chunk.
+"""
+
+import csv
+import io
+from collections.abc import Iterator
+from datetime import datetime
+
+from sqlalchemy.engine import Row
+
+EXPORT_COLUMNS = (
+    "id",
+    "amazon_order_id",
+    "marketplace_id",
+    "order_status",
+    "purchase_date",
+    "last_update_date",
+    "synced_at",
+    "buyer",
+    "amount",
+    "cost",
+)
+
+
+def _csv_value(value: object) -> object:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_csv(chunks: Iterator[list[Row]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(
+            [_csv_value(value) for value in row[: len(EXPORT_COLUMNS)]] for row in rows
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def require_parquet() -> None:
+    """Raise RuntimeError if pyarrow is missing, before any bytes are streamed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from exc
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever ParquetWriter wrote since the last drain."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_parquet(chunks: Iterator[list[Row]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("amazon_order_id", pa.string()),
+            ("marketplace_id", pa.string()),
+            ("order_status", pa.string()),
+            ("purchase_date", timestamp),
+            ("last_update_date", timestamp),
+            ("synced_at", timestamp),
+            ("buyer", pa.string()),
+            ("amount", pa.float64()),
+            ("cost", pa.float64()),
+        ]
+    )
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for rows in chunks:
+            columns = list(zip(*(row[: len(EXPORT_COLUMNS)] for row in rows)))
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema,
+                )
+            )
+            yield sink.drain()
+    # Closing the writer appends the footer.
+    yield sink.drain()
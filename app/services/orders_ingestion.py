@@ -0,0 +1,150 @@
+"""
+Order ingestion across every configured seller account and marketplace.
+Each (account, marketplace) pair runs `run_orders_etl` with its own DB session
+on a bounded worker pool (`ORDERS_INGEST_MAX_WORKERS`). Requests share the
+process-wide HTTP transport, whose token buckets are keyed per account, so one
+busy account never spends another account's SP-API quota.
+`run_orders_ingestion_async` does the same on the running event loop with
+`run_orders_etl_async`, one `AsyncSession` per pair; the scheduler uses it when
+ASYNC_DB_ENABLED is set.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import SPAPIAccount, settings
+from app.db.session import EtlSessionLocal, open_async_session
+from app.services.etl_orders import run_orders_etl, run_orders_etl_async
+from app.services.spapi_client import AsyncSPAPIClient, SPAPIClient
+
+logger = logging.getLogger(__name__)
+
+
+def _ingest_marketplace(
+    account: SPAPIAccount, marketplace_id: str, generate_demo: bool
+) -> dict[str, int | float | str | None | list[dict[str, str | float | None]]]:
+    started = time.perf_counter()
+    db = EtlSessionLocal()
+    try:
+        result = run_orders_etl(
+            db,
+            client=SPAPIClient(account, marketplace_id),
+            generate_demo=generate_demo,
+        )
+        result["error"] = None
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Order ingestion failed for %s/%s", account.name, marketplace_id)
+        result = {"error": f"{exc.__class__.__name__}: {exc}", "orders": []}
+    finally:
+        db.close()
+    result["account"] = account.name
+    result["marketplace_id"] = marketplace_id
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+async def _ingest_marketplace_async(
+    account: SPAPIAccount, marketplace_id: str, generate_demo: bool
+) -> dict[str, int | float | str | None | list[dict[str, str | float | None]]]:
+    started = time.perf_counter()
+    try:
+        async with open_async_session() as db:
+            result = await run_orders_etl_async(
+                db,
+                client=AsyncSPAPIClient(account, marketplace_id),
+                generate_demo=generate_demo,
+            )
+        result["error"] = None
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Order ingestion failed for %s/%s", account.name, marketplace_id)
+        result = {"error": f"{exc.__class__.__name__}: {exc}", "orders": []}
+    result["account"] = account.name
+    result["marketplace_id"] = marketplace_id
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _targets(accounts: list[SPAPIAccount] | None) -> list[tuple[SPAPIAccount, str]]:
+    accounts = accounts if accounts is not None else settings.spapi_accounts
+    return [
+        (account, marketplace_id)
+        for account in accounts
+        for marketplace_id in account.marketplace_ids
+    ]
+
+
+def _summarize(marketplaces: list[dict], started: float) -> dict[str, int | float | list[dict]]:
+    orders: list[dict[str, str | float | None]] = []
+    for entry in marketplaces:
+        room = settings.orders_sync_summary_limit - len(orders)
+        orders.extend(entry.pop("orders", [])[: max(room, 0)])
+
+    totals = {
+        key: sum(entry.get(key, 0) for entry in marketplaces)
+        for key in ("fetched", "changed", "unchanged", "created", "demo_generated")
+    }
+    return {
+        **totals,
+        "upserted": totals["changed"],
+        "failed": sum(1 for entry in marketplaces if entry["error"]),
+        "seconds": round(time.perf_counter() - started, 3),
+        "marketplaces": marketplaces,
+        "orders": orders,
+    }
+
+
+def run_orders_ingestion(
+    accounts: list[SPAPIAccount] | None = None,
+    max_workers: int | None = None,
+) -> dict[str, int | float | list[dict]]:
+    """Sync orders for every account/marketplace pair concurrently.
+
+    A failing marketplace is reported in its own entry and does not stop the
+    others. The synthetic DEMO_MODE order is generated once, by the first pair.
+    """
+    targets = _targets(accounts)
+    max_workers = max_workers or settings.orders_ingest_max_workers
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(targets))),
+        thread_name_prefix="orders-ingest",
+    ) as executor:
+        futures = [
+            executor.submit(
+                _ingest_marketplace, account, marketplace_id, settings.demo_mode and index == 0
+            )
+            for index, (account, marketplace_id) in enumerate(targets)
+        ]
+        marketplaces = [future.result() for future in futures]
+    return _summarize(marketplaces, started)
+
+
+async def run_orders_ingestion_async(
+    accounts: list[SPAPIAccount] | None = None,
+    max_concurrency: int | None = None,
+) -> dict[str, int | float | list[dict]]:
+    """`run_orders_ingestion` on the event loop, at most `max_concurrency` pairs at once.
+
+    The caller owns the loop, so it closes `async_http_transport` and disposes
+    the async engine before the loop ends.
+    """
+    targets = _targets(accounts)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.orders_ingest_max_workers))
+
+    async def ingest(index: int, account: SPAPIAccount, marketplace_id: str) -> dict:
+        async with semaphore:
+            return await _ingest_marketplace_async(
+                account, marketplace_id, settings.demo_mode and index == 0
+            )
+
+    started = time.perf_counter()
+    marketplaces = await asyncio.gather(
+        *(
+            ingest(index, account, marketplace_id)
+            for index, (account, marketplace_id) in enumerate(targets)
+        )
+    )
+    return _summarize(list(marketplaces), started)
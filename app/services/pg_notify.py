@@ -0,0 +1,57 @@
+"""
+PostgreSQL LISTEN/NOTIFY plumbing shared by the order event stream and the
+response cache. `notify()` sends payloads in one transaction on the ETL pool;
+`listen()` blocks on a dedicated autocommit psycopg connection, handing each
+payload to a callback and reconnecting after errors, until its stop event is set.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Iterable
+
+from sqlalchemy import text
+
+from app.db.session import etl_engine
+
+logger = logging.getLogger(__name__)
+
+
+def pg_notify_available() -> bool:
+    return etl_engine.dialect.name == "postgresql"
+
+
+def notify(channel: str, payloads: Iterable[str]) -> None:
+    with etl_engine.begin() as connection:
+        for payload in payloads:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": channel, "payload": payload},
+            )
+
+
+def listen(
+    channel: str,
+    stop: threading.Event,
+    handle: Callable[[str], None],
+    on_connect: Callable[[], None] | None = None,
+) -> None:
+    """LISTEN on `channel` until `stop` is set, calling `handle(payload)` per notification.
+
+    `on_connect` runs after every (re)connect, once LISTEN is in place, so callers
+    can make up for notifications missed while disconnected.
+    """
+    import psycopg
+
+    conninfo = etl_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    while not stop.is_set():
+        try:
+            with psycopg.connect(conninfo, autocommit=True) as connection:
+                connection.execute(f'LISTEN "{channel}"')
+                if on_connect is not None:
+                    on_connect()
+                while not stop.is_set():
+                    for notification in connection.notifies(timeout=1.0):
+                        handle(notification.payload)
+        except Exception:  # noqa: BLE001
+            logger.exception("Listener on %s failed; reconnecting", channel)
+            stop.wait(5)
@@ -0,0 +1,306 @@
+"""
+Cache for serialized read-endpoint responses.
+Entries are keyed by namespace, the namespace's current generation, path and
+query string. Writers never delete keys: `invalidate()` bumps the namespace
+generation, so every key built afterwards misses and old entries simply age out.
+A response built while an ETL batch commits is stored under the generation it
+started with and is never served after the bump. The backend also records when
+each namespace was last invalidated, so read routes can tell when the replica
+may not have caught up yet (see `app.api.deps`). The default backend is an
+in-process TTL/LRU map; `RESPONSE_CACHE_REDIS_URL` shares entries and
+generations across API replicas instead.
+With the in-process backend on PostgreSQL, `invalidate()` also sends the
+namespaces over `pg_notify` (RESPONSE_CACHE_PG_NOTIFY, on by default) and a
+listener thread in every API process bumps its own generations, so a sync run
+by another replica or by the backfill CLI does not leave stale pages behind.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Protocol
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import registry, response_cache_requests
+from app.services.pg_notify import listen, notify, pg_notify_available
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "CachedResponse":
+        return cls(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+class CacheBackend(Protocol):
+    blocking: bool
+    # Whether every process already sees the same entries and generations.
+    shared: bool
+
+    def get(self, key: str) -> CachedResponse | None: ...
+
+    def set(self, key: str, value: CachedResponse) -> None: ...
+
+    def generation(self, namespace: str) -> int: ...
+
+    def bump(self, namespace: str) -> int: ...
+
+    def invalidated_at(self, namespace: str) -> float | None: ...
+
+    def size(self) -> int: ...
+
+
+class InMemoryCacheBackend:
+    blocking = False
+    shared = False
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._invalidated_at: dict[str, float] = {}
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def bump(self, namespace: str) -> int:
+        prefix = f"{namespace}:"
+        with self._lock:
+            generation = self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._invalidated_at[namespace] = time.time()
+            # Unreachable after the bump anyway; dropping them just frees memory early.
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+            return generation
+
+    def invalidated_at(self, namespace: str) -> float | None:
+        with self._lock:
+            return self._invalidated_at.get(namespace)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Shared backend; entries expire through Redis TTLs, LRU is left to `maxmemory-policy`."""
+
+    blocking = True
+    shared = True
+    _KEY_PREFIX = "response_cache:"
+
+    def __init__(self, url: str, ttl_seconds: float = 300.0) -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "RESPONSE_CACHE_REDIS_URL is set but the redis package is not installed "
+                "(pip install redis)"
+            ) from exc
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> CachedResponse | None:
+        raw = self._client.get(self._KEY_PREFIX + key)
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return CachedResponse(body=body, etag=etag.decode())
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        self._client.set(
+            self._KEY_PREFIX + key,
+            value.etag.encode() + b"\n" + value.body,
+            px=int(self.ttl_seconds * 1000),
+        )
+
+    def generation(self, namespace: str) -> int:
+        return int(self._client.get(f"{self._KEY_PREFIX}generation:{namespace}") or 0)
+
+    def bump(self, namespace: str) -> int:
+        pipeline = self._client.pipeline()
+        pipeline.incr(f"{self._KEY_PREFIX}generation:{namespace}")
+        pipeline.set(f"{self._KEY_PREFIX}invalidated_at:{namespace}", repr(time.time()))
+        return int(pipeline.execute()[0])
+
+    def invalidated_at(self, namespace: str) -> float | None:
+        raw = self._client.get(f"{self._KEY_PREFIX}invalidated_at:{namespace}")
+        return float(raw) if raw is not None else None
+
+    def size(self) -> int:
+        return -1
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        enabled: bool = True,
+        use_pg_notify: bool = False,
+        channel: str = "response_cache",
+    ) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self.use_pg_notify = (
+            use_pg_notify and enabled and not backend.shared and pg_notify_available()
+        )
+        self.channel = channel
+        self._origin = uuid.uuid4().hex
+        self._namespaces: set[str] = set()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "not_modified": 0,
+            "invalidations": 0,
+            "remote_invalidations": 0,
+        }
+        self._stop = threading.Event()
+        self._listener: threading.Thread | None = None
+
+    def _count(self, name: str, namespace: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+        if registry.enabled and name not in ("invalidations", "remote_invalidations"):
+            response_cache_requests.inc(namespace=namespace, result=name)
+
+    def key(self, namespace: str, path: str, query: Iterable[tuple[str, str]]) -> str:
+        self._namespaces.add(namespace)
+        generation = self.backend.generation(namespace)
+        return f"{namespace}:{generation}:{path}?{sorted(query)}"
+
+    def get(self, namespace: str, key: str) -> CachedResponse | None:
+        cached = self.backend.get(key)
+        self._count("hits" if cached is not None else "misses", namespace)
+        return cached
+
+    def put(self, key: str, body: bytes) -> CachedResponse:
+        cached = CachedResponse.from_body(body)
+        self.backend.set(key, cached)
+        return cached
+
+    def record_not_modified(self, namespace: str) -> None:
+        self._count("not_modified", namespace)
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Make every response cached so far for `namespaces` unreachable, in every process."""
+        if not self.enabled:
+            return
+        for namespace in namespaces:
+            self.backend.bump(namespace)
+            self._count("invalidations", namespace)
+        if self.use_pg_notify and namespaces:
+            payload = orjson.dumps({"origin": self._origin, "namespaces": namespaces})
+            try:
+                notify(self.channel, [payload.decode("utf-8")])
+            except Exception:  # noqa: BLE001
+                # The data is already committed; other processes catch up within the TTL.
+                logger.exception("Failed to publish cache invalidation for %s", namespaces)
+
+    def _on_notification(self, payload: str) -> None:
+        message = orjson.loads(payload)
+        if message["origin"] == self._origin:
+            return
+        for namespace in message["namespaces"]:
+            self.backend.bump(namespace)
+            self._count("remote_invalidations", namespace)
+
+    def _on_listen(self) -> None:
+        # Invalidations sent while the listener was down are lost; start over.
+        for namespace in list(self._namespaces):
+            self.backend.bump(namespace)
+
+    def start(self) -> None:
+        """Listen for other processes' invalidations; warn if nothing propagates them."""
+        if not self.enabled or self.backend.shared:
+            return
+        if not self.use_pg_notify:
+            if pg_notify_available():
+                logger.warning(
+                    "Response cache is per process and RESPONSE_CACHE_PG_NOTIFY is off: "
+                    "syncs run by other replicas or the backfill CLI are served stale for up "
+                    "to %ss; set RESPONSE_CACHE_REDIS_URL or RESPONSE_CACHE_PG_NOTIFY=true",
+                    settings.response_cache_ttl_seconds,
+                )
+            return
+        if self._listener and self._listener.is_alive():
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(
+            target=listen,
+            args=(self.channel, self._stop, self._on_notification, self._on_listen),
+            name="response-cache-listener",
+            daemon=True,
+        )
+        self._listener.start()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=timeout)
+
+    def invalidated_within(self, namespace: str, seconds: float) -> bool:
+        """Whether any process sharing the backend invalidated `namespace` in the last `seconds`."""
+        invalidated_at = self.backend.invalidated_at(namespace)
+        return invalidated_at is not None and time.time() - invalidated_at < seconds
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {
+            "enabled": self.enabled,
+            **stats,
+            "entries": self.backend.size(),
+            "pg_notify": self.use_pg_notify,
+        }
+
+
+def _build_backend() -> CacheBackend:
+    if settings.response_cache_redis_url:
+        return RedisCacheBackend(
+            settings.response_cache_redis_url, ttl_seconds=settings.response_cache_ttl_seconds
+        )
+    return InMemoryCacheBackend(
+        max_entries=settings.response_cache_max_entries,
+        ttl_seconds=settings.response_cache_ttl_seconds,
+    )
+
+
+response_cache = ResponseCache(
+    _build_backend() if settings.response_cache_enabled else InMemoryCacheBackend(max_entries=0),
+    enabled=settings.response_cache_enabled,
+    use_pg_notify=settings.response_cache_pg_notify,
+)
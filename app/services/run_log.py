@@ -0,0 +1,225 @@
+"""
+Structured run log for ETL runs and SP-API calls.
+Callers wrap work in `run_logger.track(...)`, which times it and captures the
+outcome; entries are queued in memory and a worker thread writes them to the
+append-only `run_logs` table in batches (one executemany + commit per batch).
+The same worker prunes rows older than `RUN_LOG_RETENTION_DAYS`, so the table
+stays bounded. Like the Slack dispatcher, the queue is bounded and entries
+beyond it are dropped and counted rather than slowing the caller down.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.db.crud import insert_run_logs, prune_run_logs
+from app.db.session import EtlSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunLogEntry:
+    kind: str
+    name: str
+    account: str | None = None
+    marketplace_id: str | None = None
+    http_status: int | None = None
+    rows: int | None = None
+    details: dict = field(default_factory=dict)
+
+
+class RunLogWriter:
+    def __init__(
+        self,
+        enabled: bool = True,
+        batch_size: int = 200,
+        flush_interval_seconds: float = 2.0,
+        max_queue_size: int = 10_000,
+        retention_days: int = 14,
+        prune_interval_seconds: float = 3600.0,
+    ) -> None:
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.retention_days = retention_days
+        self.prune_interval_seconds = prune_interval_seconds
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"recorded": 0, "dropped": 0, "written": 0, "failed": 0, "pruned": 0}
+        self._next_prune = 0.0
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(
+                    target=self._run, name="run-log-writer", daemon=True
+                )
+                self._worker.start()
+
+    def record(
+        self,
+        entry: RunLogEntry,
+        status: str,
+        duration_ms: float,
+        error: str | None = None,
+    ) -> bool:
+        """Queue one finished entry; returns False when logging is off or it was dropped."""
+        if not self.enabled:
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(
+                {
+                    "created_at": datetime.utcnow(),
+                    "kind": entry.kind,
+                    "name": entry.name,
+                    "status": status,
+                    "http_status": entry.http_status,
+                    "duration_ms": round(duration_ms, 3),
+                    "rows": entry.rows,
+                    "account": entry.account,
+                    "marketplace_id": entry.marketplace_id,
+                    "error": error,
+                    "details": entry.details or None,
+                }
+            )
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("recorded")
+        return True
+
+    @contextmanager
+    def track(
+        self,
+        kind: str,
+        name: str,
+        account: str | None = None,
+        marketplace_id: str | None = None,
+    ) -> Iterator[RunLogEntry]:
+        """Time the block and record it as `ok`, or as `error` if it raises.
+
+        The block fills in `rows`, `http_status` and `details` on the yielded
+        entry. Exceptions are recorded and re-raised unchanged.
+        """
+        entry = RunLogEntry(kind, name, account=account, marketplace_id=marketplace_id)
+        started = time.perf_counter()
+        try:
+            yield entry
+        except BaseException as exc:
+            self.record(
+                entry,
+                "error",
+                (time.perf_counter() - started) * 1000,
+                error=f"{exc.__class__.__name__}: {exc}",
+            )
+            raise
+        self.record(entry, "ok", (time.perf_counter() - started) * 1000)
+
+    def _collect_batch(self) -> list[dict]:
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[dict]) -> None:
+        db = EtlSessionLocal()
+        try:
+            insert_run_logs(db, batch)
+            db.commit()
+            self._count("written", len(batch))
+        except Exception:  # noqa: BLE001
+            db.rollback()
+            self._count("failed", len(batch))
+            logger.exception("Failed to write %d run log entries", len(batch))
+        finally:
+            db.close()
+
+    def prune(self) -> int:
+        """Delete entries older than the retention window; returns rows deleted."""
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        db = EtlSessionLocal()
+        try:
+            deleted = prune_run_logs(db, cutoff)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self._count("pruned", deleted)
+        return deleted
+
+    def _maybe_prune(self) -> None:
+        if self.retention_days <= 0 or time.monotonic() < self._next_prune:
+            return
+        self._next_prune = time.monotonic() + self.prune_interval_seconds
+        try:
+            self.prune()
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to prune run logs")
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect_batch()
+            if batch:
+                try:
+                    self._write(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+            self._maybe_prune()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued entry has been written or given up on."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=timeout)
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return {**self._stats, "queue_depth": self._queue.qsize()}
+
+
+run_logger = RunLogWriter(
+    enabled=settings.run_log_enabled,
+    batch_size=settings.run_log_batch_size,
+    flush_interval_seconds=settings.run_log_flush_interval_seconds,
+    max_queue_size=settings.run_log_queue_max_size,
+    retention_days=settings.run_log_retention_days,
+)
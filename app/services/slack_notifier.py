@@ -3,27 +3,56 @@ import logging
 import requests
 
 from app.core.config import settings
+from app.services.http_transport import http_transport
 
 logger = logging.getLogger(__name__)
 
 
-def send_sandbox_order_received(order_id: str, order_status: str | None) -> None:
-    if not settings.slack_webhook_url:
-        return
-
+def _build_order_message(order_id: str, order_status: str | None) -> str:
     status_text = order_status or "Unknown"
-    message = (
+    return (
         f"🚀 [Amazon Sandbox Order Received]*\n"
         f" *주문번호:* `{order_id}`\n"
         f" *상태:* {status_text}\n"
     )
 
+
+def build_order_digest_message(
+    orders: list[tuple[str, str | None]],
+    max_listed: int = 10,
+) -> str:
+    if len(orders) == 1:
+        return _build_order_message(*orders[0])
+
+    lines = [f"🚀 [Amazon Sandbox Orders Received]* {len(orders)} new orders"]
+    for order_id, order_status in orders[:max_listed]:
+        lines.append(f" • `{order_id}` ({order_status or 'Unknown'})")
+    if len(orders) > max_listed:
+        lines.append(f" … and {len(orders) - max_listed} more")
+    return "\n".join(lines) + "\n"
+
+
+def post_slack_message(message: str) -> None:
+    """Post `message` to the configured webhook; raises requests.RequestException on failure.
+
+    Sent once: the webhook POST is not idempotent, so retries are left to the
+    caller (`SlackDigestDispatcher`), which knows when a retry could duplicate.
+    """
+    response = http_transport.request(
+        "POST",
+        settings.slack_webhook_url,
+        json={"text": message},
+        timeout=10,
+        max_retries=0,
+    )
+    response.raise_for_status()
+
+
+def send_sandbox_order_received(order_id: str, order_status: str | None) -> None:
+    if not settings.slack_webhook_url:
+        return
+
     try:
-        response = requests.post(
-            settings.slack_webhook_url,
-            json={"text": message},
-            timeout=10,
-        )
-        response.raise_for_status()
+        post_slack_message(_build_order_message(order_id, order_status))
     except requests.RequestException as exc:
         logger.warning("Failed to send Slack notification for order %s: %s", order_id, exc)
@@ -1,17 +1,78 @@
-from urllib.parse import urlencode
+import asyncio
+import queue
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+from urllib.parse import quote, urlencode
 
-import requests
+from app.core.config import SPAPIAccount, settings
+from app.core.metrics import registry, spapi_request_seconds
+from app.services.http_transport import async_http_transport, http_transport
+from app.services.lwa_token_cache import lwa_token_cache
+from app.services.run_log import RunLogEntry, run_logger
 
-from app.core.config import settings
+T = TypeVar("T")
 
+_PREFETCH_DONE = object()
 
-class SPAPIClient:
-    def __init__(self) -> None:
-        self.client_id = settings.spapi_client_id
-        self.client_secret = settings.spapi_client_secret
-        self.refresh_token = settings.spapi_refresh_token
-        self.sandbox_endpoint = settings.spapi_sandbox_endpoint.rstrip("/")
-        self.marketplace_id = settings.spapi_marketplace_id
+
+def prefetch_iter(source: Iterator[T], depth: int = 1) -> Iterator[T]:
+    """Drive `source` on a background thread, keeping up to `depth` items ready.
+
+    Lets the next SP-API page download while the caller is still writing the
+    current one. Producer errors are re-raised in the consumer; closing the
+    generator early stops the producer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def _put(item: object) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in source:
+                if not _put(item):
+                    return
+        except BaseException as exc:  # noqa: BLE001
+            _put(exc)
+            return
+        _put(_PREFETCH_DONE)
+
+    producer = threading.Thread(target=_produce, name="spapi-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+
+class _SPAPIClientBase:
+    def __init__(
+        self, account: SPAPIAccount | None = None, marketplace_id: str | None = None
+    ) -> None:
+        account = account or settings.spapi_accounts[0]
+        self.account_name = account.name
+        self.client_id = account.client_id
+        self.client_secret = account.client_secret
+        self.refresh_token = account.refresh_token
+        self.lwa_token_url = account.lwa_token_url
+        self.sandbox_endpoint = account.endpoint
+        self.marketplace_id = marketplace_id or account.marketplace_ids[0]
 
     def _validate_credentials(self) -> None:
         missing = []
@@ -24,39 +85,304 @@ class SPAPIClient:
         if missing:
             raise RuntimeError(f"Missing SP-API credentials: {', '.join(missing)}")
 
-    def get_lwa_access_token(self) -> str:
-        self._validate_credentials()
-        response = requests.post(
-            "https://api.amazon.com/auth/o2/token",
-            data={
+    def _token_cache_key(self) -> tuple[str, str, str]:
+        return (self.lwa_token_url, self.client_id, self.refresh_token)
+
+    @contextmanager
+    def _track_call(self, operation: str) -> Iterator[RunLogEntry]:
+        """Run-log the call and observe its latency, labelled by HTTP status."""
+        started = time.perf_counter()
+        entry: RunLogEntry | None = None
+        try:
+            with run_logger.track(
+                "spapi_call",
+                operation,
+                account=self.account_name,
+                marketplace_id=self.marketplace_id,
+            ) as entry:
+                yield entry
+        finally:
+            if registry.enabled:
+                status = entry.http_status if entry and entry.http_status else "error"
+                spapi_request_seconds.observe(
+                    time.perf_counter() - started, operation=operation, status=status
+                )
+
+    @staticmethod
+    def _record_rows(entry: RunLogEntry, body: dict) -> None:
+        payload = body.get("payload")
+        if isinstance(payload, dict):
+            entry.rows = sum(len(value) for value in payload.values() if isinstance(value, list))
+
+    def _lwa_token_request(self) -> dict[str, object]:
+        return {
+            "data": {
                 "grant_type": "refresh_token",
                 "refresh_token": self.refresh_token,
                 "client_id": self.client_id,
                 "client_secret": self.client_secret,
             },
-            headers={"Content-Type": "application/x-www-form-urlencoded;charset=UTF-8"},
-            timeout=30,
-        )
-        response.raise_for_status()
-        return response.json()["access_token"]
+            "headers": {"Content-Type": "application/x-www-form-urlencoded;charset=UTF-8"},
+            "timeout": 30,
+        }
 
-    def get_sandbox_orders(self, created_after: str = "TEST_CASE_200") -> list[dict]:
+    @staticmethod
+    def _lwa_token(body: dict) -> tuple[str, int]:
+        return body["access_token"], int(body.get("expires_in", 3600))
+
+    def _url(self, path: str, params: dict[str, str]) -> str:
+        return f"{self.sandbox_endpoint}{path}?{urlencode(params, doseq=True)}"
+
+    @staticmethod
+    def _headers(token: str) -> dict[str, str]:
+        return {
+            "x-amz-access-token": token,
+            "Content-Type": "application/json",
+            "User-Agent": "AmazonOpsDashboard/1.0",
+        }
+
+    def _orders_params(
+        self,
+        created_after: str,
+        last_updated_after: str | None,
+        created_before: str | None = None,
+    ) -> dict[str, str]:
+        # SP-API rejects CreatedAfter and LastUpdatedAfter together.
+        params = {"MarketplaceIds": self.marketplace_id}
+        if last_updated_after:
+            params["LastUpdatedAfter"] = last_updated_after
+        else:
+            params["CreatedAfter"] = created_after
+            if created_before:
+                params["CreatedBefore"] = created_before
+        return params
+
+    @staticmethod
+    def _order_items_path(amazon_order_id: str) -> str:
+        return f"/orders/v0/orders/{quote(amazon_order_id, safe='')}/orderItems"
+
+    def _inventory_params(self) -> dict[str, str]:
+        return {
+            "details": "true",
+            "granularityType": "Marketplace",
+            "granularityId": self.marketplace_id,
+            "marketplaceIds": self.marketplace_id,
+        }
+
+
+class SPAPIClient(_SPAPIClientBase):
+    def _request_lwa_access_token(self) -> tuple[str, int]:
+        with self._track_call("lwaToken") as entry:
+            response = http_transport.request(
+                "POST", self.lwa_token_url, **self._lwa_token_request()
+            )
+            entry.http_status = response.status_code
+            response.raise_for_status()
+            body = response.json()
+        return self._lwa_token(body)
+
+    def get_lwa_access_token(self) -> str:
+        self._validate_credentials()
+        return lwa_token_cache.get_token(self._token_cache_key(), self._request_lwa_access_token)
+
+    def _get(self, path: str, params: dict[str, str], operation: str) -> dict:
         token = self.get_lwa_access_token()
-        query = urlencode(
-            {"MarketplaceIds": self.marketplace_id, "CreatedAfter": created_after},
-            doseq=True,
-        )
-        url = f"{self.sandbox_endpoint}/orders/v0/orders?{query}"
-        response = requests.get(
-            url,
-            headers={
-                "x-amz-access-token": token,
-                "Content-Type": "application/json",
-                "User-Agent": "AmazonOpsDashboard/1.0",
-            },
-            timeout=30,
+        with self._track_call(operation) as entry:
+            response = http_transport.request(
+                "GET",
+                self._url(path, params),
+                operation=operation,
+                rate_limit_scope=self.account_name,
+                headers=self._headers(token),
+                timeout=30,
+            )
+            entry.http_status = response.status_code
+            response.raise_for_status()
+            body = response.json()
+            self._record_rows(entry, body)
+        return body
+
+    def iter_order_pages(
+        self,
+        created_after: str = "TEST_CASE_200",
+        last_updated_after: str | None = None,
+        created_before: str | None = None,
+    ) -> Iterator[list[dict]]:
+        """Yield each getOrders page, following NextToken until it runs out.
+
+        `last_updated_after` switches the query to a delta sync and replaces
+        `created_after`; `created_before` closes a created-date window (backfills).
+        """
+        params = self._orders_params(created_after, last_updated_after, created_before)
+        while True:
+            payload = self._get("/orders/v0/orders", params, "getOrders").get("payload", {})
+            yield payload.get("Orders", [])
+            next_token = payload.get("NextToken")
+            if not next_token:
+                return
+            # Follow-up pages must carry only the marketplace and the token.
+            params = {"MarketplaceIds": self.marketplace_id, "NextToken": next_token}
+
+    def iter_sandbox_orders(
+        self,
+        created_after: str = "TEST_CASE_200",
+        prefetch: int = 1,
+        last_updated_after: str | None = None,
+    ) -> Iterator[dict]:
+        pages = self.iter_order_pages(created_after, last_updated_after)
+        if prefetch > 0:
+            pages = prefetch_iter(pages, depth=prefetch)
+        for page in pages:
+            yield from page
+
+    def get_sandbox_orders(self, created_after: str = "TEST_CASE_200") -> list[dict]:
+        return list(self.iter_sandbox_orders(created_after, prefetch=0))
+
+    def get_order_items(self, amazon_order_id: str) -> list[dict]:
+        """Every getOrderItems item of one order, following NextToken."""
+        path = self._order_items_path(amazon_order_id)
+        params: dict[str, str] = {}
+        items: list[dict] = []
+        while True:
+            payload = self._get(path, params, "getOrderItems").get("payload", {})
+            items.extend(payload.get("OrderItems", []))
+            next_token = payload.get("NextToken")
+            if not next_token:
+                return items
+            params = {"NextToken": next_token}
+
+    def iter_inventory_summaries(self) -> Iterator[dict]:
+        """Yield FBA inventory summaries for the marketplace, following nextToken."""
+        params = self._inventory_params()
+        while True:
+            body = self._get("/fba/inventory/v1/summaries", params, "getInventorySummaries")
+            yield from body.get("payload", {}).get("inventorySummaries", [])
+            next_token = (body.get("pagination") or {}).get("nextToken")
+            if not next_token:
+                return
+            params = {**self._inventory_params(), "nextToken": next_token}
+
+
+async def aprefetch_iter(source: AsyncIterator[T], depth: int = 1) -> AsyncIterator[T]:
+    """Async counterpart of `prefetch_iter`: a task keeps up to `depth` items ready."""
+    buffer: asyncio.Queue = asyncio.Queue(maxsize=depth)
+
+    async def _produce() -> None:
+        try:
+            async for item in source:
+                await buffer.put(item)
+        except Exception as exc:  # noqa: BLE001
+            await buffer.put(exc)
+            return
+        await buffer.put(_PREFETCH_DONE)
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            item = await buffer.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+
+
+class AsyncSPAPIClient(_SPAPIClientBase):
+    """Event-loop version of `SPAPIClient` with the same methods, awaitable.
+
+    Requests go through the shared httpx transport and per-operation rate
+    limiter; the LWA token comes from the same process-wide cache.
+    """
+
+    async def _request_lwa_access_token(self) -> tuple[str, int]:
+        with self._track_call("lwaToken") as entry:
+            response = await async_http_transport.request(
+                "POST", self.lwa_token_url, **self._lwa_token_request()
+            )
+            entry.http_status = response.status_code
+            response.raise_for_status()
+            body = response.json()
+        return self._lwa_token(body)
+
+    async def get_lwa_access_token(self) -> str:
+        self._validate_credentials()
+        return await lwa_token_cache.get_token_async(
+            self._token_cache_key(), self._request_lwa_access_token
         )
-        response.raise_for_status()
-        body = response.json()
-        payload = body.get("payload", {})
-        return payload.get("Orders", [])
+
+    async def _get(self, path: str, params: dict[str, str], operation: str) -> dict:
+        token = await self.get_lwa_access_token()
+        with self._track_call(operation) as entry:
+            response = await async_http_transport.request(
+                "GET",
+                self._url(path, params),
+                operation=operation,
+                rate_limit_scope=self.account_name,
+                headers=self._headers(token),
+                timeout=30,
+            )
+            entry.http_status = response.status_code
+            response.raise_for_status()
+            body = response.json()
+            self._record_rows(entry, body)
+        return body
+
+    async def iter_order_pages(
+        self,
+        created_after: str = "TEST_CASE_200",
+        last_updated_after: str | None = None,
+        created_before: str | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        params = self._orders_params(created_after, last_updated_after, created_before)
+        while True:
+            body = await self._get("/orders/v0/orders", params, "getOrders")
+            payload = body.get("payload", {})
+            yield payload.get("Orders", [])
+            next_token = payload.get("NextToken")
+            if not next_token:
+                return
+            params = {"MarketplaceIds": self.marketplace_id, "NextToken": next_token}
+
+    async def iter_sandbox_orders(
+        self,
+        created_after: str = "TEST_CASE_200",
+        prefetch: int = 1,
+        last_updated_after: str | None = None,
+    ) -> AsyncIterator[dict]:
+        pages = self.iter_order_pages(created_after, last_updated_after)
+        if prefetch > 0:
+            pages = aprefetch_iter(pages, depth=prefetch)
+        async for page in pages:
+            for order in page:
+                yield order
+
+    async def get_sandbox_orders(self, created_after: str = "TEST_CASE_200") -> list[dict]:
+        return [order async for order in self.iter_sandbox_orders(created_after, prefetch=0)]
+
+    async def get_order_items(self, amazon_order_id: str) -> list[dict]:
+        path = self._order_items_path(amazon_order_id)
+        params: dict[str, str] = {}
+        items: list[dict] = []
+        while True:
+            body = await self._get(path, params, "getOrderItems")
+            payload = body.get("payload", {})
+            items.extend(payload.get("OrderItems", []))
+            next_token = payload.get("NextToken")
+            if not next_token:
+                return items
+            params = {"NextToken": next_token}
+
+    async def iter_inventory_summaries(self) -> AsyncIterator[dict]:
+        params = self._inventory_params()
+        while True:
+            body = await self._get(
+                "/fba/inventory/v1/summaries", params, "getInventorySummaries"
+            )
+            for summary in body.get("payload", {}).get("inventorySummaries", []):
+                yield summary
+            next_token = (body.get("pagination") or {}).get("nextToken")
+            if not next_token:
+                return
+            params = {**self._inventory_params(), "nextToken": next_token}
@@ -0,0 +1,116 @@
+"""
+Command-line entry point for historical order backfills.
+
+    python -m app.workers.backfill --from 2025-01-01 --to 2025-07-01
+    python -m app.workers.backfill --from 2025-01-01 --to 2025-07-01 \
+        --account seller-eu --marketplace A1PA6795UKMFR9 --window-days 3 --workers 6
+    python -m app.workers.backfill --jsonl orders_2025.jsonl
+
+Reruns skip windows (or JSONL lines) already checkpointed in `sync_state`;
+`--restart` ignores the checkpoints. Prints per-window progress and the
+overall orders/sec when done.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.migrations import check_schema_version
+from app.services.orders_backfill import run_jsonl_backfill, run_spapi_backfill
+from app.services.run_log import run_logger
+
+
+def _parse_date(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.workers.backfill",
+        description="Backfill historical orders from SP-API or a JSONL file.",
+    )
+    parser.add_argument(
+        "--from", dest="start", type=_parse_date, help="created (JSONL: purchased) on or after"
+    )
+    parser.add_argument(
+        "--to", dest="end", type=_parse_date, help="created (JSONL: purchased) before"
+    )
+    parser.add_argument("--jsonl", help="read SP-API order payloads from this file instead")
+    parser.add_argument("--account", help="only this account name (default: all)")
+    parser.add_argument("--marketplace", help="only this marketplace id (default: all)")
+    parser.add_argument("--window-days", type=float, default=settings.backfill_window_days)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.backfill_max_workers,
+        help="windows backfilled in parallel across all accounts",
+    )
+    parser.add_argument(
+        "--workers-per-account",
+        type=int,
+        default=settings.backfill_max_workers_per_account,
+        help=(
+            "windows of one account in parallel. They share the account's getOrders "
+            "quota (0.0167 req/s, burst 20), so past the burst more workers per "
+            "account add no throughput; raise --workers for more accounts instead"
+        ),
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.backfill_batch_size)
+    parser.add_argument("--restart", action="store_true", help="ignore stored checkpoints")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    check_schema_version()
+    try:
+        if args.jsonl:
+            summary = run_jsonl_backfill(
+                args.jsonl,
+                start=args.start,
+                end=args.end,
+                batch_size=args.batch_size,
+                restart=args.restart,
+            )
+        else:
+            if args.start is None:
+                parser.error("--from is required unless --jsonl is given")
+            accounts = settings.spapi_accounts
+            if args.account:
+                accounts = [account for account in accounts if account.name == args.account]
+                if not accounts:
+                    parser.error(f"unknown account {args.account!r}")
+            summary = run_spapi_backfill(
+                args.start,
+                args.end or datetime.now(timezone.utc),
+                accounts=accounts,
+                marketplace_id=args.marketplace,
+                window=timedelta(days=args.window_days),
+                max_workers=args.workers,
+                batch_size=args.batch_size,
+                restart=args.restart,
+                max_workers_per_account=args.workers_per_account,
+            )
+    finally:
+        run_logger.flush()
+        run_logger.shutdown()
+
+    for result in summary.pop("results", []):
+        status = f"error: {result['error']}" if result["error"] else "ok"
+        print(
+            f"{result['window']}: fetched={result['fetched']} created={result['created']} "
+            f"updated={result['updated']} {result['seconds']:.1f}s {status}"
+        )
+    print(json.dumps(summary, indent=2))
+    return 1 if summary.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,267 @@
 """
-Starts background scheduler for periodic tasks.
-Currently a stub returning a simple status dictionary.
+Background scheduler for periodic ETL jobs.
+Each job runs on an interval plus random jitter, executes on a small worker
+pool, and is guarded by a cross-process lock (PostgreSQL advisory lock) so that
+several API replicas never run the same job at the same time. Every run,
+scheduled or enqueued through the API, is recorded in the `job_runs` table;
+runs still queued when the scheduler shuts down are marked `cancelled`.
+Jobs open their own DB sessions; the run's session only records its status.
+With ASYNC_DB_ENABLED the orders job runs the async ingestion on its own
+event loop in the worker thread.
 """
 
-from app.db.session import SessionLocal
-from app.services.etl_orders import run_orders_etl
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
 
+from sqlalchemy import text
 
-def run_orders_sync_once() -> dict[str, int]:
-    db = SessionLocal()
+from app.core.config import settings
+from app.db.crud import cancel_queued_job_runs, create_job_run, get_job_run
+from app.db.session import EtlSessionLocal, SessionLocal, dispose_async_engine, etl_engine
+from app.services.etl_inventory import run_inventory_etl
+from app.services.http_transport import async_http_transport
+from app.services.orders_ingestion import run_orders_ingestion, run_orders_ingestion_async
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], dict]
+
+
+class JobFailed(Exception):
+    """Raised by a job whose own result already names the failure; stored without a prefix."""
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: JobFunc
+    interval_seconds: float
+
+
+def _advisory_lock_key(job_name: str) -> int:
+    digest = hashlib.sha256(f"scheduler:{job_name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+_local_job_locks: dict[str, threading.Lock] = {}
+_local_job_locks_guard = threading.Lock()
+
+
+@contextmanager
+def job_lock(job_name: str) -> Iterator[bool]:
+    """Try to take the run lock for `job_name` without waiting; yields whether it did.
+
+    On PostgreSQL this is a session advisory lock held on a dedicated connection
+    for the whole run, so it is shared by every replica. Other databases (local
+    SQLite) fall back to an in-process lock.
+    """
+    if etl_engine.dialect.name == "postgresql":
+        key = _advisory_lock_key(job_name)
+        with etl_engine.connect() as connection:
+            acquired = bool(
+                connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+            )
+            connection.commit()
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                    connection.commit()
+        return
+
+    with _local_job_locks_guard:
+        lock = _local_job_locks.setdefault(job_name, threading.Lock())
+    acquired = lock.acquire(blocking=False)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            lock.release()
+
+
+async def _run_orders_ingestion_on_loop() -> dict:
+    """Async ingestion on a loop owned by this job; its clients die with the loop."""
+    try:
+        return await run_orders_ingestion_async()
+    finally:
+        await async_http_transport.aclose()
+        await dispose_async_engine()
+
+
+def _run_orders_job() -> dict:
+    # Every account/marketplace pair opens its own session.
+    if settings.async_db_enabled:
+        result = asyncio.run(_run_orders_ingestion_on_loop())
+    else:
+        result = run_orders_ingestion()
+    if result["failed"] and result["failed"] == len(result["marketplaces"]):
+        # Ingestion errors already read "ExceptionType: message".
+        raise JobFailed(result["marketplaces"][0]["error"])
+    return result
+
+
+def _run_inventory_job() -> dict:
+    db = EtlSessionLocal()
     try:
-        return run_orders_etl(db)
+        return run_inventory_etl(db)
     finally:
         db.close()
+
+
+def _job_error(exc: Exception) -> str:
+    if isinstance(exc, JobFailed):
+        return str(exc)
+    return f"{exc.__class__.__name__}: {exc}"
+
+
+class Scheduler:
+    def __init__(
+        self,
+        jobs: list[ScheduledJob],
+        max_workers: int = 2,
+        jitter_seconds: float = 0.0,
+    ) -> None:
+        self.jobs = {job.name: job for job in jobs}
+        self.jitter_seconds = jitter_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="scheduler-job"
+        )
+        self._stop = threading.Event()
+        self._timers: list[threading.Thread] = []
+        self._queued: dict[str, Future] = {}
+        self._queued_lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._timers:
+            return
+        self._stop.clear()
+        for job in self.jobs.values():
+            if job.interval_seconds <= 0:
+                continue
+            timer = threading.Thread(
+                target=self._schedule_loop,
+                args=(job,),
+                name=f"scheduler-{job.name}",
+                daemon=True,
+            )
+            timer.start()
+            self._timers.append(timer)
+        logger.info("Scheduler started for jobs: %s", [t.name for t in self._timers])
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._stop.set()
+        for timer in self._timers:
+            timer.join(timeout=1)
+        self._timers.clear()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        with self._queued_lock:
+            cancelled = [job_id for job_id, future in self._queued.items() if future.cancelled()]
+            self._queued.clear()
+        self._cancel_runs(cancelled)
+
+    @staticmethod
+    def _cancel_runs(job_ids: list[str]) -> None:
+        if not job_ids:
+            return
+        db = SessionLocal()
+        try:
+            cancel_queued_job_runs(db, job_ids, "Scheduler shut down before the run started")
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to mark %s queued job runs cancelled", len(job_ids))
+        finally:
+            db.close()
+
+    def _schedule_loop(self, job: ScheduledJob) -> None:
+        while not self._stop.wait(
+            job.interval_seconds + random.uniform(0, self.jitter_seconds)
+        ):
+            try:
+                self.enqueue(job.name, trigger="schedule")
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to enqueue scheduled job %s", job.name)
+
+    def enqueue(self, job_name: str, trigger: str = "manual") -> str:
+        """Record a queued run for `job_name`, hand it to the worker pool, return its id."""
+        if job_name not in self.jobs:
+            raise KeyError(f"Unknown job: {job_name}")
+        job_id = str(uuid.uuid4())
+        db = SessionLocal()
+        try:
+            create_job_run(db, job_id, job_name, trigger)
+        finally:
+            db.close()
+        try:
+            future = self._executor.submit(self._execute, job_id, self.jobs[job_name])
+        except RuntimeError:
+            # The pool is already shut down; the run will never start.
+            self._cancel_runs([job_id])
+            raise
+        with self._queued_lock:
+            self._queued[job_id] = future
+        future.add_done_callback(lambda done: self._forget(job_id, done))
+        return job_id
+
+    def _forget(self, job_id: str, future: Future) -> None:
+        # Cancelled runs stay listed so shutdown() can mark their rows.
+        if future.cancelled():
+            return
+        with self._queued_lock:
+            self._queued.pop(job_id, None)
+
+    def _execute(self, job_id: str, job: ScheduledJob) -> None:
+        db = EtlSessionLocal()
+        try:
+            job_run = get_job_run(db, job_id)
+            with job_lock(job.name) as acquired:
+                if not acquired:
+                    job_run.status = "skipped"
+                    job_run.error = "Another run of this job holds the lock"
+                    job_run.finished_at = datetime.utcnow()
+                    db.commit()
+                    return
+
+                job_run.status = "running"
+                job_run.started_at = datetime.utcnow()
+                db.commit()
+                started = time.perf_counter()
+                try:
+                    result = job.func()
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("Job %s (%s) failed", job.name, job_id)
+                    job_run.status = "failed"
+                    job_run.error = _job_error(exc)
+                else:
+                    job_run.status = "succeeded"
+                    job_run.result = result
+                job_run.finished_at = datetime.utcnow()
+                job_run.duration_ms = (time.perf_counter() - started) * 1000
+                db.commit()
+        finally:
+            db.close()
+
+
+scheduler = Scheduler(
+    jobs=[
+        ScheduledJob("orders_sync", _run_orders_job, settings.orders_sync_interval_seconds),
+        ScheduledJob(
+            "inventory_sync", _run_inventory_job, settings.inventory_sync_interval_seconds
+        ),
+    ],
+    max_workers=settings.scheduler_max_workers,
+    jitter_seconds=settings.scheduler_jitter_seconds,
+)
+
+
+def run_orders_sync_once() -> dict[str, int | float | list[dict]]:
+    return run_orders_ingestion()
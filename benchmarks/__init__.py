@@ -0,0 +1,2 @@
+# benchmarks package initializer
+# Standalone performance scripts run against a local database or fake SP-API.
@@ -0,0 +1,129 @@
+"""
+Dashboard read latency while ETL writers hold connections.
+`--etl-workers` threads each keep a connection checked out for `--hold` seconds
+at a time (one ETL batch transaction) while `--readers` threads run short
+SELECTs, like dashboard requests. Scenarios:
+
+  shared          readers and writers on one pool of DB_POOL_SIZE (the old layout)
+  split           readers on the primary pool, writers on the ETL pool
+  split, no ping  as split with DB_POOL_PRE_PING=false
+
+Reports reader p50/p99 latency and the reader's pool wait (`db_pool_wait_seconds`
+sum / count). Point DATABASE_URL at PostgreSQL to see what pre-ping costs per
+checkout over a real network round-trip.
+
+    python -m benchmarks.bench_db_pools --etl-workers 16 --readers 8 --seconds 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_db_pools.db"
+
+from sqlalchemy import Engine, text  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.metrics import db_pool_wait_seconds  # noqa: E402
+from app.db import session  # noqa: E402
+
+
+def _pool_wait_ms(pool: str) -> float:
+    series = db_pool_wait_seconds._series.get((pool,))
+    if not series:
+        return 0.0
+    counts, total = series
+    return total[0] / max(1, sum(counts)) * 1000
+
+
+def _run(label: str, read_engine: Engine, write_engine: Engine, args: argparse.Namespace) -> None:
+    stop = threading.Event()
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def writer() -> None:
+        while not stop.is_set():
+            try:
+                with write_engine.connect():
+                    stop.wait(args.hold)
+            except Exception:  # noqa: BLE001
+                continue
+
+    def reader() -> None:
+        nonlocal errors
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with read_engine.connect() as connection:
+                    connection.execute(text("SELECT 1")).scalar()
+            except Exception:  # noqa: BLE001
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+            time.sleep(args.think)
+
+    threads = [threading.Thread(target=writer) for _ in range(args.etl_workers)]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+    median = statistics.median(latencies) if latencies else 0.0
+    pool = read_engine.pool._orig_logging_name
+    print(
+        f"{label:<16} {len(latencies):>8} {median * 1000:>9.2f} {p99 * 1000:>9.2f} "
+        f"{_pool_wait_ms(pool):>13.3f} {errors:>7}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--etl-workers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--hold", type=float, default=0.2, help="seconds per ETL transaction")
+    parser.add_argument("--think", type=float, default=0.005, help="pause between reads")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    settings.db_pool_timeout_seconds = 5.0
+    print(
+        f"database: {session.engine.url.render_as_string(hide_password=True)}  "
+        f"pool={settings.db_pool_size}+{settings.db_max_overflow}  "
+        f"etl pool={settings.db_etl_pool_size}+{settings.db_etl_max_overflow}"
+    )
+    print(
+        f"{'scenario':<16} {'reads':>8} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'pool wait ms':>13} {'errors':>7}"
+    )
+
+    shared = session._create_engine(settings.database_url, "bench_shared")
+    _run("shared", shared, shared, args)
+
+    primary = session._create_engine(settings.database_url, "bench_primary")
+    etl = session._create_engine(
+        settings.database_url,
+        "bench_etl",
+        pool_size=settings.db_etl_pool_size,
+        max_overflow=settings.db_etl_max_overflow,
+    )
+    _run("split", primary, etl, args)
+
+    settings.db_pool_pre_ping = False
+    no_ping = session._create_engine(settings.database_url, "bench_no_ping")
+    _run("split, no ping", no_ping, etl, args)
+
+
+if __name__ == "__main__":
+    main()
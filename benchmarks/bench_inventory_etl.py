@@ -0,0 +1,73 @@
+"""
+Run `run_inventory_etl` against the fake SP-API's getInventorySummaries.
+Syncs `--skus` SKUs three times: an initial load, an unchanged re-sync and a
+sync after a quarter of the SKUs moved. Reports wall time, snapshot rows written
+and the latency of a low-stock `/inventory` page read from the current-state table.
+
+    python -m benchmarks.bench_inventory_etl --skus 50000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.fake_spapi import FakeSPAPIServer
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_inventory_etl.db"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--skus", type=int, default=50_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    with FakeSPAPIServer(inventory_total=args.skus, inventory_page_size=args.page_size) as server:
+        os.environ.update(
+            {
+                "SPAPI_LWA_TOKEN_URL": server.token_url,
+                "SPAPI_SANDBOX_ENDPOINT": server.base_url,
+                "SPAPI_CLIENT_ID": "bench-client",
+                "SPAPI_CLIENT_SECRET": "bench-secret",
+                "SPAPI_REFRESH_TOKEN": "bench-refresh",
+            }
+        )
+        from app.db import models
+        from app.db.crud import list_inventory_items
+        from app.db.session import Base, SessionLocal, engine
+        from app.services.etl_inventory import run_inventory_etl
+
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            print(f"{'run':<12} {'items':>8} {'changed':>8} {'snapshots':>10} {'seconds':>8}")
+            for name, version in (("initial", 0), ("unchanged", 0), ("25% moved", 1)):
+                server.inventory_version = version
+                started = time.perf_counter()
+                result = run_inventory_etl(db)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{name:<12} {result['items']:>8} "
+                    f"{result['created'] + result['changed']:>8} "
+                    f"{result['snapshots']:>10} {elapsed:>8.2f}"
+                )
+
+            snapshot_rows = db.query(models.InventorySnapshot).count()
+            samples = []
+            for _ in range(100):
+                started = time.perf_counter()
+                list_inventory_items(db, limit=100, max_fulfillable=10)
+                samples.append((time.perf_counter() - started) * 1000)
+                db.expunge_all()
+            print(f"snapshot rows: {snapshot_rows:,}")
+            print(f"low-stock page p50: {statistics.median(samples):.2f} ms")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
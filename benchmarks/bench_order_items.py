@@ -0,0 +1,86 @@
+"""
+getOrderItems enrichment: serial vs concurrent fetches, and the per-order cache.
+Syncs `--orders` orders from the fake SP-API (each getOrderItems call takes
+`--latency` seconds) with ORDER_ITEMS_MAX_WORKERS=1 and then `--workers`,
+each on a fresh schema, and finally re-syncs after clearing the stored content
+hashes, so every order is rewritten but its items are answered from the cache.
+Reports wall time and getOrderItems calls per run.
+
+    python -m benchmarks.bench_order_items --orders 2000 --workers 16
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fake_spapi import FakeSPAPIServer
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_order_items.db"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with FakeSPAPIServer(
+        orders_total=args.orders,
+        order_items_latency_seconds=args.latency,
+        rate_limit=1000.0,
+    ) as server:
+        os.environ.update(
+            {
+                "SPAPI_LWA_TOKEN_URL": server.token_url,
+                "SPAPI_SANDBOX_ENDPOINT": server.base_url,
+                "SPAPI_CLIENT_ID": "bench-client",
+                "SPAPI_CLIENT_SECRET": "bench-secret",
+                "SPAPI_REFRESH_TOKEN": "bench-refresh",
+                "SLACK_WEBHOOK_URL": "",
+                "ORDER_ITEMS_ENABLED": "true",
+            }
+        )
+        from sqlalchemy import update
+
+        from app.core.config import settings
+        from app.db.migrations import migrate
+        from app.db.models import Order
+        from app.db.session import Base, SessionLocal, engine
+        from app.services.etl_orders import run_orders_etl
+
+        def sync(label: str) -> None:
+            calls = server.requests["getOrderItems"]
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                result = run_orders_etl(db)
+                elapsed = time.perf_counter() - started
+            finally:
+                db.close()
+            items = result["order_items"]
+            calls = server.requests["getOrderItems"] - calls
+            print(
+                f"{label:<24} {elapsed:>8.2f}s  getOrderItems={calls:>6}"
+                f"  cached={items['cached']:>6}  items={items['items']:>6}"
+            )
+
+        for workers in (1, args.workers):
+            Base.metadata.drop_all(bind=engine)
+            migrate()
+            settings.order_items_max_workers = workers
+            sync(f"initial workers={workers}")
+
+        db = SessionLocal()
+        try:
+            db.execute(update(Order).values(content_hash=None))
+            db.commit()
+        finally:
+            db.close()
+        sync("rewrite, items cached")
+
+
+if __name__ == "__main__":
+    main()
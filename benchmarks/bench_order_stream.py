@@ -0,0 +1,108 @@
+"""
+Order event fan-out with slow stream clients.
+Opens `--clients` subscribers that read as fast as they can and `--stalled`
+that never read, then publishes `--batches` ETL-sized batches of `--batch-size`
+events from a worker thread, like `run_orders_etl` does. Run once with the
+bounded per-client queue (`--queue-size`) and once unbounded, reporting how
+long `publish()` takes, delivery latency to the live clients, and how many
+events each stalled client ends up holding.
+
+    python -m benchmarks.bench_order_stream --clients 50 --stalled 5 --batches 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_order_stream.db"
+
+from app.services.order_events import OrderEventBroadcaster, Subscription  # noqa: E402
+
+
+def _events(batch: int, size: int) -> list[dict]:
+    return [
+        {
+            "type": "order.updated",
+            "amazon_order_id": f"902-{batch:06d}-{index:07d}",
+            "marketplace_id": "ATVPDKIKX0DER",
+            "order_status": "Shipped",
+            "sent_at": time.perf_counter(),
+        }
+        for index in range(size)
+    ]
+
+
+async def _run(queue_size: int, args: argparse.Namespace) -> None:
+    broadcaster = OrderEventBroadcaster(max_queue_size=queue_size)
+    live = [broadcaster.subscribe() for _ in range(args.clients)]
+    stalled = [broadcaster.subscribe() for _ in range(args.stalled)]
+    expected = args.batches * args.batch_size
+    latencies: list[float] = []
+
+    async def read(subscription: Subscription) -> int:
+        received = 0
+        while (event := await subscription.get()) is not None:
+            if event["type"] == "resync":
+                continue
+            latencies.append(time.perf_counter() - event["sent_at"])
+            received += 1
+        return received
+
+    publish_seconds: list[float] = []
+
+    def publisher() -> None:
+        for batch in range(args.batches):
+            events = _events(batch, args.batch_size)
+            started = time.perf_counter()
+            broadcaster.publish(events)
+            publish_seconds.append(time.perf_counter() - started)
+            time.sleep(args.interval)
+
+    readers = asyncio.gather(*(read(subscription) for subscription in live))
+    started = time.perf_counter()
+    thread = threading.Thread(target=publisher)
+    thread.start()
+    await asyncio.to_thread(thread.join)
+    # Let the live readers drain what is already queued before closing.
+    while any(subscription._queue.qsize() for subscription in live):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    held = max((subscription._queue.qsize() for subscription in stalled), default=0)
+    stats = broadcaster.stats()
+    broadcaster.shutdown()
+    received = await readers
+
+    latencies.sort()
+    publish_seconds.sort()
+    p99 = lambda samples: samples[min(len(samples) - 1, int(len(samples) * 0.99))]  # noqa: E731
+    label = f"queue={queue_size}" if queue_size else "unbounded"
+    print(
+        f"{label:<11} {elapsed:>6.2f}s  publish p99={p99(publish_seconds) * 1e3:>6.3f}ms"
+        f"  delivery p50={statistics.median(latencies) * 1e3:>6.2f}ms"
+        f" p99={p99(latencies) * 1e3:>7.2f}ms"
+        f"  live={sum(received) / (len(received) * expected):>6.1%}"
+        f"  stalled holds={held:>7}  dropped={stats['dropped']:>7}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--stalled", type=int, default=3)
+    parser.add_argument("--batches", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--queue-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    for queue_size in (args.queue_size, 0):
+        asyncio.run(_run(queue_size, args))
+
+
+if __name__ == "__main__":
+    main()
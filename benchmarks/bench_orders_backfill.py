@@ -0,0 +1,101 @@
+"""
+Throughput of the order backfill against row-by-row `upsert_order`.
+Writes `--orders` synthetic SP-API payloads to a JSONL file and backfills them
+with `run_jsonl_backfill` (COPY + one merge per batch on PostgreSQL), next to an
+`upsert_order` + commit loop over the first `--sample` of them. Then backfills
+`--days` days from the fake SP-API (one order per minute, `--page-latency`
+seconds per getOrders page) with one worker and with `--workers` workers, all on
+the single fake account (so the per-account cap is lifted to `--workers`).
+
+    python -m benchmarks.bench_orders_backfill --orders 200000 --workers 8
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.fake_spapi import FakeSPAPIServer, build_synthetic_order
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_orders_backfill.db"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=5_000)
+    parser.add_argument("--days", type=float, default=3)
+    parser.add_argument("--page-latency", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=6)
+    args = parser.parse_args()
+
+    with FakeSPAPIServer(
+        orders_total=int(args.days * 24 * 60),
+        orders_latency_seconds=args.page_latency,
+    ) as server:
+        os.environ.update(
+            {
+                "SPAPI_LWA_TOKEN_URL": server.token_url,
+                "SPAPI_SANDBOX_ENDPOINT": server.base_url,
+                "SPAPI_CLIENT_ID": "bench-client",
+                "SPAPI_CLIENT_SECRET": "bench-secret",
+                "SPAPI_REFRESH_TOKEN": "bench-refresh",
+                "SLACK_WEBHOOK_URL": "",
+            }
+        )
+        from app.db.crud import upsert_order
+        from app.db.session import Base, SessionLocal, engine
+        from app.services.orders_backfill import run_jsonl_backfill, run_spapi_backfill
+
+        def reset() -> None:
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+
+        path = os.path.join(tempfile.gettempdir(), "bench_orders_backfill.jsonl")
+        with open(path, "w", encoding="utf-8") as handle:
+            for index in range(args.orders):
+                handle.write(json.dumps(build_synthetic_order(index)) + "\n")
+
+        reset()
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            with open(path, encoding="utf-8") as handle:
+                for _, line in zip(range(args.sample), handle):
+                    upsert_order(db, json.loads(line))
+                    db.commit()
+            per_row = args.sample / (time.perf_counter() - started)
+        finally:
+            db.close()
+        print(f"upsert_order loop ({args.sample:,} rows): {per_row:,.0f} orders/s")
+
+        reset()
+        result = run_jsonl_backfill(path, restart=True)
+        print(
+            f"JSONL backfill ({result['fetched']:,} rows): "
+            f"{result['orders_per_second']:,.0f} orders/s"
+        )
+
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for workers in (1, args.workers):
+            reset()
+            result = run_spapi_backfill(
+                start,
+                start + timedelta(days=args.days),
+                window=timedelta(hours=6),
+                max_workers=workers,
+                max_workers_per_account=workers,
+                restart=True,
+            )
+            print(
+                f"SP-API backfill workers={workers} windows={result['windows']} "
+                f"({result['fetched']:,} rows): {result['seconds']:.2f}s, "
+                f"{result['orders_per_second']:,.0f} orders/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
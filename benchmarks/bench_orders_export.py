@@ -0,0 +1,71 @@
+"""
+Throughput and memory of `GET /orders/export` for each format.
+Seeds `--rows` synthetic orders, starts the API under uvicorn and streams the
+full export in NDJSON, CSV and (when pyarrow is installed) Parquet, reading the
+body chunk by chunk. Reports wall time, rows/sec, bytes received and the API
+process's peak RSS (Linux /proc), which should stay flat as `--rows` grows.
+
+    python -m benchmarks.bench_orders_export --rows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_orders_export.db"
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_orders_keyset import _seed  # noqa: E402
+from benchmarks.load_orders_api import _free_port, _start_api  # noqa: E402
+from app.services.orders_export import require_parquet  # noqa: E402
+
+
+def _rss_mb(pid: int, field: str) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    _seed(args.rows)
+    formats = ["ndjson", "csv"]
+    try:
+        require_parquet()
+        formats.append("parquet")
+    except RuntimeError as exc:
+        print(f"skipping parquet: {exc}")
+
+    port = _free_port()
+    api = _start_api({**os.environ, "SCHEDULER_ENABLED": "false"}, port)
+    try:
+        print(f"rows={args.rows:,}  API rss before export: {_rss_mb(api.pid, 'VmRSS'):.0f} MB")
+        print(f"{'format':<8} {'seconds':>8} {'rows/s':>10} {'MB':>8} {'peak rss MB':>12}")
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+            for export_format in formats:
+                started = time.perf_counter()
+                size = 0
+                with client.stream("GET", f"/orders/export?format={export_format}") as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_bytes():
+                        size += len(chunk)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{export_format:<8} {elapsed:>8.2f} {args.rows / elapsed:>10,.0f} "
+                    f"{size / 1_048_576:>8.1f} {_rss_mb(api.pid, 'VmHWM'):>12.0f}"
+                )
+    finally:
+        api.terminate()
+        api.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Serial vs parallel order ingestion across several accounts and marketplaces.
+Configures `--accounts` seller accounts with `--marketplaces` marketplaces each
+against the fake SP-API (each getOrders page takes `--page-latency` seconds),
+then runs `run_orders_ingestion` with one worker and with `--workers` workers,
+printing wall time and the per-marketplace timings and counts.
+
+    python -m benchmarks.bench_orders_ingestion --accounts 2 --marketplaces 3 --workers 6
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fake_spapi import FakeSPAPIServer
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_orders_ingestion.db"
+
+_MARKETPLACE_IDS = (
+    "ATVPDKIKX0DER",
+    "A2EUQ1WTGCTBG2",
+    "A1AM78C64UM0Y8",
+    "A1F83G8C2ARO7P",
+    "A1PA6795UKMFR9",
+    "A13V1IB3VIYZZH",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--marketplaces", type=int, default=3)
+    parser.add_argument("--orders", type=int, default=2000, help="orders per marketplace")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--page-latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=6)
+    args = parser.parse_args()
+
+    with FakeSPAPIServer(
+        orders_total=args.orders,
+        orders_page_size=args.page_size,
+        orders_latency_seconds=args.page_latency,
+    ) as server:
+        os.environ.update(
+            {
+                "SPAPI_LWA_TOKEN_URL": server.token_url,
+                "SPAPI_SANDBOX_ENDPOINT": server.base_url,
+                "SPAPI_CLIENT_ID": "bench-client",
+                "SPAPI_CLIENT_SECRET": "bench-secret",
+                "SLACK_WEBHOOK_URL": "",
+                "DEMO_MODE": "false",
+            }
+        )
+        from app.core.config import SPAPIAccount, settings
+        from app.db import models
+        from app.db.session import Base, SessionLocal, engine
+        from app.services.orders_ingestion import run_orders_ingestion
+
+        if args.accounts * args.marketplaces > len(_MARKETPLACE_IDS):
+            parser.error(f"at most {len(_MARKETPLACE_IDS)} account/marketplace pairs")
+        accounts = [
+            SPAPIAccount(
+                name=f"seller-{number}",
+                client_id=settings.spapi_client_id,
+                client_secret=settings.spapi_client_secret,
+                refresh_token=f"bench-refresh-{number}",
+                endpoint=server.base_url,
+                marketplace_ids=_MARKETPLACE_IDS[
+                    number * args.marketplaces : (number + 1) * args.marketplaces
+                ],
+                lwa_token_url=server.token_url,
+            )
+            for number in range(args.accounts)
+        ]
+
+        for workers in (1, args.workers):
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+            started = time.perf_counter()
+            result = run_orders_ingestion(accounts, max_workers=workers)
+            elapsed = time.perf_counter() - started
+            db = SessionLocal()
+            try:
+                stored = db.query(models.Order).count()
+            finally:
+                db.close()
+
+            print(
+                f"\nworkers={workers}: {elapsed:.2f}s  fetched={result['fetched']} "
+                f"stored={stored} failed={result['failed']}"
+            )
+            print(f"  {'account':<10} {'marketplace':<16} {'fetched':>8} {'created':>8} {'s':>7}")
+            for entry in result["marketplaces"]:
+                print(
+                    f"  {entry['account']:<10} {entry['marketplace_id']:<16} "
+                    f"{entry.get('fetched', 0):>8} {entry.get('created', 0):>8} "
+                    f"{entry['seconds']:>7.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
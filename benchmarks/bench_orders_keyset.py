@@ -0,0 +1,125 @@
+"""
+Latency of `list_orders` on a large seeded orders table: page 1 vs a deep page.
+Seeds `--rows` synthetic orders (1M by default, reused if already present), then
+reports p50/p99 for the first page and for page `--page` reached by keyset
+cursor, next to the equivalent OFFSET query for contrast.
+
+    python -m benchmarks.bench_orders_keyset --rows 1000000 --page 10000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_orders_keyset.db"
+
+from sqlalchemy import func, insert  # noqa: E402
+
+from app.db.crud import list_orders  # noqa: E402
+from app.db.migrations import migrate  # noqa: E402
+from app.db.models import Order  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+
+_STATUSES = ("Pending", "Unshipped", "Shipped", "Canceled")
+
+
+def _seed(rows: int, batch_size: int = 20_000) -> None:
+    migrate()
+    db = SessionLocal()
+    try:
+        existing = db.scalar(func.count(Order.id).select())
+        if existing >= rows:
+            return
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        synced_at = datetime.utcnow()
+        for start in range(existing, rows, batch_size):
+            batch = []
+            for index in range(start, min(start + batch_size, rows)):
+                purchased = base + timedelta(seconds=index * 37)
+                batch.append(
+                    {
+                        "amazon_order_id": f"KEYSET-{index:010d}",
+                        "order_status": _STATUSES[index % len(_STATUSES)],
+                        "buyer": f"Buyer {index % 500}",
+                        "amount": 20.0 + index % 480,
+                        "cost": 10.0 + index % 200,
+                        "purchase_date": purchased,
+                        "last_update_date": purchased,
+                        "raw_payload": {"AmazonOrderId": f"KEYSET-{index:010d}"},
+                        "synced_at": synced_at,
+                    }
+                )
+            db.execute(insert(Order.__table__), batch)
+            db.commit()
+            print(f"seeded {min(start + batch_size, rows):,}/{rows:,}", end="\r", flush=True)
+        print()
+    finally:
+        db.close()
+
+
+def _measure(run: Callable[[], object], repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return statistics.median(samples), p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    _seed(args.rows)
+    db = SessionLocal()
+    try:
+        ordering = (Order.purchase_date.desc().nullsfirst(), Order.id.desc())
+        offset = (args.page - 1) * args.page_size
+        # Position of the last row on the page before the target page.
+        anchor = db.execute(
+            Order.__table__.select()
+            .with_only_columns(Order.purchase_date, Order.id)
+            .order_by(*ordering)
+            .offset(offset - 1)
+            .limit(1)
+        ).one()
+
+        def first_page() -> None:
+            list_orders(db, limit=args.page_size)
+            db.expunge_all()
+
+        def deep_page_keyset() -> None:
+            list_orders(db, limit=args.page_size, after=(anchor[0], anchor[1]))
+            db.expunge_all()
+
+        def deep_page_offset() -> None:
+            db.query(Order).order_by(*ordering).offset(offset).limit(args.page_size).all()
+            db.expunge_all()
+
+        print(f"database: {engine.url.render_as_string(hide_password=True)}")
+        print(f"rows: {args.rows:,}  page size: {args.page_size}")
+        print(f"{'query':<28} {'p50 ms':>9} {'p99 ms':>9}")
+        for name, run, repeat in (
+            ("page 1 (keyset)", first_page, args.repeat),
+            (f"page {args.page:,} (keyset)", deep_page_keyset, args.repeat),
+            (f"page {args.page:,} (OFFSET)", deep_page_offset, max(5, args.repeat // 20)),
+        ):
+            p50, p99 = _measure(run, repeat)
+            print(f"{name:<28} {p50:>9.2f} {p99:>9.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Run `run_orders_etl` against the fake SP-API with N NextToken pages.
+Checks that every page lands in the DB and reports wall time and peak Python
+heap (tracemalloc), which should stay flat as the page count grows.
+
+    python -m benchmarks.bench_orders_pagination --pages 10,100,500 --page-size 100
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.fake_spapi import FakeSPAPIServer
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_orders_pagination.db"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", default="10,100,500")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    with FakeSPAPIServer(orders_page_size=args.page_size) as server:
+        os.environ.update(
+            {
+                "SPAPI_LWA_TOKEN_URL": server.token_url,
+                "SPAPI_SANDBOX_ENDPOINT": server.base_url,
+                "SPAPI_CLIENT_ID": "bench-client",
+                "SPAPI_CLIENT_SECRET": "bench-secret",
+                "SPAPI_REFRESH_TOKEN": "bench-refresh",
+                "SLACK_WEBHOOK_URL": "",
+                "DEMO_MODE": "false",
+            }
+        )
+        from app.db import models
+        from app.db.session import Base, SessionLocal, engine
+        from app.services.etl_orders import run_orders_etl
+
+        print(f"{'pages':>6} {'orders':>8} {'stored':>8} {'seconds':>8} {'peak heap MB':>13}")
+        for pages in (int(value) for value in args.pages.split(",")):
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+            server.orders_total = pages * args.page_size
+
+            db = SessionLocal()
+            try:
+                tracemalloc.start()
+                started = time.perf_counter()
+                result = run_orders_etl(db)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                stored = db.query(models.Order).count()
+            finally:
+                db.close()
+
+            assert result["fetched"] == server.orders_total == stored, (result["fetched"], stored)
+            print(
+                f"{pages:>6} {server.orders_total:>8} {stored:>8} {elapsed:>8.2f} "
+                f"{peak / 2**20:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Serialization time of `GET /orders/` payloads per `--rows` orders.
+Loads `--rows` summary rows with `list_orders` once, then times the previous
+path (per-row isoformat dicts through `jsonable_encoder` + `JSONResponse`), the
+orjson path used by the handler now, and the NDJSON export encoding.
+
+    python -m benchmarks.bench_orders_serialization --rows 10000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_orders_serialization.db"
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from benchmarks.bench_orders_keyset import _seed  # noqa: E402
+from app.api.responses import encode_json, ndjson_chunk  # noqa: E402
+from app.api.routes_orders import _serialize_orders  # noqa: E402
+from app.db.crud import list_orders  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+
+def _legacy(rows: list) -> bytes:
+    orders = [
+        {
+            "id": row.id,
+            "amazon_order_id": row.amazon_order_id,
+            "marketplace_id": row.marketplace_id,
+            "order_status": row.order_status,
+            "purchase_date": row.purchase_date.isoformat() if row.purchase_date else None,
+            "last_update_date": row.last_update_date.isoformat()
+            if row.last_update_date
+            else None,
+            "synced_at": row.synced_at.isoformat() if row.synced_at else None,
+            "Buyer": row.buyer,
+            "Amount": row.amount,
+            "Cost": row.cost,
+        }
+        for row in rows
+    ]
+    return JSONResponse(jsonable_encoder({"orders": orders, "next_cursor": None})).body
+
+
+def _measure(run: Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    _seed(args.rows)
+    db = SessionLocal()
+    try:
+        rows = list_orders(db, limit=args.rows)
+    finally:
+        db.close()
+
+    print(f"{len(rows):,} orders")
+    print(f"{'path':<22} {'p50 ms':>8} {'bytes':>10}")
+    for name, run in (
+        ("jsonable_encoder", lambda: _legacy(rows)),
+        ("orjson", lambda: encode_json({"orders": _serialize_orders(rows, False)})),
+        ("ndjson", lambda: ndjson_chunk(_serialize_orders(rows, False))),
+    ):
+        p50, size = _measure(run, args.repeat)
+        print(f"{name:<22} {p50:>8.2f} {size:>10,}")
+
+
+if __name__ == "__main__":
+    main()
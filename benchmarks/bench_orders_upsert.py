@@ -0,0 +1,101 @@
+"""
+Benchmark comparing the per-row `upsert_order` loop with `bulk_upsert_orders`.
+Uses DATABASE_URL when set, otherwise a throwaway SQLite file, and prints rows/sec
+for a cold insert and a full re-sync (every row conflicts) at each volume. The
+`skip` strategy is `bulk_upsert_orders(skip_unchanged=True)`, whose re-sync of
+identical payloads is answered from the stored content hashes without writes.
+
+    python -m benchmarks.bench_orders_upsert --sizes 1000,10000,100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_orders_upsert.db"
+
+from app.db import models  # noqa: E402,F401
+from app.db.crud import bulk_upsert_orders, upsert_order  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+
+
+def _build_payloads(count: int) -> list[dict]:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    payloads = []
+    for index in range(count):
+        ts = (base + timedelta(seconds=index)).isoformat().replace("+00:00", "Z")
+        payloads.append(
+            {
+                "AmazonOrderId": f"BENCH-{index:09d}",
+                "OrderStatus": "Shipped" if index % 3 else "Pending",
+                "PurchaseDate": ts,
+                "LastUpdateDate": ts,
+                "Buyer": "Bench Buyer",
+                "Amount": 100.0 + index % 50,
+                "Cost": 40.0 + index % 20,
+            }
+        )
+    return payloads
+
+
+def _run_loop(payloads: list[dict]) -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for payload in payloads:
+            upsert_order(db, payload)
+        db.commit()
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def _run_bulk(payloads: list[dict], skip_unchanged: bool = False) -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        bulk_upsert_orders(db, payloads, skip_unchanged=skip_unchanged)
+        db.commit()
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def _run_skip(payloads: list[dict]) -> float:
+    return _run_bulk(payloads, skip_unchanged=True)
+
+
+def _reset_schema() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"{'rows':>8} {'strategy':>8} {'insert rows/s':>14} {'resync rows/s':>14}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        payloads = _build_payloads(size)
+        for name, runner in (
+            ("loop", _run_loop),
+            ("bulk", _run_bulk),
+            ("skip", _run_skip),
+        ):
+            _reset_schema()
+            insert_elapsed = runner(payloads)
+            resync_elapsed = runner(payloads)
+            print(
+                f"{size:>8} {name:>8} {size / insert_elapsed:>14,.0f} "
+                f"{size / resync_elapsed:>14,.0f}"
+            )
+    _reset_schema()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Cost of a dashboard poll of `GET /orders/` with the response cache.
+Seeds `--rows` synthetic orders, then times `--repeat` requests in-process for a
+cache miss (the namespace is invalidated before every request, as after an ETL
+commit), a cache hit, and a revalidation with `If-None-Match` answered by 304.
+
+    python -m benchmarks.bench_response_cache --rows 10000 --repeat 500
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_response_cache.db"
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "true")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from benchmarks.bench_orders_keyset import _seed  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.response_cache import response_cache  # noqa: E402
+
+
+def _measure(run: Callable[[], object], repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    _seed(args.rows)
+    url = f"/orders/?limit={args.limit}"
+    with TestClient(app) as client:
+        etag = client.get(url).headers["etag"]
+
+        def miss() -> None:
+            response_cache.invalidate("orders")
+            client.get(url)
+
+        def not_modified() -> None:
+            assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        print(f"{'request':<14} {'p50 ms':>8} {'p99 ms':>8}")
+        for name, run in (
+            ("miss", miss),
+            ("hit", lambda: client.get(url)),
+            ("304", not_modified),
+        ):
+            p50, p99 = _measure(run, args.repeat)
+            print(f"{name:<14} {p50:>8.2f} {p99:>8.2f}")
+        print(response_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Cost of the API startup schema step: the old `create_all` + column/index
+reflection (now migration 1, `migrations._baseline`) against the
+`check_schema_version()` query that startup runs today. The pool is disposed
+before every round so each one pays for a fresh connection, like a cold replica.
+Point DATABASE_URL at PostgreSQL to see the reflection round-trips.
+
+    python -m benchmarks.bench_startup --rounds 50
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/bench_startup.db"
+
+from app.db import migrations  # noqa: E402
+from app.db.session import engine  # noqa: E402
+
+
+def _reflect_and_create() -> None:
+    with engine.begin() as connection:
+        migrations._baseline(connection)
+
+
+def _measure(step: Callable[[], object], rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        engine.dispose()
+        started = time.perf_counter()
+        step()
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    migrations.migrate()
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"{'startup step':<28} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, step in (
+        ("create_all + reflection", _reflect_and_create),
+        ("check_schema_version", migrations.check_schema_version),
+    ):
+        samples = _measure(step, args.rounds)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(f"{name:<28} {statistics.median(samples):>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Local stand-in for Amazon LWA and SP-API used by the benchmark scripts.
+Runs a ThreadingHTTPServer on a background thread and counts every request it
+serves, so callers can assert how many round-trips a code path really made.
+getOrders serves `orders_total` synthetic orders per marketplace (one per minute
+from 2026-01-01, honouring CreatedAfter/CreatedBefore dates) split into NextToken
+pages, optionally after `orders_latency_seconds` of simulated work.
+getOrderItems returns one to three items per order id, derived from the id,
+after `order_items_latency_seconds`.
+getInventorySummaries serves `inventory_total` SKUs; bumping `inventory_version`
+moves a share of their quantities, like stock changing between syncs.
+With `throttle_every=N`, every Nth getOrders/getOrderItems call is answered 429
+QuotaExceeded (counted as "throttled"), like a burst over the SP-API rate limit.
+With `orders_fail_after=N`, every getOrders call after the Nth is answered 500
+InternalFailure (counted as "failed"), like an outage in the middle of a sync.
+getOrderItems calls for order ids in `failing_order_items` are answered 500 the
+same way, until they are removed from the set.
+
+    with FakeSPAPIServer(orders_total=5000, orders_page_size=100) as server:
+        os.environ["SPAPI_LWA_TOKEN_URL"] = server.token_url
+        os.environ["SPAPI_SANDBOX_ENDPOINT"] = server.base_url
+"""
+
+import json
+import math
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+_ORDER_STATUSES = ("Pending", "Unshipped", "Shipped", "Canceled")
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+_DEFAULT_MARKETPLACE_ID = "ATVPDKIKX0DER"
+
+
+def _spapi_ts(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def build_synthetic_order(index: int, marketplace_id: str = _DEFAULT_MARKETPLACE_ID) -> dict:
+    purchased = _EPOCH + timedelta(minutes=index)
+    if marketplace_id == _DEFAULT_MARKETPLACE_ID:
+        prefix = 900 + index % 100
+    else:
+        # Other marketplaces get their own id space so their orders do not collide.
+        prefix = zlib.crc32(marketplace_id.encode("utf-8")) % 800 + 100
+    return {
+        "AmazonOrderId": f"{prefix:03d}-{index:07d}-{(index * 7919) % 10**7:07d}",
+        "OrderStatus": _ORDER_STATUSES[index % len(_ORDER_STATUSES)],
+        "PurchaseDate": _spapi_ts(purchased),
+        "LastUpdateDate": _spapi_ts(purchased + timedelta(hours=1)),
+        "MarketplaceId": marketplace_id,
+        "FulfillmentChannel": "AFN" if index % 2 else "MFN",
+        "SalesChannel": "Amazon.com",
+        "OrderTotal": {"CurrencyCode": "USD", "Amount": f"{20 + index % 480}.99"},
+        "NumberOfItemsShipped": index % 3,
+        "NumberOfItemsUnshipped": 1,
+    }
+
+
+def build_synthetic_order_items(amazon_order_id: str) -> list[dict]:
+    seed = zlib.crc32(amazon_order_id.encode("utf-8"))
+    items = []
+    for position in range(1 + seed % 3):
+        sku_index = (seed + position * 7) % 500
+        quantity = 1 + (seed >> position) % 3
+        items.append(
+            {
+                "ASIN": f"B0{sku_index:08d}",
+                "SellerSKU": f"SKU-{sku_index:06d}",
+                "OrderItemId": f"{seed % 10**8:08d}{position:04d}",
+                "Title": f"Synthetic product {sku_index}",
+                "QuantityOrdered": quantity,
+                "QuantityShipped": quantity if seed % 2 else 0,
+                "ItemPrice": {
+                    "CurrencyCode": "USD",
+                    "Amount": f"{quantity * (5 + sku_index % 95)}.00",
+                },
+                "ItemTax": {"CurrencyCode": "USD", "Amount": f"{quantity}.50"},
+                "PromotionDiscount": {"CurrencyCode": "USD", "Amount": "0.00"},
+            }
+        )
+    return items
+
+
+def build_synthetic_inventory_summary(index: int, version: int = 0) -> dict:
+    # A rotating quarter of the SKUs changes quantity on each version bump.
+    moved = version if version and index % 4 == version % 4 else 0
+    fulfillable = (index * 13 + moved * 5) % 60
+    return {
+        "asin": f"B0{index:08d}",
+        "fnSku": f"X0{index:08d}",
+        "sellerSku": f"SKU-{index:06d}",
+        "condition": "NewItem",
+        "productName": f"Synthetic product {index}",
+        "lastUpdatedTime": _spapi_ts(_EPOCH + timedelta(days=version)),
+        "totalQuantity": fulfillable + index % 7,
+        "inventoryDetails": {
+            "fulfillableQuantity": fulfillable,
+            "inboundWorkingQuantity": index % 3,
+            "inboundShippedQuantity": index % 5,
+            "inboundReceivingQuantity": 0,
+            "reservedQuantity": {"totalReservedQuantity": index % 7},
+            "unfulfillableQuantity": {"totalUnfulfillableQuantity": 0},
+        },
+    }
+
+
+def _index_at(value: str) -> int | None:
+    """First order index purchased at or after `value`; None for sandbox test-case values."""
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    minutes = (moment - _EPOCH) / timedelta(minutes=1)
+    return max(0, math.ceil(minutes))
+
+
+def _first_index_updated_after(value: str) -> int:
+    updated_after = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    minutes = (updated_after - _EPOCH - timedelta(hours=1)) / timedelta(minutes=1)
+    return max(0, int(minutes) + 1)
+
+
+class _FakeSPAPIHandler(BaseHTTPRequestHandler):
+    server: "_FakeHTTPServer"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+    def _send_json(self, status: int, body: dict, headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:  # noqa: N802
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if path == "/auth/o2/token":
+            self.server.fake.handle_token(self)
+            return
+        self._send_json(404, {"errors": [{"code": "NotFound", "message": path}]})
+
+    def do_GET(self) -> None:  # noqa: N802
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        if parts.path == "/orders/v0/orders":
+            self.server.fake.handle_orders(self, query)
+            return
+        if parts.path.startswith("/orders/v0/orders/") and parts.path.endswith("/orderItems"):
+            order_id = unquote(parts.path.split("/")[4])
+            self.server.fake.handle_order_items(self, order_id)
+            return
+        if parts.path == "/fba/inventory/v1/summaries":
+            self.server.fake.handle_inventory(self, query)
+            return
+        self._send_json(404, {"errors": [{"code": "NotFound", "message": parts.path}]})
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: "FakeSPAPIServer"
+
+
+class FakeSPAPIServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token_expires_in: int = 3600,
+        token_latency_seconds: float = 0.0,
+        orders_total: int = 0,
+        orders_page_size: int = 100,
+        orders_latency_seconds: float = 0.0,
+        order_items_latency_seconds: float = 0.0,
+        inventory_total: int = 0,
+        inventory_page_size: int = 50,
+        rate_limit: float = 100.0,
+        throttle_every: int = 0,
+        orders_fail_after: int = 0,
+    ) -> None:
+        self.token_expires_in = token_expires_in
+        self.token_latency_seconds = token_latency_seconds
+        self.orders_total = orders_total
+        self.orders_page_size = orders_page_size
+        self.orders_latency_seconds = orders_latency_seconds
+        self.order_items_latency_seconds = order_items_latency_seconds
+        self.inventory_total = inventory_total
+        self.inventory_page_size = inventory_page_size
+        self.inventory_version = 0
+        self.rate_limit = rate_limit
+        self.throttle_every = throttle_every
+        self.orders_fail_after = orders_fail_after
+        self.failing_order_items: set[str] = set()
+        self.requests: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._httpd = _FakeHTTPServer((host, port), _FakeSPAPIHandler)
+        self._httpd.fake = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def token_url(self) -> str:
+        return f"{self.base_url}/auth/o2/token"
+
+    def _count(self, name: str) -> int:
+        with self._lock:
+            self.requests[name] += 1
+            return self.requests[name]
+
+    def _throttled(self, handler: _FakeSPAPIHandler, calls: int) -> bool:
+        if not self.throttle_every or calls % self.throttle_every:
+            return False
+        self._count("throttled")
+        handler._send_json(
+            429,
+            {"errors": [{"code": "QuotaExceeded", "message": "You exceeded your quota"}]},
+            headers={"x-amzn-RateLimit-Limit": str(self.rate_limit)},
+        )
+        return True
+
+    def handle_token(self, handler: _FakeSPAPIHandler) -> None:
+        issued = self._count("token")
+        if self.token_latency_seconds:
+            threading.Event().wait(self.token_latency_seconds)
+        handler._send_json(
+            200,
+            {
+                "access_token": f"Atza|fake-token-{issued}",
+                "token_type": "bearer",
+                "expires_in": self.token_expires_in,
+            },
+        )
+
+    def _fail(self, handler: _FakeSPAPIHandler) -> None:
+        self._count("failed")
+        handler._send_json(
+            500, {"errors": [{"code": "InternalFailure", "message": "We encountered an error"}]}
+        )
+
+    def handle_orders(self, handler: _FakeSPAPIHandler, query: dict[str, str]) -> None:
+        calls = self._count("getOrders")
+        if not handler.headers.get("x-amz-access-token"):
+            handler._send_json(403, {"errors": [{"code": "Unauthorized"}]})
+            return
+        if self._throttled(handler, calls):
+            return
+        if self.orders_fail_after and calls > self.orders_fail_after:
+            self._fail(handler)
+            return
+        if self.orders_latency_seconds:
+            threading.Event().wait(self.orders_latency_seconds)
+        marketplace_id = query.get("MarketplaceIds", _DEFAULT_MARKETPLACE_ID)
+        stop = self.orders_total
+        if "NextToken" in query:
+            start_token, _, stop_token = query["NextToken"].removeprefix("page-").partition("-")
+            start = int(start_token)
+            stop = int(stop_token) if stop_token else stop
+        elif "LastUpdatedAfter" in query:
+            start = _first_index_updated_after(query["LastUpdatedAfter"])
+        else:
+            start = _index_at(query.get("CreatedAfter", "")) or 0
+            created_before = _index_at(query.get("CreatedBefore", ""))
+            if created_before is not None:
+                stop = min(stop, created_before)
+        end = min(start + self.orders_page_size, stop)
+        payload: dict = {
+            "Orders": [build_synthetic_order(index, marketplace_id) for index in range(start, end)]
+        }
+        if end < stop:
+            payload["NextToken"] = f"page-{end}-{stop}"
+        handler._send_json(
+            200,
+            {"payload": payload},
+            headers={"x-amzn-RateLimit-Limit": str(self.rate_limit)},
+        )
+
+    def handle_order_items(self, handler: _FakeSPAPIHandler, amazon_order_id: str) -> None:
+        calls = self._count("getOrderItems")
+        if not handler.headers.get("x-amz-access-token"):
+            handler._send_json(403, {"errors": [{"code": "Unauthorized"}]})
+            return
+        if self._throttled(handler, calls):
+            return
+        if amazon_order_id in self.failing_order_items:
+            self._fail(handler)
+            return
+        if self.order_items_latency_seconds:
+            threading.Event().wait(self.order_items_latency_seconds)
+        handler._send_json(
+            200,
+            {
+                "payload": {
+                    "AmazonOrderId": amazon_order_id,
+                    "OrderItems": build_synthetic_order_items(amazon_order_id),
+                }
+            },
+            headers={"x-amzn-RateLimit-Limit": str(self.rate_limit)},
+        )
+
+    def handle_inventory(self, handler: _FakeSPAPIHandler, query: dict[str, str]) -> None:
+        self._count("getInventorySummaries")
+        if not handler.headers.get("x-amz-access-token"):
+            handler._send_json(403, {"errors": [{"code": "Unauthorized"}]})
+            return
+        start = int(query.get("nextToken", "sku-0").removeprefix("sku-"))
+        end = min(start + self.inventory_page_size, self.inventory_total)
+        body: dict = {
+            "payload": {
+                "granularity": {
+                    "granularityType": query.get("granularityType", "Marketplace"),
+                    "granularityId": query.get("granularityId", _DEFAULT_MARKETPLACE_ID),
+                },
+                "inventorySummaries": [
+                    build_synthetic_inventory_summary(index, self.inventory_version)
+                    for index in range(start, end)
+                ],
+            }
+        }
+        if end < self.inventory_total:
+            body["pagination"] = {"nextToken": f"sku-{end}"}
+        handler._send_json(
+            200, body, headers={"x-amzn-RateLimit-Limit": str(self.rate_limit)}
+        )
+
+    def start(self) -> "FakeSPAPIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeSPAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    server = FakeSPAPIServer(port=8765).start()
+    print(f"fake SP-API listening on {server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,163 @@
+"""
+Load test of the orders API on the sync stack vs the async stack.
+Starts the app under uvicorn twice (ASYNC_DB_ENABLED=false, then true) against
+the fake SP-API, seeds the orders table with one sync, then drives `--clients`
+concurrent `GET /orders` loops while `POST /orders/sync-sandbox` is fired every
+`--sync-every` seconds. Reports requests/sec and p50/p99 latency per stack.
+
+    python -m benchmarks.load_orders_api --clients 64 --seconds 20
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.fake_spapi import FakeSPAPIServer
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_api(env: dict[str, str], port: int) -> subprocess.Popen:
+    subprocess.run([sys.executable, "-m", "app.db.migrations"], env=env, check=True)
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/dashboard/health", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("API did not start")
+
+
+async def _wait_for_job(client: httpx.AsyncClient, job_id: str) -> None:
+    while True:
+        job = (await client.get(f"/orders/sync-jobs/{job_id}")).json()
+        if job["status"] not in {"queued", "running"}:
+            return
+        await asyncio.sleep(0.2)
+
+
+async def _drive(base_url: str, clients: int, seconds: float, sync_every: float) -> dict:
+    limits = httpx.Limits(max_connections=clients + 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await _wait_for_job(client, (await client.post("/orders/sync-sandbox")).json()["job_id"])
+
+        latencies: list[float] = []
+        errors = 0
+        syncs = 0
+        deadline = time.monotonic() + seconds
+
+        async def reader() -> None:
+            nonlocal errors
+            cursor = None
+            while time.monotonic() < deadline:
+                params = {"limit": 100}
+                if cursor:
+                    params["cursor"] = cursor
+                started = time.perf_counter()
+                response = await client.get("/orders/", params=params)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+                    cursor = None
+                    continue
+                cursor = response.json()["next_cursor"]
+
+        async def syncer() -> None:
+            nonlocal syncs
+            while time.monotonic() < deadline:
+                await client.post("/orders/sync-sandbox")
+                syncs += 1
+                await asyncio.sleep(sync_every)
+
+        started = time.perf_counter()
+        await asyncio.gather(syncer(), *(reader() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "errors": errors,
+        "syncs": syncs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--sync-every", type=float, default=2.0)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--spapi-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    database_url = os.getenv(
+        "DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/load_orders_api.db"
+    )
+    print(
+        f"{'stack':<6} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'errors':>7} {'syncs':>6}"
+    )
+    with FakeSPAPIServer(
+        orders_total=args.orders, token_latency_seconds=args.spapi_latency
+    ) as server:
+        for stack, async_enabled in (("sync", "false"), ("async", "true")):
+            env = {
+                **os.environ,
+                "DATABASE_URL": database_url,
+                "ASYNC_DB_ENABLED": async_enabled,
+                "SPAPI_LWA_TOKEN_URL": server.token_url,
+                "SPAPI_SANDBOX_ENDPOINT": server.base_url,
+                "SPAPI_CLIENT_ID": "bench-client",
+                "SPAPI_CLIENT_SECRET": "bench-secret",
+                "SPAPI_REFRESH_TOKEN": "bench-refresh",
+                "SLACK_WEBHOOK_URL": "",
+                "DEMO_MODE": "false",
+                "SCHEDULER_ENABLED": "false",
+            }
+            port = _free_port()
+            process = _start_api(env, port)
+            try:
+                result = asyncio.run(
+                    _drive(f"http://127.0.0.1:{port}", args.clients, args.seconds, args.sync_every)
+                )
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+            print(
+                f"{stack:<6} {result['requests']:>9} {result['rps']:>8.1f} "
+                f"{result['p50']:>8.1f} {result['p99']:>8.1f} {result['errors']:>7} "
+                f"{result['syncs']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
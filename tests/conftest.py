@@ -0,0 +1,67 @@
+"""
+Shared fixtures: a throwaway SQLite database and the fake SP-API from
+`benchmarks/fake_spapi.py`. Settings and engines are built at import time, so
+the environment is set here before anything from `app` is imported.
+"""
+
+import os
+import tempfile
+from collections.abc import Callable, Iterator
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix="amazon-ops-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["SLACK_WEBHOOK_URL"] = ""
+os.environ["SCHEDULER_ENABLED"] = "false"
+os.environ["DEMO_MODE"] = "false"
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.migrations import migrate  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.services.http_transport import http_transport  # noqa: E402
+from app.services.lwa_token_cache import lwa_token_cache  # noqa: E402
+from app.services.response_cache import response_cache  # noqa: E402
+from benchmarks.fake_spapi import FakeSPAPIServer  # noqa: E402
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    Base.metadata.drop_all(bind=engine)
+    migrate()
+    response_cache.invalidate("orders", "inventory")
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def fake_spapi(monkeypatch: pytest.MonkeyPatch) -> Iterator[Callable[..., FakeSPAPIServer]]:
+    """Start a `FakeSPAPIServer(**options)` and point the default SP-API account at it."""
+    servers: list[FakeSPAPIServer] = []
+
+    def start(**options: object) -> FakeSPAPIServer:
+        server = FakeSPAPIServer(**options).start()
+        servers.append(server)
+        monkeypatch.setattr(settings, "spapi_lwa_token_url", server.token_url)
+        monkeypatch.setattr(settings, "spapi_sandbox_endpoint", server.base_url)
+        monkeypatch.setattr(settings, "spapi_accounts_env", "")
+        monkeypatch.setattr(settings, "spapi_client_id", "test-client")
+        monkeypatch.setattr(settings, "spapi_client_secret", "test-secret")
+        monkeypatch.setattr(settings, "spapi_refresh_token", f"test-refresh-{server.base_url}")
+        return server
+
+    # Keep retries, but without real backoff sleeps.
+    monkeypatch.setattr(http_transport, "backoff_base_seconds", 0.0)
+    lwa_token_cache.invalidate()
+    try:
+        yield start
+    finally:
+        for server in servers:
+            server.stop()
+        lwa_token_cache.invalidate()
@@ -0,0 +1,84 @@
+from sqlalchemy import select
+
+from app.db.crud import bulk_upsert_orders
+from app.db.models import Order
+from benchmarks.fake_spapi import build_synthetic_order
+
+
+def _stored(db) -> dict[str, Order]:
+    db.expire_all()
+    return {order.amazon_order_id: order for order in db.scalars(select(Order))}
+
+
+def test_bulk_upsert_splits_created_and_updated_across_chunks(db):
+    orders = [build_synthetic_order(index) for index in range(7)]
+    first = bulk_upsert_orders(db, orders[:4], chunk_size=3)
+    db.commit()
+
+    changed = dict(orders[1], OrderStatus="Canceled")
+    second = bulk_upsert_orders(db, [changed, *orders[4:]], chunk_size=3)
+    db.commit()
+
+    ids = [order["AmazonOrderId"] for order in orders]
+    assert first.created == ids[:4] and first.updated == []
+    assert second.created == ids[4:] and second.updated == [ids[1]]
+    stored = _stored(db)
+    assert len(stored) == 7
+    assert stored[ids[1]].order_status == "Canceled"
+    assert stored[ids[1]].raw_payload["OrderStatus"] == "Canceled"
+
+
+def test_bulk_upsert_keeps_the_last_copy_of_a_repeated_order(db):
+    order = build_synthetic_order(0)
+    latest = dict(order, OrderStatus="Shipped")
+
+    result = bulk_upsert_orders(db, [order, latest])
+    db.commit()
+
+    assert result.created == [order["AmazonOrderId"]]
+    assert _stored(db)[order["AmazonOrderId"]].order_status == "Shipped"
+
+
+def test_bulk_upsert_stamps_the_fetched_marketplace_on_payloads_without_one(db):
+    order = build_synthetic_order(0)
+    del order["MarketplaceId"]
+
+    bulk_upsert_orders(db, [order], marketplace_id="A1PA6795UKMFR9")
+    db.commit()
+
+    assert _stored(db)[order["AmazonOrderId"]].marketplace_id == "A1PA6795UKMFR9"
+
+
+def test_skip_unchanged_compares_content_hashes(db):
+    orders = [dict(build_synthetic_order(index), Buyer="a", Amount=1.0) for index in range(4)]
+    bulk_upsert_orders(db, orders)
+    db.commit()
+    synced_at = {order_id: order.synced_at for order_id, order in _stored(db).items()}
+
+    # Key order and the locally generated Buyer/Amount/Cost fields do not count as changes.
+    reordered = dict(reversed(list(orders[0].items())))
+    regenerated = dict(orders[1], Buyer="b", Amount=2.0, Cost=0.5)
+    shipped = dict(orders[2], OrderStatus="Shipped", LastUpdateDate="2026-02-01T00:00:00Z")
+    result = bulk_upsert_orders(
+        db, [reordered, regenerated, shipped, orders[3]], chunk_size=2, skip_unchanged=True
+    )
+    db.commit()
+
+    assert result.unchanged == 3
+    assert result.created == [] and result.updated == [shipped["AmazonOrderId"]]
+    stored = _stored(db)
+    assert stored[orders[1]["AmazonOrderId"]].buyer == "a"
+    for order in (orders[0], orders[1], orders[3]):
+        assert stored[order["AmazonOrderId"]].synced_at == synced_at[order["AmazonOrderId"]]
+    assert stored[shipped["AmazonOrderId"]].order_status == "Shipped"
+
+
+def test_without_skip_unchanged_every_order_is_rewritten(db):
+    orders = [build_synthetic_order(index) for index in range(3)]
+    bulk_upsert_orders(db, orders)
+    db.commit()
+
+    result = bulk_upsert_orders(db, orders)
+
+    assert result.unchanged == 0
+    assert len(result.updated) == 3
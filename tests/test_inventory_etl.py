@@ -0,0 +1,111 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.models import InventoryItem, InventorySnapshot
+from app.main import app
+from app.services.etl_inventory import run_inventory_etl
+from benchmarks.fake_spapi import build_synthetic_inventory_summary
+
+SKUS = 40
+LOW_STOCK_THRESHOLD = 20
+
+
+@pytest.fixture
+def inventory_server(fake_spapi, monkeypatch):
+    # Batches that do not line up with pages, so both boundaries get crossed.
+    monkeypatch.setattr(settings, "inventory_etl_batch_size", 16)
+    monkeypatch.setattr(settings, "inventory_low_stock_threshold", LOW_STOCK_THRESHOLD)
+    return fake_spapi(inventory_total=SKUS, inventory_page_size=15)
+
+
+def _fulfillable(index: int, version: int) -> int:
+    summary = build_synthetic_inventory_summary(index, version)
+    return summary["inventoryDetails"]["fulfillableQuantity"]
+
+
+def _low_stock_pages(client: TestClient, limit: int) -> list[list[dict]]:
+    pages = []
+    cursor = None
+    while True:
+        params = {"low_stock": "true", "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/inventory/", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body["inventory"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def _expected_low_stock(db, version: int) -> list[str]:
+    item_ids = dict(db.execute(select(InventoryItem.seller_sku, InventoryItem.id)).all())
+    stock = [
+        (_fulfillable(index, version), item_ids[f"SKU-{index:06d}"], f"SKU-{index:06d}")
+        for index in range(SKUS)
+    ]
+    return [sku for quantity, _, sku in sorted(stock) if quantity <= LOW_STOCK_THRESHOLD]
+
+
+def test_second_run_snapshots_only_changed_skus(inventory_server, db):
+    first = run_inventory_etl(db)
+
+    assert (first["items"], first["created"], first["changed"]) == (SKUS, SKUS, 0)
+    assert first["snapshots"] == SKUS
+    assert db.scalar(select(func.count(InventoryItem.id))) == SKUS
+    assert db.scalar(select(func.count(InventorySnapshot.id))) == SKUS
+
+    # Version 1 moves the fulfillable quantity of every SKU with index % 4 == 1.
+    inventory_server.inventory_version = 1
+    changed = {f"SKU-{index:06d}" for index in range(SKUS) if index % 4 == 1}
+    second = run_inventory_etl(db)
+
+    assert (second["items"], second["created"], second["changed"]) == (SKUS, 0, len(changed))
+    assert second["snapshots"] == len(changed)
+    assert db.scalar(select(func.count(InventoryItem.id))) == SKUS
+    assert db.scalar(select(func.count(InventorySnapshot.id))) == SKUS + len(changed)
+
+    snapshot_counts = dict(
+        db.execute(
+            select(InventoryItem.seller_sku, func.count(InventorySnapshot.id))
+            .join(InventorySnapshot, InventorySnapshot.inventory_item_id == InventoryItem.id)
+            .group_by(InventoryItem.seller_sku)
+        ).all()
+    )
+    assert {sku for sku, count in snapshot_counts.items() if count == 2} == changed
+    for sku, quantity in db.execute(
+        select(InventoryItem.seller_sku, InventoryItem.fulfillable_quantity)
+    ):
+        assert quantity == _fulfillable(int(sku.removeprefix("SKU-")), 1)
+
+
+def test_low_stock_listing_pages_follow_each_sync(inventory_server, db):
+    client = TestClient(app)
+    run_inventory_etl(db)
+
+    pages = _low_stock_pages(client, limit=4)
+    expected = _expected_low_stock(db, version=0)
+    assert [item["seller_sku"] for page in pages for item in page] == expected
+    assert len(pages) > 2
+    assert all(len(page) == 4 for page in pages[:-1])
+    assert all(
+        item["fulfillable_quantity"] <= LOW_STOCK_THRESHOLD for page in pages for item in page
+    )
+
+    # The sync invalidates the cached pages, so the listing follows the new stock.
+    inventory_server.inventory_version = 1
+    run_inventory_etl(db)
+
+    pages = _low_stock_pages(client, limit=4)
+    assert [item["seller_sku"] for page in pages for item in page] == _expected_low_stock(
+        db, version=1
+    )
+
+
+def test_invalid_inventory_cursor_is_rejected(db):
+    response = TestClient(app).get("/inventory/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
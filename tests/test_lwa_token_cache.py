@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import lwa_token_cache as lwa_token_cache_module
+from app.services import spapi_client
+from app.services.lwa_token_cache import LWATokenCache
+from app.services.spapi_client import AsyncSPAPIClient, SPAPIClient
+
+CALLERS = 16
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    """A fresh cache behind SPAPIClient, so counters start at zero."""
+    cache = LWATokenCache(refresh_margin_seconds=300.0)
+    monkeypatch.setattr(spapi_client, "lwa_token_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(lwa_token_cache_module, "time", clock)
+    return clock
+
+
+def test_concurrent_threads_share_one_token_post(fake_spapi, token_cache):
+    server = fake_spapi(token_latency_seconds=0.2)
+    start = threading.Barrier(CALLERS)
+
+    def get_token() -> str:
+        start.wait()
+        return SPAPIClient().get_lwa_access_token()
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        tokens = list(executor.map(lambda _: get_token(), range(CALLERS)))
+
+    assert server.requests["token"] == 1
+    assert set(tokens) == {"Atza|fake-token-1"}
+    stats = token_cache.stats()
+    assert stats["refreshes"] == 1
+    assert stats["misses"] == CALLERS
+    assert stats["hits"] == 0
+
+    assert SPAPIClient().get_lwa_access_token() == "Atza|fake-token-1"
+    assert token_cache.stats()["hits"] == 1
+    assert server.requests["token"] == 1
+
+
+def test_concurrent_coroutines_share_one_token_post(fake_spapi, token_cache):
+    server = fake_spapi(token_latency_seconds=0.2)
+
+    async def get_tokens() -> list[str]:
+        client = AsyncSPAPIClient()
+        return await asyncio.gather(*(client.get_lwa_access_token() for _ in range(CALLERS)))
+
+    tokens = asyncio.run(get_tokens())
+
+    assert server.requests["token"] == 1
+    assert set(tokens) == {"Atza|fake-token-1"}
+    assert token_cache.stats()["refreshes"] == 1
+
+
+def test_threads_and_coroutines_share_one_token_post(fake_spapi, token_cache):
+    server = fake_spapi(token_latency_seconds=0.2)
+
+    async def get_tokens() -> list[str]:
+        client = AsyncSPAPIClient()
+        return await asyncio.gather(*(client.get_lwa_access_token() for _ in range(CALLERS)))
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [executor.submit(SPAPIClient().get_lwa_access_token) for _ in range(CALLERS)]
+        tokens = asyncio.run(get_tokens()) + [future.result() for future in futures]
+
+    assert server.requests["token"] == 1
+    assert set(tokens) == {"Atza|fake-token-1"}
+
+
+def test_token_is_refreshed_margin_before_expires_in(fake_spapi, token_cache, clock):
+    server = fake_spapi(token_expires_in=3600)
+    client = SPAPIClient()
+
+    assert client.get_lwa_access_token() == "Atza|fake-token-1"
+    clock.now += 3600 - 300 - 1
+    assert client.get_lwa_access_token() == "Atza|fake-token-1"
+    assert server.requests["token"] == 1
+
+    clock.now += 2
+    assert client.get_lwa_access_token() == "Atza|fake-token-2"
+    assert server.requests["token"] == 2
+    assert token_cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "refreshes": 2,
+        "refresh_failures": 0,
+        "cached_tokens": 1,
+    }
+
+
+def test_short_lived_token_refreshes_at_half_its_lifetime(fake_spapi, token_cache, clock):
+    # With expires_in=60 a 300s margin would refresh on every call; it is capped at half.
+    server = fake_spapi(token_expires_in=60)
+    client = SPAPIClient()
+
+    client.get_lwa_access_token()
+    clock.now += 29
+    client.get_lwa_access_token()
+    assert server.requests["token"] == 1
+
+    clock.now += 2
+    assert client.get_lwa_access_token() == "Atza|fake-token-2"
+    assert server.requests["token"] == 2
+
+
+def test_expired_token_is_never_served(fake_spapi, token_cache, clock):
+    server = fake_spapi(token_expires_in=600)
+    client = SPAPIClient()
+
+    client.get_lwa_access_token()
+    clock.now += 601
+
+    assert client.get_lwa_access_token() == "Atza|fake-token-2"
+    assert server.requests["token"] == 2
+    stats = token_cache.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 0
@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.metrics import db_query_seconds, instrument_engine
+from app.main import app
+
+
+def _query_count(statement: str) -> int:
+    prefix = f'db_query_duration_seconds_count{{statement="{statement}"}} '
+    lines = [line for line in db_query_seconds.render() if line.startswith(prefix)]
+    return int(lines[0].removeprefix(prefix)) if lines else 0
+
+
+def test_failed_statements_leave_no_timing_state_behind():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    selects = _query_count("SELECT")
+
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+        connection.execute(text("SELECT 1"))
+        assert "metrics_query_started" not in connection.info
+
+    # Only the statement that completed is observed.
+    assert _query_count("SELECT") == selects + 1
+
+
+def test_request_metrics_are_labelled_with_the_prefixed_route(db):
+    client = TestClient(app)
+    client.get("/orders/sync-jobs/unknown-job")
+    client.get("/inventory/", params={"cursor": "not-a-cursor"})
+
+    body = client.get("/metrics").text
+
+    assert 'route="/orders/sync-jobs/{job_id}",status="404"' in body
+    assert 'route="/inventory/",status="400"' in body
+    assert "unknown-job" not in body
@@ -0,0 +1,95 @@
+import asyncio
+
+from app.db.crud import BulkUpsertResult
+from app.services.etl_orders import run_orders_etl
+from app.services.order_events import (
+    RESYNC_EVENT,
+    OrderEventBroadcaster,
+    order_change_events,
+    order_events,
+)
+from benchmarks.fake_spapi import build_synthetic_order
+
+
+async def _drain(subscription, count: int) -> list[dict]:
+    return [await asyncio.wait_for(subscription.get(), timeout=10) for _ in range(count)]
+
+
+def test_sync_publishes_created_then_updated_events(fake_spapi, db):
+    server = fake_spapi(orders_total=4, orders_page_size=4)
+
+    async def scenario() -> tuple[list[dict], list[dict]]:
+        subscription = order_events.subscribe()
+        try:
+            await asyncio.to_thread(run_orders_etl, db, None, False)
+            created = await _drain(subscription, 4)
+            server.orders_total = 5
+            await asyncio.to_thread(run_orders_etl, db, None, False)
+            # Unchanged orders are not written again, so only the new one is announced.
+            return created, await _drain(subscription, 1)
+        finally:
+            order_events.unsubscribe(subscription)
+
+    created, second = asyncio.run(scenario())
+
+    assert [event["type"] for event in created] == ["order.created"] * 4
+    assert [event["amazon_order_id"] for event in created] == [
+        build_synthetic_order(index)["AmazonOrderId"] for index in range(4)
+    ]
+    assert second[0]["amazon_order_id"] == build_synthetic_order(4)["AmazonOrderId"]
+    assert second[0]["marketplace_id"] == "ATVPDKIKX0DER"
+
+
+def _events(*indexes: int, marketplace_id: str = "ATVPDKIKX0DER") -> list[dict]:
+    return [
+        {"type": "order.updated", "amazon_order_id": str(index), "marketplace_id": marketplace_id}
+        for index in indexes
+    ]
+
+
+def test_slow_stream_gets_a_resync_instead_of_an_unbounded_backlog():
+    broadcaster = OrderEventBroadcaster(max_queue_size=3)
+
+    async def scenario() -> list[dict]:
+        slow = broadcaster.subscribe()
+        broadcaster.publish(_events(*range(5)))
+        await asyncio.sleep(0)
+        broadcaster.publish(_events(5))
+        await asyncio.sleep(0)
+        return await _drain(slow, 3)
+
+    events = asyncio.run(scenario())
+
+    # Events 0-3 are dropped for the resync; the stream picks up again from 4.
+    assert events == [RESYNC_EVENT, *_events(4, 5)]
+    stats = broadcaster.stats()
+    assert (stats["published"], stats["dropped"], stats["resyncs"]) == (6, 4, 1)
+
+
+def test_streams_filter_by_marketplace_and_end_on_shutdown():
+    broadcaster = OrderEventBroadcaster()
+
+    async def scenario() -> tuple[list[dict], dict | None]:
+        german = broadcaster.subscribe("A1PA6795UKMFR9")
+        broadcaster.publish(_events(1) + _events(2, marketplace_id="A1PA6795UKMFR9"))
+        received = await _drain(german, 1)
+        broadcaster.shutdown()
+        return received, await asyncio.wait_for(german.get(), timeout=10)
+
+    received, after_shutdown = asyncio.run(scenario())
+
+    assert received == _events(2, marketplace_id="A1PA6795UKMFR9")
+    assert after_shutdown is None
+    assert broadcaster.stats()["clients"] == 0
+
+
+def test_events_cover_only_written_orders():
+    orders = [build_synthetic_order(index) for index in range(3)]
+    ids = [order["AmazonOrderId"] for order in orders]
+
+    events = order_change_events(orders, BulkUpsertResult(created=[ids[0]], updated=[ids[2]]))
+
+    assert [(event["type"], event["amazon_order_id"]) for event in events] == [
+        ("order.created", ids[0]),
+        ("order.updated", ids[2]),
+    ]
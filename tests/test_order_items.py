@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.models import OrderItem, OrderItemsPending
+from app.services.etl_orders import run_orders_etl
+from benchmarks.fake_spapi import build_synthetic_order, build_synthetic_order_items
+
+ORDERS = 30
+
+
+@pytest.fixture
+def items_server(fake_spapi, monkeypatch):
+    monkeypatch.setattr(settings, "order_items_enabled", True)
+    monkeypatch.setattr(settings, "orders_etl_batch_size", 10)
+    return fake_spapi(orders_total=ORDERS, orders_page_size=10)
+
+
+def _stored_items(db, amazon_order_ids: list[str]) -> int:
+    return db.scalar(
+        select(func.count(OrderItem.id)).where(OrderItem.amazon_order_id.in_(amazon_order_ids))
+    )
+
+
+def test_failed_order_items_are_retried_by_the_next_sync(items_server, db):
+    failing = [build_synthetic_order(index)["AmazonOrderId"] for index in (0, 11, 25)]
+    items_server.failing_order_items.update(failing)
+
+    first = run_orders_etl(db, generate_demo=False)
+
+    assert first["order_items"]["fetched"] == ORDERS - len(failing)
+    assert first["order_items"]["failed"] == len(failing)
+    assert _stored_items(db, failing) == 0
+    pending = dict(
+        db.execute(select(OrderItemsPending.amazon_order_id, OrderItemsPending.attempts)).all()
+    )
+    assert pending == {amazon_order_id: 1 for amazon_order_id in failing}
+
+    # The orders themselves are unchanged, so only the pending markers bring them back.
+    items_server.failing_order_items.discard(failing[0])
+    second = run_orders_etl(db, generate_demo=False)
+
+    assert second["changed"] == 0
+    assert second["order_items"]["retried"] == len(failing)
+    assert second["order_items"]["fetched"] == 1
+    assert second["order_items"]["failed"] == len(failing) - 1
+    assert _stored_items(db, failing[:1]) == len(build_synthetic_order_items(failing[0]))
+    pending = dict(
+        db.execute(select(OrderItemsPending.amazon_order_id, OrderItemsPending.attempts)).all()
+    )
+    assert pending == {amazon_order_id: 2 for amazon_order_id in failing[1:]}
+
+    items_server.failing_order_items.clear()
+    third = run_orders_etl(db, generate_demo=False)
+
+    assert third["order_items"]["retried"] == len(failing) - 1
+    assert third["order_items"]["failed"] == 0
+    assert db.scalar(select(func.count(OrderItemsPending.id))) == 0
+    assert _stored_items(db, failing) == sum(
+        len(build_synthetic_order_items(amazon_order_id)) for amazon_order_id in failing
+    )
+
+    calls = items_server.requests["getOrderItems"]
+    fourth = run_orders_etl(db, generate_demo=False)
+    assert fourth["order_items"]["retried"] == 0
+    assert items_server.requests["getOrderItems"] == calls
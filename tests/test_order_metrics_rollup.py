@@ -0,0 +1,116 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.db.crud import (
+    bulk_upsert_orders,
+    parse_spapi_datetime,
+    rebuild_order_metrics,
+    refresh_order_metrics,
+)
+from app.db.models import OrderMetricsHourly
+from app.main import app
+from benchmarks.fake_spapi import build_synthetic_order
+
+HOUR_0 = datetime(2026, 1, 1, 0, tzinfo=timezone.utc)
+HOUR_1 = datetime(2026, 1, 1, 1, tzinfo=timezone.utc)
+
+
+def _order(index: int, status: str, amount: float, cost: float) -> dict:
+    return dict(build_synthetic_order(index), OrderStatus=status, Amount=amount, Cost=cost)
+
+
+def _write(db, orders: list[dict]) -> int:
+    bulk_upsert_orders(db, orders)
+    refreshed = refresh_order_metrics(
+        db, (parse_spapi_datetime(order["PurchaseDate"]) for order in orders)
+    )
+    db.commit()
+    return refreshed
+
+
+def _rollup(db) -> dict[tuple[datetime, str], tuple[int, float, float]]:
+    db.expire_all()
+    return {
+        (row.bucket_start.replace(tzinfo=timezone.utc), row.order_status): (
+            row.order_count,
+            round(row.revenue, 2),
+            round(row.cost, 2),
+        )
+        for row in db.scalars(select(OrderMetricsHourly))
+    }
+
+
+def _seed(db) -> None:
+    _write(
+        db,
+        [
+            _order(0, "Shipped", 10.0, 4.0),
+            _order(5, "Shipped", 20.0, 5.0),
+            _order(30, "Pending", 7.5, 2.5),
+            _order(60, "Shipped", 40.0, 10.0),
+        ],
+    )
+
+
+def test_rollup_follows_changed_orders_hour_by_hour(db):
+    _seed(db)
+    assert _rollup(db) == {
+        (HOUR_0, "Shipped"): (2, 30.0, 9.0),
+        (HOUR_0, "Pending"): (1, 7.5, 2.5),
+        (HOUR_1, "Shipped"): (1, 40.0, 10.0),
+    }
+    hour_1_written = db.scalar(
+        select(OrderMetricsHourly.updated_at).where(OrderMetricsHourly.bucket_start == HOUR_1)
+    )
+
+    # The pending order ships; only hour 0 is re-aggregated.
+    assert _write(db, [_order(30, "Shipped", 7.5, 2.5)]) == 1
+
+    assert _rollup(db) == {
+        (HOUR_0, "Shipped"): (3, 37.5, 11.5),
+        (HOUR_1, "Shipped"): (1, 40.0, 10.0),
+    }
+    assert (
+        db.scalar(
+            select(OrderMetricsHourly.updated_at).where(OrderMetricsHourly.bucket_start == HOUR_1)
+        )
+        == hour_1_written
+    )
+
+
+def test_refresh_ignores_orders_without_purchase_dates(db):
+    assert refresh_order_metrics(db, [None]) == 0
+
+
+def test_rebuild_matches_the_incremental_rollup(db):
+    _seed(db)
+    incremental = _rollup(db)
+
+    assert rebuild_order_metrics(db) == 2
+    db.commit()
+
+    assert _rollup(db) == incremental
+
+
+def test_dashboard_metrics_read_the_rollup(db):
+    _seed(db)
+    client = TestClient(app)
+    window = {"purchased_from": "2026-01-01T00:00:00Z", "purchased_to": "2026-01-02T00:00:00Z"}
+
+    hourly = client.get("/dashboard/metrics", params={**window, "granularity": "hour"}).json()
+    daily = client.get("/dashboard/metrics", params={**window, "granularity": "day"}).json()
+    shipped = client.get("/dashboard/metrics", params={**window, "status": "Shipped"}).json()
+
+    assert [bucket["order_count"] for bucket in hourly["buckets"]] == [3, 1]
+    assert hourly["buckets"][0]["by_status"]["Pending"]["revenue"] == 7.5
+    assert len(daily["buckets"]) == 1
+    assert daily["totals"] == {
+        "order_count": 4,
+        "revenue": 77.5,
+        "cost": 21.5,
+        "gross_margin": 56.0,
+        "gross_margin_rate": 0.7226,
+    }
+    assert shipped["totals"]["order_count"] == 3
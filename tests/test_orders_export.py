@@ -0,0 +1,95 @@
+import csv
+import io
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes_orders
+from app.core.config import settings
+from app.db.crud import bulk_upsert_orders
+from app.main import app
+from app.services.orders_export import EXPORT_COLUMNS
+from benchmarks.fake_spapi import build_synthetic_order
+
+
+@pytest.fixture
+def orders(db, monkeypatch) -> list[dict]:
+    # Several chunks per export, with a short last one.
+    monkeypatch.setattr(settings, "orders_export_chunk_size", 2)
+    orders = [
+        dict(build_synthetic_order(index), Buyer=f"buyer-{index}", Amount=index + 0.5, Cost=1.0)
+        for index in range(5)
+    ]
+    bulk_upsert_orders(db, orders)
+    db.commit()
+    return orders
+
+
+def _newest_first(orders: list[dict]) -> list[str]:
+    return [order["AmazonOrderId"] for order in reversed(orders)]
+
+
+def test_ndjson_export_streams_one_order_per_line(orders):
+    response = TestClient(app).get("/orders/export", params={"include_raw": True})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="orders_' in response.headers["content-disposition"]
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [line["amazon_order_id"] for line in lines] == _newest_first(orders)
+    assert lines[-1]["Amount"] == 0.5
+    assert lines[-1]["raw_payload"]["OrderStatus"] == orders[0]["OrderStatus"]
+
+
+def test_csv_export_has_one_header_and_every_row(orders):
+    response = TestClient(app).get("/orders/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert [row[1] for row in rows[1:]] == _newest_first(orders)
+    last = dict(zip(EXPORT_COLUMNS, rows[-1]))
+    assert (last["buyer"], last["amount"]) == ("buyer-0", "0.5")
+    assert last["purchase_date"].startswith("2026-01-01T00:00:00")
+
+
+def test_parquet_export_writes_a_row_group_per_chunk(orders):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    response = TestClient(app).get("/orders/export", params={"format": "parquet"})
+
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert tuple(table.column_names) == EXPORT_COLUMNS
+    assert table.column("amazon_order_id").to_pylist() == _newest_first(orders)
+    assert str(table.schema.field("purchase_date").type) == "timestamp[us, tz=UTC]"
+
+
+def test_export_filters_by_purchase_window(orders):
+    response = TestClient(app).get(
+        "/orders/export",
+        params={"format": "csv", "from": "2026-01-01T00:01:00Z", "to": "2026-01-01T00:03:00Z"},
+    )
+
+    assert [row[1] for row in list(csv.reader(io.StringIO(response.text)))[1:]] == (
+        _newest_first(orders[1:3])
+    )
+
+
+def test_export_rejects_unsupported_combinations(orders, monkeypatch):
+    client = TestClient(app)
+
+    raw_csv = client.get("/orders/export", params={"format": "csv", "include_raw": True})
+
+    def missing_pyarrow() -> None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    monkeypatch.setattr(routes_orders, "require_parquet", missing_pyarrow)
+    parquet = client.get("/orders/export", params={"format": "parquet"})
+
+    assert raw_csv.status_code == 400
+    assert parquet.status_code == 501
+    assert "pyarrow" in parquet.json()["detail"]
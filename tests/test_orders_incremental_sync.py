@@ -0,0 +1,48 @@
+import pytest
+
+from app.core.config import settings
+from app.db.crud import get_sync_watermark, parse_spapi_datetime
+from app.services.etl_orders import run_orders_etl
+from benchmarks.fake_spapi import build_synthetic_order
+
+
+@pytest.fixture
+def incremental(monkeypatch):
+    monkeypatch.setattr(settings, "orders_incremental_sync", True)
+    monkeypatch.setattr(settings, "orders_sync_overlap_minutes", 10)
+
+
+def test_second_sync_only_reads_the_overlap_past_the_watermark(fake_spapi, db, incremental):
+    server = fake_spapi(orders_total=30, orders_page_size=8)
+
+    first = run_orders_etl(db, generate_demo=False)
+
+    assert first["sync_mode"] == "full"
+    assert first["created"] == 30
+    newest = build_synthetic_order(29)["LastUpdateDate"]
+    watermark = get_sync_watermark(db, "orders:ATVPDKIKX0DER")
+    assert watermark.replace(tzinfo=None) == parse_spapi_datetime(newest).replace(tzinfo=None)
+
+    second = run_orders_etl(db, generate_demo=False)
+
+    # The ten-minute overlap re-reads orders 20-29; none of them changed.
+    assert second["sync_mode"] == "incremental"
+    assert second["last_updated_after"] == build_synthetic_order(19)["LastUpdateDate"]
+    assert (second["fetched"], second["changed"], second["unchanged"]) == (10, 0, 10)
+
+    server.orders_total = 35
+    third = run_orders_etl(db, generate_demo=False)
+
+    assert (third["fetched"], third["created"], third["unchanged"]) == (15, 5, 10)
+    assert get_sync_watermark(db, "orders:ATVPDKIKX0DER") > watermark
+
+
+def test_full_sync_ignores_the_stored_watermark(fake_spapi, db, incremental, monkeypatch):
+    fake_spapi(orders_total=12, orders_page_size=5)
+    run_orders_etl(db, generate_demo=False)
+    monkeypatch.setattr(settings, "orders_incremental_sync", False)
+
+    result = run_orders_etl(db, generate_demo=False)
+
+    assert result["sync_mode"] == "full"
+    assert (result["fetched"], result["unchanged"]) == (12, 12)
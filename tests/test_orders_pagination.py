@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+
+from app.db.crud import bulk_upsert_orders
+from app.main import app
+from benchmarks.fake_spapi import build_synthetic_order
+
+
+def _seed(db) -> list[dict]:
+    orders = [build_synthetic_order(index) for index in range(9)]
+    for order in orders[::3]:
+        del order["PurchaseDate"]
+    bulk_upsert_orders(db, orders)
+    db.commit()
+    return orders
+
+
+def _pages(client: TestClient, **params: str | int) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        body = client.get("/orders", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert body.status_code == 200
+        pages.append(body.json()["orders"])
+        cursor = body.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_orders_with_and_without_purchase_dates_once(db):
+    orders = _seed(db)
+
+    pages = _pages(TestClient(app), limit=2)
+
+    rows = [row for page in pages for row in page]
+    assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+    assert sorted(row["amazon_order_id"] for row in rows) == sorted(
+        order["AmazonOrderId"] for order in orders
+    )
+    # NULL purchase dates come first (newest id first), then purchase dates descending.
+    undated = rows[:3]
+    assert all(row["purchase_date"] is None for row in undated)
+    assert [row["id"] for row in undated] == sorted((row["id"] for row in undated), reverse=True)
+    dated = [row["purchase_date"] for row in rows[3:]]
+    assert None not in dated and dated == sorted(dated, reverse=True)
+
+
+def test_cursor_pages_respect_filters(db):
+    orders = _seed(db)
+    status = orders[1]["OrderStatus"]
+    expected = {order["AmazonOrderId"] for order in orders if order["OrderStatus"] == status}
+
+    pages = _pages(TestClient(app), limit=1, status=status)
+
+    assert {row["amazon_order_id"] for page in pages for row in page} == expected
+    assert sum(len(page) for page in pages) == len(expected)
+
+
+def test_malformed_cursor_is_a_bad_request(db):
+    response = TestClient(app).get("/orders", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
@@ -0,0 +1,19 @@
+import pytest
+
+from app.core.config import settings
+from app.db.migrations import LATEST_VERSION, check_schema_version
+
+
+# The test table is created with the default json column; jsonb means json off PostgreSQL.
+@pytest.mark.parametrize("storage", ["json", "jsonb"])
+def test_schema_check_accepts_the_storage_the_table_was_created_with(db, monkeypatch, storage):
+    monkeypatch.setattr(settings, "raw_payload_storage", storage)
+
+    assert check_schema_version() == LATEST_VERSION
+
+
+def test_schema_check_refuses_a_changed_storage_mode(db, monkeypatch):
+    monkeypatch.setattr(settings, "raw_payload_storage", "zlib")
+
+    with pytest.raises(RuntimeError, match="stored as json .* RAW_PAYLOAD_STORAGE=zlib"):
+        check_schema_version()
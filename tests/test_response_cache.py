@@ -0,0 +1,84 @@
+import orjson
+from fastapi.testclient import TestClient
+
+from app.db.crud import bulk_upsert_orders
+from app.main import app
+from app.services.etl_orders import run_orders_etl
+from app.services.response_cache import InMemoryCacheBackend, ResponseCache, response_cache
+from benchmarks.fake_spapi import build_synthetic_order
+
+
+def test_remote_invalidation_bumps_the_generation_and_the_etag(db):
+    bulk_upsert_orders(db, [build_synthetic_order(index) for index in range(3)])
+    db.commit()
+    client = TestClient(app)
+    first = client.get("/orders")
+    assert client.get("/orders").headers["X-Cache"] == "HIT"
+
+    # Another process wrote an order and told everyone over pg_notify.
+    bulk_upsert_orders(db, [build_synthetic_order(3)])
+    db.commit()
+    generation = response_cache.backend.generation("orders")
+    response_cache._on_notification(
+        orjson.dumps({"origin": "other-process", "namespaces": ["orders"]}).decode()
+    )
+
+    assert response_cache.backend.generation("orders") == generation + 1
+    refreshed = client.get("/orders", headers={"If-None-Match": first.headers["ETag"]})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert refreshed.headers["ETag"] != first.headers["ETag"]
+    assert len(refreshed.json()["orders"]) == 4
+
+
+def test_own_notifications_are_ignored():
+    cache = ResponseCache(InMemoryCacheBackend(), use_pg_notify=True)
+    cache.invalidate("orders")
+
+    own = orjson.dumps({"origin": cache._origin, "namespaces": ["orders"]}).decode()
+    cache._on_notification(own)
+
+    assert cache.backend.generation("orders") == 1
+    assert cache.stats()["remote_invalidations"] == 0
+
+
+def test_pg_notify_is_off_without_postgresql():
+    cache = ResponseCache(InMemoryCacheBackend(), use_pg_notify=True)
+    cache.start()
+
+    assert cache.use_pg_notify is False
+    assert cache._listener is None
+
+
+def test_cached_orders_revalidate_with_304_until_the_etl_invalidates(fake_spapi, db):
+    fake_spapi(orders_total=5, orders_page_size=5)
+    client = TestClient(app)
+    first = client.get("/orders")
+    etag = first.headers["ETag"]
+
+    hit = client.get("/orders")
+    not_modified = client.get("/orders", headers={"If-None-Match": f'W/{etag}, "other"'})
+
+    assert (first.headers["X-Cache"], hit.headers["X-Cache"]) == ("MISS", "HIT")
+    assert hit.content == first.content
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert client.get("/orders", params={"limit": 2}).headers["X-Cache"] == "MISS"
+
+    generation = response_cache.backend.generation("orders")
+    run_orders_etl(db, generate_demo=False)
+
+    assert response_cache.backend.generation("orders") > generation
+    after_sync = client.get("/orders", headers={"If-None-Match": etag})
+    assert after_sync.status_code == 200
+    assert after_sync.headers["X-Cache"] == "MISS"
+    assert len(after_sync.json()["orders"]) == 5
+
+
+def test_unchanged_sync_keeps_the_cached_generation(fake_spapi, db):
+    fake_spapi(orders_total=5, orders_page_size=5)
+    run_orders_etl(db, generate_demo=False)
+    generation = response_cache.backend.generation("orders")
+
+    run_orders_etl(db, generate_demo=False)
+
+    assert response_cache.backend.generation("orders") == generation
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.crud import insert_run_logs
+from app.main import app
+from app.services.etl_orders import run_orders_etl
+from app.services.run_log import RunLogEntry, RunLogWriter, run_logger
+
+
+def _logs(client: TestClient, **params: str | int) -> list[dict]:
+    logs, cursor = [], None
+    while True:
+        body = client.get("/logs", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert body.status_code == 200
+        logs.extend(body.json()["logs"])
+        cursor = body.json()["next_cursor"]
+        if cursor is None:
+            return logs
+
+
+def test_tracked_blocks_are_written_in_batches_with_their_outcome(db):
+    writer = RunLogWriter(batch_size=3, flush_interval_seconds=0.05, retention_days=0)
+    try:
+        for index in range(4):
+            with writer.track("spapi_call", "test_call", marketplace_id="ATVPDKIKX0DER") as entry:
+                entry.http_status = 200
+                entry.rows = index
+        with pytest.raises(ValueError):
+            with writer.track("etl_run", "test_run", account="eu"):
+                raise ValueError("bad page")
+        assert writer.flush()
+    finally:
+        writer.shutdown()
+
+    client = TestClient(app)
+    # Filtered by names the default writer never uses, as it may still be flushing other tests.
+    calls = _logs(client, name="test_call", limit=2)
+    errors = _logs(client, name="test_run", status="error")
+
+    assert sorted(log["rows"] for log in calls) == [0, 1, 2, 3]
+    assert {(log["status"], log["http_status"]) for log in calls} == {("ok", 200)}
+    assert [(log["name"], log["account"], log["error"]) for log in errors] == [
+        ("test_run", "eu", "ValueError: bad page")
+    ]
+    assert writer.stats() == {
+        "recorded": 5,
+        "dropped": 0,
+        "written": 5,
+        "failed": 0,
+        "pruned": 0,
+        "queue_depth": 0,
+    }
+
+
+def test_full_queue_drops_entries_instead_of_blocking(monkeypatch):
+    writer = RunLogWriter(max_queue_size=2)
+    # No worker, so nothing drains the queue.
+    monkeypatch.setattr(writer, "_ensure_worker", lambda: None)
+
+    for _ in range(5):
+        with writer.track("spapi_call", "getOrders"):
+            pass
+
+    assert (writer.stats()["recorded"], writer.stats()["dropped"]) == (2, 3)
+    assert not RunLogWriter(enabled=False).record(RunLogEntry("etl_run", "orders_sync"), "ok", 1.0)
+
+
+def test_prune_deletes_only_entries_past_retention(db):
+    now = datetime.utcnow()
+    insert_run_logs(
+        db,
+        [
+            {
+                "created_at": now - timedelta(days=age),
+                "kind": "etl_run",
+                "name": f"run-{age}",
+                "status": "ok",
+                "duration_ms": 1.0,
+            }
+            for age in (0, 6, 8, 30)
+        ],
+    )
+    db.commit()
+
+    assert RunLogWriter(retention_days=7).prune() == 2
+    names = [log["name"] for log in _logs(TestClient(app), kind="etl_run")]
+    assert [name for name in names if name.startswith("run-")] == ["run-0", "run-6"]
+
+
+def test_orders_sync_is_logged_with_its_counts(fake_spapi, db):
+    fake_spapi(orders_total=6, orders_page_size=4)
+    since = datetime.utcnow().isoformat()
+
+    run_orders_etl(db, generate_demo=False)
+    assert run_logger.flush()
+
+    client = TestClient(app)
+    [run] = _logs(client, kind="etl_run", name="orders_sync", since=since)
+    calls = _logs(client, kind="spapi_call", name="getOrders", since=since)
+    assert (run["status"], run["rows"], run["marketplace_id"]) == ("ok", 6, "ATVPDKIKX0DER")
+    assert run["details"]["created"] == 6
+    assert len(calls) == 2 and all(call["http_status"] == 200 for call in calls)
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.db.crud import get_job_run
+from app.db.models import JobRun
+from app.workers.scheduler import ScheduledJob, Scheduler, scheduler
+
+
+def _wait_for_status(db, job_id: str, statuses: set[str], timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        db.expire_all()
+        job_run = get_job_run(db, job_id)
+        if job_run.status in statuses:
+            return job_run
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} never reached {statuses}")
+
+
+def test_failed_orders_job_stores_the_error_once(fake_spapi, db, monkeypatch):
+    fake_spapi()
+    monkeypatch.setattr(settings, "spapi_client_id", "")
+
+    job_run = _wait_for_status(db, scheduler.enqueue("orders_sync"), {"succeeded", "failed"})
+
+    assert job_run.status == "failed"
+    assert job_run.error == "RuntimeError: Missing SP-API credentials: SPAPI_CLIENT_ID"
+
+
+def test_shutdown_marks_queued_runs_cancelled(db):
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_job() -> dict:
+        started.set()
+        release.wait(timeout=30)
+        return {"ok": True}
+
+    local = Scheduler([ScheduledJob("blocking", blocking_job, 0)], max_workers=1)
+    running = local.enqueue("blocking")
+    assert started.wait(timeout=30)
+    queued = [local.enqueue("blocking") for _ in range(2)]
+
+    local.shutdown(wait=False)
+    release.set()
+
+    assert _wait_for_status(db, running, {"succeeded"}).error is None
+    for job_id in queued:
+        job_run = _wait_for_status(db, job_id, {"cancelled"})
+        assert job_run.error == "Scheduler shut down before the run started"
+        assert job_run.finished_at is not None
+
+    with pytest.raises(RuntimeError):
+        local.enqueue("blocking")
+    db.expire_all()
+    assert db.query(JobRun).filter(JobRun.status == "queued").count() == 0
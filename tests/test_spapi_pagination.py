@@ -0,0 +1,61 @@
+import pytest
+import requests
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.models import Order
+from app.services.etl_orders import run_orders_etl
+from app.services.spapi_client import SPAPIClient
+
+PAGES = 7
+PAGE_SIZE = 25
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iter_sandbox_orders_yields_every_page_once(fake_spapi, prefetch):
+    server = fake_spapi(orders_total=PAGES * PAGE_SIZE, orders_page_size=PAGE_SIZE)
+
+    order_ids = [
+        order["AmazonOrderId"] for order in SPAPIClient().iter_sandbox_orders(prefetch=prefetch)
+    ]
+
+    assert len(order_ids) == PAGES * PAGE_SIZE
+    assert len(set(order_ids)) == PAGES * PAGE_SIZE
+    assert server.requests["getOrders"] == PAGES
+
+
+def test_run_orders_etl_stores_every_order_exactly_once(fake_spapi, db, monkeypatch):
+    server = fake_spapi(
+        orders_total=PAGES * PAGE_SIZE, orders_page_size=PAGE_SIZE, throttle_every=4
+    )
+    # Batches that do not line up with pages, so pages get split across commits.
+    monkeypatch.setattr(settings, "orders_etl_batch_size", 40)
+    monkeypatch.setattr(settings, "orders_page_prefetch", 2)
+
+    result = run_orders_etl(db, generate_demo=False)
+
+    assert result["fetched"] == PAGES * PAGE_SIZE
+    assert result["created"] == PAGES * PAGE_SIZE
+    assert server.requests["throttled"] > 0
+    assert db.scalar(select(func.count(Order.id))) == PAGES * PAGE_SIZE
+    assert db.scalar(select(func.count(func.distinct(Order.amazon_order_id)))) == PAGES * PAGE_SIZE
+
+    rerun = run_orders_etl(db, generate_demo=False)
+    assert rerun["fetched"] == PAGES * PAGE_SIZE
+    assert rerun["changed"] == 0
+    assert db.scalar(select(func.count(Order.id))) == PAGES * PAGE_SIZE
+
+
+def test_run_orders_etl_raises_on_server_error_mid_stream(fake_spapi, db, monkeypatch):
+    server = fake_spapi(
+        orders_total=PAGES * PAGE_SIZE, orders_page_size=PAGE_SIZE, orders_fail_after=3
+    )
+    monkeypatch.setattr(settings, "orders_etl_batch_size", PAGE_SIZE)
+
+    with pytest.raises(requests.HTTPError) as excinfo:
+        run_orders_etl(db, generate_demo=False)
+
+    assert excinfo.value.response.status_code == 500
+    assert server.requests["failed"] > 0
+    # Batches committed before the failure stay; nothing past it was written.
+    assert db.scalar(select(func.count(Order.id))) <= 3 * PAGE_SIZE